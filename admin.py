@@ -1,6 +1,6 @@
 # File: admin.py
 # Creation Date: 19/04/2025
-# Last Modified Date: 19/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This file contains the Admin class, which inherits from the User class.
 
 from user import User
@@ -9,6 +9,8 @@ class Admin(User):
     """
     Represents an admin in the e-commerce system, inheriting from User.
     """
+    __slots__ = ()
+
     def __init__(self, user_id="", user_name="", user_password="",
                  user_register_time="00-00-0000_00:00:00", user_role="admin"):
         """
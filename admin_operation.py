@@ -1,12 +1,18 @@
 # File: admin_operation.py
 # Creation Date: 21/04/2025
-# Last Modified Date: 21/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This file contains the AdminOperation class.
 
 import os
 import time
 from admin import Admin
 from user_operation import UserOperation
+from change_log import get_change_log
+from file_lock import file_lock
+from user_index import get_user_index
+from customer_operation import CustomerOperation
+from record_cache import file_signature
+from record_codec import read_record_at
 
 class AdminOperation:
     """
@@ -14,6 +20,20 @@ class AdminOperation:
     """
     users_file_path = 'data/users.txt'
 
+    def _default_admin_exists(self):
+        """
+        Helper to check for the default admin without loading every user. register_admin writes it
+        first, so the first line of data/users.txt is checked before falling back to the user index.
+        """
+        signature = file_signature(self.users_file_path)
+        if signature is not None and signature[0] > 0:
+            first_user = read_record_at(self.users_file_path, 0)
+            # The change log only holds edits made since the last compaction, so it stays small
+            if (first_user is not None and first_user.get('user_name') == 'admin'
+                    and first_user.get('user_id') not in get_change_log(self.users_file_path, 'user_id').pending()):
+                return True
+        return UserOperation().check_username_exist('admin')
+
     def register_admin(self):
         """
         Manually creates a default admin account if it does not already exist.
@@ -22,7 +42,7 @@ class AdminOperation:
         user_op = UserOperation()
         
         # Check if the default admin 'admin' already exists
-        if user_op.check_username_exist('admin'):
+        if self._default_admin_exists():
             return # Admin already exists, do nothing
 
         # If admin does not exist, create it
@@ -39,8 +59,12 @@ class AdminOperation:
         # Ensure data directory exists
         os.makedirs(os.path.dirname(self.users_file_path), exist_ok=True)
 
-        # Append the new admin to the users file
-        with open(self.users_file_path, 'a', encoding='utf-8') as f:
-            f.write(str(new_admin) + '\n')
+        # Append the new admin to the users file, unless a process starting at the same time already did
+        with file_lock(self.users_file_path):
+            if self._default_admin_exists():
+                return
+            offsets = get_change_log(self.users_file_path, 'user_id').append([new_admin])
+            get_user_index(self.users_file_path).records_appended([new_admin], offsets)
+            CustomerOperation()._customer_index().records_appended([new_admin], offsets)
         
         # print(f"Default admin 'admin' with password '{admin_password}' created.")
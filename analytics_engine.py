@@ -0,0 +1,123 @@
+# File: analytics_engine.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the AnalyticsEngine class, which computes the aggregates behind the statistical figures.
+
+import numpy as np
+import pandas as pd
+from columnar_store import get_product_store, MISSING_TIME
+from consumption_rollup import get_consumption_rollup, consumption_series
+from sales_counter import get_sales_counter
+
+DISCOUNT_BINS = [-1, 29, 60, float('inf')]
+DISCOUNT_LABELS = ['< 30%', '30% - 60%', '> 60%']
+
+
+def join_orders_to_products(products, orders):
+    """
+    Joins every order to the first product with its pro_id.
+    Orders whose product is unknown, has no price, or whose time is missing are left out,
+    exactly as the old DataFrame merge followed by dropna did.
+
+    Args:
+        products (dict): Product columns from the columnar store.
+        orders (dict): Order columns from the columnar store.
+
+    Returns:
+        tuple: (boolean mask of the kept orders, position of each kept order's product, its price)
+    """
+    product_ids, first_positions = np.unique(products['pro_id'], return_index=True)
+    lookup = np.searchsorted(product_ids, orders['pro_id'])
+    lookup[lookup == len(product_ids)] = 0
+    product_positions = np.where(product_ids[lookup] == orders['pro_id'], first_positions[lookup], -1)
+
+    prices = np.where(product_positions >= 0, products['pro_current_price'][product_positions], np.nan)
+    keep = (product_positions >= 0) & ~np.isnan(prices) & (orders['order_time'] != MISSING_TIME)
+    return keep, product_positions[keep], prices[keep]
+
+
+def order_months(order_times):
+    """Turns int64 epoch-second order times into months since January 1970."""
+    return order_times.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+
+
+class AnalyticsEngine:
+    """
+    Loads the product and order columns once and computes every aggregate the statistical
+    figures need in one pass over them: category_counts, discount_counts, likes_by_category
+    and discount_likes (per product), top_sellers (read from the SalesCounter) and
+    monthly_consumption (read from the precomputed ConsumptionRollup).
+    The figure methods of ProductOperation and OrderOperation plot from this shared result
+    instead of each re-reading the data and re-running the orders/products merge.
+    """
+    def __init__(self, products_file_path='data/products.txt', orders_file_path='data/orders.txt'):
+        """
+        Constructs the engine.
+
+        Args:
+            products_file_path (str): Path of the products data file.
+            orders_file_path (str): Path of the orders data file.
+        """
+        self.products_file_path = products_file_path
+        self.orders_file_path = orders_file_path
+
+    def compute(self, include_orders=True):
+        """
+        Computes the aggregates.
+
+        Args:
+            include_orders (bool): Whether to compute the order aggregates as well.
+
+        Returns:
+            dict: Aggregate name -> pandas Series (DataFrame for discount_likes),
+                  or None when there is no data behind it.
+        """
+        products = get_product_store(self.products_file_path).load()
+        analytics = self._product_aggregates(products)
+        if include_orders:
+            analytics['top_sellers'] = self.top_sellers()
+            months = get_consumption_rollup(self.orders_file_path, self.products_file_path).monthly_consumption()
+            analytics['monthly_consumption'] = consumption_series(months) if months else None
+        return analytics
+
+    def _product_aggregates(self, products):
+        """Aggregates the product columns: one bincount per figure over the category codes and discount bins."""
+        if len(products['pro_id']) == 0:
+            return dict.fromkeys(['category_counts', 'discount_counts', 'likes_by_category', 'discount_likes'])
+
+        categories = products['pro_category_names']
+        codes = products['pro_category_code']
+        discount = products['pro_discount']
+        likes = products['pro_likes_count']
+
+        category_counts = pd.Series(np.bincount(codes, minlength=len(categories)), index=categories, name='count')
+        likes_by_category = pd.Series(np.bincount(codes, weights=likes, minlength=len(categories)).astype(np.int64),
+                                      index=categories, name='pro_likes_count')
+
+        # Bins are (-1, 29], (29, 60], (60, inf) as with pd.cut(right=True); NaN and <= -1 fall outside
+        valid = ~np.isnan(discount) & (discount > DISCOUNT_BINS[0])
+        discount_bins = np.searchsorted(DISCOUNT_BINS[1:-1], discount[valid], side='left')
+        discount_counts = pd.Series(np.bincount(discount_bins, minlength=len(DISCOUNT_LABELS)),
+                                    index=DISCOUNT_LABELS, name='count')
+
+        has_discount = ~np.isnan(discount)
+        return {
+            'category_counts': category_counts.sort_values(ascending=False, kind='stable'),
+            'discount_counts': discount_counts.sort_values(ascending=False, kind='stable'),
+            'likes_by_category': likes_by_category.sort_values(ascending=True, kind='stable'),
+            'discount_likes': pd.DataFrame({'pro_discount': discount[has_discount],
+                                            'pro_likes_count': likes[has_discount]}),
+        }
+
+    def top_sellers(self, top_n=10):
+        """
+        Reads the top_n best-selling product names from the sales counters, ties in order of first sale.
+        As with the old value_counts over pro_name, products with the same name are counted together.
+
+        Returns:
+            pandas.Series: Number of orders per product name, best first, or None if nothing was sold.
+        """
+        best = get_sales_counter(self.orders_file_path, self.products_file_path).top_names(top_n)
+        if not best:
+            return None
+        return pd.Series([count for name, count in best], index=[name for name, count in best], name='count')
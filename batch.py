@@ -0,0 +1,207 @@
+# File: batch.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the BatchRunner class, the non-interactive command mode of main.py.
+
+import inspect
+import json
+import time
+
+
+class BatchRunner:
+    """
+    Executes scripted commands, one per line, against one long-lived set of operation objects,
+    so data files and indexes are loaded once for the whole script instead of once per step.
+    Commands follow the menus of main.py and run as the user logged in by the last 'login':
+
+        login <user_name> <password>        logout
+        register <user_name> <password> <email> <mobile>
+        products [page]                     search <keyword, may contain spaces>
+        profile                             update <attribute> <value>
+        history [page]                      my_figure
+        customers [page]                    orders [next | <user_id>]
+        test_data                           figures
+        delete_all CONFIRM
+
+    Blank lines and lines starting with '#' are skipped. Every command produces one JSON line
+    {"line", "command", "ok", "result" or "error", "ms"}; the lines are buffered and written out
+    in blocks, followed by a summary line.
+    """
+    flush_every = 1000  # Number of result lines buffered before they are written
+
+    def __init__(self, output, user_op, cust_op, admin_op, prod_op, order_op):
+        """
+        Constructs the runner.
+
+        Args:
+            output: Text stream the JSON lines are written to.
+            user_op, cust_op, admin_op, prod_op, order_op: The operation objects commands run against.
+        """
+        self.output = output
+        self.user_op = user_op
+        self.cust_op = cust_op
+        self.admin_op = admin_op
+        self.prod_op = prod_op
+        self.order_op = order_op
+        self.logged_in_user = None
+        self.order_pages = None # 'orders' listing: [customer filter, cursor of the next page, page number]
+        self.commands = {
+            'login': (self.login, None), 'logout': (self.logout, None), 'register': (self.register, None),
+            'products': (self.products, None), 'search': (self.search, None),
+            'profile': (self.profile, 'customer'), 'update': (self.update, 'customer'),
+            'history': (self.history, 'customer'), 'my_figure': (self.my_figure, 'customer'),
+            'customers': (self.customers, 'admin'), 'orders': (self.orders, 'admin'),
+            'test_data': (self.test_data, 'admin'), 'figures': (self.figures, 'admin'),
+            'delete_all': (self.delete_all, 'admin'),
+        }
+
+    def run(self, lines):
+        """
+        Executes every command of the given lines and writes their results.
+
+        Args:
+            lines (iterable): The command lines (e.g. an open file or sys.stdin).
+
+        Returns:
+            int: Number of commands that failed.
+        """
+        buffer = []
+        executed = failed = 0
+        start = time.perf_counter()
+        for line_number, line in enumerate(lines, 1):
+            words = line.split()
+            if not words or words[0].startswith('#'):
+                continue
+            result = self.execute(words)
+            result = {'line': line_number, **result}
+            executed += 1
+            failed += not result['ok']
+            buffer.append(json.dumps(result, ensure_ascii=False))
+            if len(buffer) >= self.flush_every:
+                self.output.write('\n'.join(buffer) + '\n')
+                buffer = []
+        buffer.append(json.dumps({'summary': {'commands': executed, 'failed': failed,
+                                              'ms': round((time.perf_counter() - start) * 1000, 3)}}))
+        self.output.write('\n'.join(buffer) + '\n')
+        self.output.flush()
+        return failed
+
+    def execute(self, words):
+        """
+        Executes one command given as its words and returns its result dict (without the line number).
+        """
+        name, args = words[0], words[1:]
+        start = time.perf_counter()
+        command, role = self.commands.get(name, (None, None))
+        try:
+            if command is None:
+                raise ValueError(f"Unknown command '{name}'.")
+            if role is not None and (self.logged_in_user is None or self.logged_in_user.user_role != role):
+                raise ValueError(f"'{name}' requires a logged-in {role}.")
+            try:
+                inspect.signature(command).bind(*args)
+            except TypeError:
+                raise ValueError(f"Wrong number of arguments for '{name}'.")
+            result = {'ok': True, 'result': command(*args)}
+        except Exception as e:
+            result = {'ok': False, 'error': str(e)}
+        return {'command': ' '.join(words), **result, 'ms': round((time.perf_counter() - start) * 1000, 3)}
+
+    # --- Commands: each returns a JSON-serialisable result or raises with a message ---
+
+    @staticmethod
+    def _page(page):
+        """Parses an optional page argument."""
+        if not page.isdigit():
+            raise ValueError(f"'{page}' is not a page number.")
+        return int(page)
+
+    @staticmethod
+    def _list(data_tuple):
+        """Turns an (objects, page, total pages) tuple into a result dict."""
+        objects, page, total_pages = data_tuple
+        return {'items': [obj.to_record() for obj in objects], 'page': page, 'total_pages': total_pages}
+
+    def login(self, user_name, password):
+        """Logs in; later commands run as this user."""
+        user = self.user_op.login(user_name, password)
+        if user is None:
+            raise ValueError("Invalid username or password.")
+        self.logged_in_user = user
+        self.order_pages = None
+        return {'user_id': user.user_id, 'user_role': user.user_role}
+
+    def logout(self):
+        """Logs the current user out."""
+        self.logged_in_user = None
+        self.order_pages = None
+        return None
+
+    def register(self, user_name, password, email, mobile):
+        """Registers a new customer."""
+        if not self.cust_op.register_customer(user_name, password, email, mobile):
+            raise ValueError("Failed. Username may exist, or details are invalid.")
+        return None
+
+    def products(self, page='1'):
+        """Returns one page of products."""
+        return self._list(self.prod_op.get_product_list(self._page(page)))
+
+    def search(self, *words):
+        """Returns every product whose name contains the keyword (the rest of the line, spaces included)."""
+        if not words:
+            raise ValueError("Wrong number of arguments for 'search'.")
+        keyword = ' '.join(words)
+        return {'items': [product.to_record() for product in self.prod_op.get_product_list_by_keyword(keyword)]}
+
+    def profile(self):
+        """Returns the profile of the logged-in customer, without the password."""
+        user_data = self.logged_in_user.to_record()
+        del user_data['user_password']
+        return user_data
+
+    def update(self, attribute_name, value):
+        """Updates one profile attribute of the logged-in customer."""
+        if attribute_name not in ('user_password', 'user_email', 'user_mobile'):
+            raise ValueError("You can only update 'user_password', 'user_email', or 'user_mobile'.")
+        if not self.cust_op.update_profile(attribute_name, value, self.logged_in_user):
+            raise ValueError("Invalid value. Please check format.")
+        return None
+
+    def history(self, page='1'):
+        """Returns one page of the logged-in customer's order history."""
+        return self._list(self.order_op.get_order_list(self.logged_in_user.user_id, self._page(page)))
+
+    def my_figure(self):
+        """Generates the consumption figure of the logged-in customer."""
+        self.order_op.generate_single_customer_consumption_figure(self.logged_in_user.user_id)
+        return {'figure': f"data/figure/single_customer_consumption_{self.logged_in_user.user_id}.png"}
+
+    def customers(self, page='1'):
+        """Returns one page of customers."""
+        return self._list(self.cust_op.get_customer_list(self._page(page)))
+
+    def orders(self, param=''):
+        """Returns the first page of all orders (or of one customer's), or with 'next' the following page."""
+        orders, page, total_pages, self.order_pages = self.order_op.browse_all_orders(param, self.order_pages)
+        return {'items': [order.to_record() for order in orders], 'page': page,
+                'total_pages': total_pages, 'more': self.order_pages[1] is not None}
+
+    def test_data(self):
+        """Generates test customers and orders."""
+        order_count, orders_per_second = self.order_op.generate_test_order_data()
+        return {'orders': order_count, 'orders_per_second': round(orders_per_second)}
+
+    def figures(self):
+        """Generates every statistical figure and returns the render seconds of each (None if up to date)."""
+        render_times = self.order_op.generate_all_figures()
+        return {file_name: None if seconds is None else round(seconds, 3) for file_name, seconds in render_times.items()}
+
+    def delete_all(self, confirm=''):
+        """Deletes all customers, products and orders (only with 'CONFIRM')."""
+        if confirm != 'CONFIRM':
+            raise ValueError("Type 'delete_all CONFIRM' to delete all customers, products, and orders.")
+        self.cust_op.delete_all_customers()
+        self.prod_op.delete_all_products()
+        self.order_op.delete_all_orders()
+        return None
@@ -0,0 +1,724 @@
+# File: benchmark.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains micro-benchmarks for the storage and operation layers.
+#              Run e.g. `python benchmark.py codec --rows 1000000` or `python benchmark.py ingest`.
+#              `python benchmark.py scale --baseline scale_baseline.json` flags regressions against a saved run.
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from record_codec import decode_lines, encode_record, write_records, read_records
+
+
+def _timed(function, *args):
+    """Runs function(*args) once and returns (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def _sample_order(i):
+    """Builds one order-shaped record for synthetic data files."""
+    return {
+        'order_id': f"o_{i:05d}",
+        'user_id': f"u_{random.randint(0, 9999999999):010d}",
+        'pro_id': str(random.randint(1000000, 1999999)),
+        'order_time': time.strftime("%d-%m-%Y_%H:%M:%S", time.localtime(random.uniform(0, 1.7e9)))
+    }
+
+
+def _sample_product(i):
+    """Builds one product-shaped record for synthetic data files."""
+    raw_price = round(random.uniform(5, 200), 2)
+    discount = random.randint(0, 90)
+    return {
+        'pro_id': str(1000000 + i),
+        'pro_model': f"SKU{i:06d}",
+        'pro_category': random.choice(['beauty', 'jewelry', 'kids', 'men', 'women', 'shoes']),
+        'pro_name': f"Product {i} " + random.choice(['ring', 'shirt', 'necklace', 'dress', 'lipstick']),
+        'pro_current_price': round(raw_price * (100 - discount) / 100, 2),
+        'pro_raw_price': raw_price,
+        'pro_discount': discount,
+        'pro_likes_count': random.randint(0, 5000)
+    }
+
+
+def _read_with_eval(file_path):
+    """The original per-line eval() reader, kept only as the comparison baseline."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        records = []
+        for line in f:
+            try:
+                records.append(eval(line.strip()))
+            except:
+                continue
+        return records
+
+
+def _read_with_codec(file_path):
+    """Reads the file through the record codec."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return decode_lines(f.read().splitlines())
+
+
+def bench_codec(rows):
+    """Compares eval() parsing of the legacy format against the JSON-lines codec."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        legacy_path = os.path.join(temp_dir, 'legacy.txt')
+        json_path = os.path.join(temp_dir, 'records.txt')
+        records = [_sample_order(i) for i in range(rows)]
+        with open(legacy_path, 'w', encoding='utf-8') as f:
+            f.writelines(str(record) + '\n' for record in records)
+        with open(json_path, 'w', encoding='utf-8') as f:
+            f.writelines(encode_record(record) + '\n' for record in records)
+
+        eval_records, eval_seconds = _timed(_read_with_eval, legacy_path)
+        codec_records, codec_seconds = _timed(_read_with_codec, json_path)
+        assert eval_records == codec_records
+
+        print(f"rows: {rows}")
+        print(f"eval per line : {eval_seconds:8.3f}s  {rows / eval_seconds:12,.0f} rows/s")
+        print(f"record codec  : {codec_seconds:8.3f}s  {rows / codec_seconds:12,.0f} rows/s")
+        print(f"speed-up      : {eval_seconds / codec_seconds:8.1f}x")
+
+
+def _products_frame(columns):
+    """Turns product columns into a DataFrame with a categorical pro_category, without copying the numbers."""
+    import pandas as pd
+
+    return pd.DataFrame({
+        'pro_id': columns['pro_id'],
+        'pro_name': columns['pro_name'],
+        'pro_category': pd.Categorical.from_codes(columns['pro_category_code'], columns['pro_category_names']),
+        'pro_current_price': columns['pro_current_price'],
+        'pro_raw_price': columns['pro_raw_price'],
+        'pro_discount': columns['pro_discount'],
+        'pro_likes_count': columns['pro_likes_count'],
+    }, copy=False)
+
+
+def bench_columnar(rows):
+    """Compares DataFrame-from-dicts plus to_numeric against loading the typed columnar store."""
+    import pandas as pd
+    from columnar_store import ColumnarStore, build_product_columns
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        products_path = os.path.join(temp_dir, 'products.txt')
+        write_records(products_path, [_sample_product(i) for i in range(rows)])
+
+        def from_dicts():
+            df = pd.DataFrame(read_records(products_path))
+            for column in ('pro_current_price', 'pro_discount', 'pro_likes_count'):
+                df[column] = pd.to_numeric(df[column], errors='coerce')
+            return df
+
+        def new_store():
+            return ColumnarStore(products_path, [products_path], lambda: read_records(products_path),
+                                 build_product_columns)
+
+        dicts_df, dicts_seconds = _timed(from_dicts)
+        _, build_seconds = _timed(lambda: new_store().load())
+        columns_df, load_seconds = _timed(lambda: _products_frame(new_store().load()))
+
+        print(f"rows: {rows}")
+        print(f"dicts + to_numeric : {dicts_seconds:8.3f}s  {dicts_df.memory_usage(deep=True).sum() / 2**20:8.1f} MiB")
+        print(f"columnar build     : {build_seconds:8.3f}s  (once per data file version)")
+        print(f"columnar load      : {load_seconds:8.3f}s  {columns_df.memory_usage(deep=True).sum() / 2**20:8.1f} MiB")
+
+
+def _extract_with_iterrows(products_source_path):
+    """The original serial extraction (all columns, one Product per iterrows() row), kept as the baseline."""
+    import glob
+    import pandas as pd
+    from product import Product
+    from product_operation import SOURCE_COLUMNS
+
+    all_products = []
+    for file in glob.glob(products_source_path):
+        df = pd.read_csv(file).rename(columns=SOURCE_COLUMNS)
+        for col in SOURCE_COLUMNS.values():
+            if col not in df.columns:
+                df[col] = ""
+        all_products.append(df[list(SOURCE_COLUMNS.values())])
+    combined_df = pd.concat(all_products, ignore_index=True)
+    combined_df.drop_duplicates(subset=['pro_id'], inplace=True)
+    return [Product(**row) for index, row in combined_df.iterrows()]
+
+
+def _replicate_product_sources(target_dir, rows):
+    """
+    Replicates every CSV in data/product/ (with shifted ids) into target_dir until the copies hold
+    about `rows` rows in total. Returns the total number of rows, or 0 if there are no source files.
+    """
+    import glob
+    import pandas as pd
+
+    source_files = sorted(glob.glob('data/product/*.csv'))
+    if not source_files:
+        return 0
+    sources = [pd.read_csv(file) for file in source_files]
+    copies = max(1, -(-rows // sum(len(df) for df in sources)))
+    id_step = 10 ** len(str(max(int(df['id'].max()) for df in sources)))
+    for copy in range(copies):
+        for file, df in zip(source_files, sources):
+            df = df.assign(id=df['id'] + copy * id_step)
+            df.to_csv(os.path.join(target_dir, f"{copy:04d}_{os.path.basename(file)}"), index=False)
+    return copies * sum(len(df) for df in sources)
+
+
+def bench_ingest(rows, workers):
+    """Compares the serial iterrows() extraction against the parallel, column-pruned one."""
+    import glob
+    from product_operation import ProductOperation, read_product_sources
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        total_rows = _replicate_product_sources(temp_dir, rows)
+        if not total_rows:
+            print("No source CSV files found in data/product/.")
+            return
+
+        operation = ProductOperation()
+        operation.products_source_path = os.path.join(temp_dir, '*.csv')
+        operation.products_file_path = os.path.join(temp_dir, 'products.txt')
+
+        csv_files = sorted(glob.glob(operation.products_source_path))
+
+        baseline, baseline_seconds = _timed(_extract_with_iterrows, operation.products_source_path)
+        _, serial_seconds = _timed(read_product_sources, csv_files, 1)
+        _, parallel_seconds = _timed(read_product_sources, csv_files, workers)
+        _, extract_seconds = _timed(operation.extract_products_from_files, workers)
+        assert len(baseline) == len(read_records(operation.products_file_path))
+
+        print(f"rows: {total_rows} in {len(csv_files)} files, unique products: {len(baseline)}")
+        print(f"parse, iterrows baseline : {baseline_seconds:8.3f}s")
+        print(f"parse, pruned, 1 process : {serial_seconds:8.3f}s")
+        print(f"parse, pruned, {workers or os.cpu_count()} process(es): {parallel_seconds:8.3f}s")
+        print(f"parse speed-up           : {baseline_seconds / parallel_seconds:8.1f}x")
+        print(f"full extraction          : {extract_seconds:8.3f}s  (parse, write, keyword index)")
+
+
+def _extract_in_child(source_dir, memory_budget):
+    """Runs one full extraction into source_dir/products.txt and returns (seconds, peak RSS in MiB)."""
+    import resource
+    from product_operation import ProductOperation
+
+    operation = ProductOperation()
+    operation.products_source_path = os.path.join(source_dir, '*.csv')
+    operation.products_file_path = os.path.join(source_dir, 'out', 'products.txt')
+    _, seconds = _timed(operation.extract_products_from_files, 1, memory_budget)
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return seconds, peak_kib / 1024
+
+
+def bench_stream(rows, memory_budget):
+    """Compares the peak memory of the in-memory extraction and the streaming one, each in a fresh process."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        total_rows = _replicate_product_sources(temp_dir, rows)
+        if not total_rows:
+            print("No source CSV files found in data/product/.")
+            return
+
+        results = {}
+        for mode, budget in (('in-memory', None), ('streaming', memory_budget)):
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                results[mode] = pool.submit(_extract_in_child, temp_dir, budget).result()
+            os.remove(os.path.join(temp_dir, 'out', 'products.txt'))
+
+        print(f"rows: {total_rows}, memory budget: {memory_budget / 2**20:.0f} MiB")
+        for mode, (seconds, peak_mib) in results.items():
+            print(f"{mode:10}: {seconds:8.3f}s  peak RSS {peak_mib:8.1f} MiB")
+
+
+def _unslotted(model_class):
+    """Returns a copy of a model class with a per-instance __dict__, as the models were before __slots__."""
+    return type(f"Dict{model_class.__name__}", (), {'__init__': model_class.__init__})
+
+
+def _materialize(model_class, records):
+    """Builds one model object per record, the way the list methods do."""
+    if hasattr(model_class, 'from_record'):
+        return [model_class.from_record(record) for record in records]
+    return [model_class(**record) for record in records]
+
+
+def bench_models(rows):
+    """Compares per-instance-dict and slotted models: memory and time to build and serialise `rows` objects."""
+    import gc
+    import tracemalloc
+    from order import Order
+    from product import Product
+
+    for model_class, sample in ((Order, _sample_order), (Product, _sample_product)):
+        records = [sample(i) for i in range(rows)]
+        print(f"{model_class.__name__} x {rows}")
+        for label, candidate in (('dict', _unslotted(model_class)), ('slots', model_class)):
+            gc.collect()
+            objects, build_seconds = _timed(_materialize, candidate, records)
+            _, encode_seconds = _timed(lambda: [encode_record(obj) for obj in objects])
+            del objects
+            gc.collect()
+            tracemalloc.start()
+            objects = _materialize(candidate, records)
+            object_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del objects
+            print(f"  {label:5} : {object_bytes / 2**20:8.1f} MiB  {object_bytes / rows:6.0f} B/object  "
+                  f"build {rows / build_seconds:12,.0f}/s  encode {rows / encode_seconds:12,.0f}/s")
+
+
+def _stress_worker(root_dir, worker, operations):
+    """
+    One writer process of the concurrency stress test: registers a customer, places `operations`
+    orders one by one, deletes every tenth of them and updates the customer's email.
+    Returns (orders created, orders deleted).
+    """
+    os.chdir(root_dir)
+    from customer_operation import CustomerOperation
+    from order_operation import OrderOperation
+    from user_operation import UserOperation
+
+    cust_op, order_op = CustomerOperation(), OrderOperation()
+    user_name = 'stress_' + ''.join(chr(ord('a') + int(digit)) for digit in str(worker))
+    assert cust_op.register_customer(user_name, 'stress123', 'stress@test.com', '0412345678')
+    customer = UserOperation().login(user_name, 'stress123')
+    deleted = 0
+    for i in range(operations):
+        order_op.create_an_order(customer.user_id, str(1000000 + i))
+        if i % 10 == 9:
+            orders, _ = order_op.get_all_orders_page(customer_id=customer.user_id, page_size=1)
+            deleted += order_op.delete_order(orders[0].order_id)
+    assert cust_op.update_profile('user_email', f"{user_name}@test.com", customer)
+    return operations, deleted
+
+
+def bench_concurrency(processes, operations):
+    """
+    Runs `processes` writer processes against the same data files at once and checks that no
+    record was lost, duplicated or corrupted. Reports the combined write throughput.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+    from change_log import ChangeLog
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.makedirs(os.path.join(temp_dir, 'data'))
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=processes, mp_context=get_context('spawn')) as pool:
+            results = list(pool.map(_stress_worker, [temp_dir] * processes, range(processes),
+                                    [operations] * processes))
+        seconds = time.perf_counter() - start
+
+        created = sum(result[0] for result in results)
+        deleted = sum(result[1] for result in results)
+        writes = created + deleted + 2 * processes
+        problems = []
+        for stem, key_field in (('users', 'user_id'), ('orders', 'order_id')):
+            for suffix in ('.txt', '.log'):
+                path = os.path.join(temp_dir, 'data', stem + suffix)
+                if os.path.exists(path):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        lines = [line for line in f.read().splitlines() if line]
+                    if len(decode_lines(lines)) != len(lines) or any(not line.startswith('{') for line in lines):
+                        problems.append(f"corrupt lines in {stem}{suffix}")
+        orders = ChangeLog(os.path.join(temp_dir, 'data', 'orders.txt'), 'order_id').read()
+        users = ChangeLog(os.path.join(temp_dir, 'data', 'users.txt'), 'user_id').read()
+        order_lines = read_records(os.path.join(temp_dir, 'data', 'orders.txt'))
+        if len({order['order_id'] for order in order_lines}) != len(order_lines):
+            problems.append("duplicate order ids")
+        expected_deletions = processes * (operations // 10) # Every tenth order of each process
+        if deleted != expected_deletions:
+            problems.append(f"{deleted} orders deleted, expected {expected_deletions}")
+        if len(orders) != created - expected_deletions:
+            problems.append(f"{len(orders)} live orders, expected {created - expected_deletions}")
+        stress_users = [user for user in users if user.get('user_name', '').startswith('stress_')]
+        if len(stress_users) != processes or any(user['user_email'] == 'stress@test.com' for user in stress_users):
+            problems.append("lost customer registrations or profile updates")
+
+        print(f"processes: {processes}, orders per process: {operations}")
+        print(f"writes             : {writes} ({created} orders, {deleted} deletions, {2 * processes} user writes)")
+        print(f"elapsed            : {seconds:8.3f}s  {writes / seconds:10,.0f} writes/s")
+        print(f"result             : " + ("OK, no lost or corrupt records" if not problems else '; '.join(problems)))
+
+
+async def _service_client(port, client, requests, products, latencies, failures):
+    """One load-test client: `requests` mixed calls over a single keep-alive connection."""
+    import asyncio
+    import json
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    user_name = 'load_' + ''.join(chr(ord('a') + int(digit)) for digit in str(client))
+    calls = [('POST', '/register', {'user_name': user_name, 'user_password': 'load123',
+                                    'user_email': 'load@test.com', 'user_mobile': '0412345678'}),
+             ('POST', '/login', {'user_name': user_name, 'user_password': 'load123'})]
+    token = None
+    for i in range(requests):
+        if i < len(calls):
+            method, path, body = calls[i]
+        elif i % 5 == 0:
+            method, path, body = 'GET', f"/products?page={random.randint(1, 50)}", None
+        elif i % 5 == 1:
+            method, path, body = 'GET', '/products?keyword=' + random.choice(['ring', 'dress', 'robe', 'sac']), None
+        elif i % 5 == 2:
+            method, path, body = 'POST', '/orders', {'product_id': random.choice(products)}
+        elif i % 5 == 3:
+            method, path, body = 'GET', '/orders?page=1', None
+        else:
+            method, path, body = 'POST', '/login', {'user_name': user_name, 'user_password': 'load123'}
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        start = time.perf_counter()
+        authorization = f"Authorization: Bearer {token}\r\n" if token else ''
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n{authorization}Content-Length: {len(payload)}\r\n\r\n"
+                     .encode('latin-1') + payload)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while (line := await reader.readline()).strip():
+            if line.lower().startswith(b'content-length:'):
+                length = int(line.split(b':')[1])
+        result = json.loads(await reader.readexactly(length))
+        latencies.append(time.perf_counter() - start)
+        if status >= 400:
+            failures.append(f"{method} {path}: {status} {result.get('error')}")
+        elif path == '/login':
+            token = result['token']
+    writer.close()
+
+
+def bench_service(clients, requests):
+    """Starts service.py on a free port and measures throughput and latency with concurrent keep-alive clients."""
+    import asyncio
+    import shutil
+    import statistics
+    import subprocess
+    import sys
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if os.path.isdir('data/product'):
+            shutil.copytree('data/product', os.path.join(temp_dir, 'data', 'product'))
+        service = subprocess.Popen([sys.executable, os.path.join(package_dir, 'service.py'), '--port', '0'],
+                                   cwd=temp_dir, stdout=subprocess.PIPE, text=True,
+                                   env={**os.environ, 'PYTHONPATH': package_dir})
+        try:
+            port = int(service.stdout.readline().rsplit(':', 1)[1])
+            products = [record['pro_id'] for record in read_records(os.path.join(temp_dir, 'data', 'products.txt'))]
+
+            async def run_clients():
+                await asyncio.gather(*(_service_client(port, client, requests, products, latencies, failures)
+                                       for client in range(clients)))
+
+            latencies, failures = [], []
+            start = time.perf_counter()
+            asyncio.run(run_clients())
+            seconds = time.perf_counter() - start
+        finally:
+            service.terminate()
+            service.wait()
+
+        latencies.sort()
+        print(f"clients: {clients}, requests per client: {requests}")
+        print(f"throughput   : {len(latencies) / seconds:10,.0f} requests/s ({len(latencies)} in {seconds:.2f}s)")
+        print(f"latency p50  : {statistics.median(latencies) * 1000:10.2f} ms")
+        print(f"latency p99  : {latencies[int(len(latencies) * 0.99) - 1] * 1000:10.2f} ms")
+        print(f"failures     : {len(failures)}" + (f" (first: {failures[0]})" if failures else ""))
+
+
+def _time_to_first_menu(root_dir):
+    """Starts main.py in root_dir and returns the seconds until the first menu is printed."""
+    import subprocess
+    import sys
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(package_dir, 'main.py')], cwd=root_dir,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+                               env={**os.environ, 'PYTHONPATH': package_dir})
+    for line in process.stdout:
+        if line.startswith('3. Quit'):
+            break
+    seconds = time.perf_counter() - start
+    process.communicate('3\n')
+    return seconds
+
+
+def bench_startup(users, runs):
+    """Measures the time from starting main.py to its first menu, with `users` registered users."""
+    import shutil
+    import statistics
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = os.path.join(temp_dir, 'data')
+        if os.path.isdir('data/product'):
+            shutil.copytree('data/product', os.path.join(data_dir, 'product'))
+        os.makedirs(data_dir, exist_ok=True)
+        write_records(os.path.join(data_dir, 'users.txt'), [
+            {'user_id': f"u_{i:010d}", 'user_name': 'admin' if i == 0 else f"user_{i}",
+             'user_password': 'x', 'user_register_time': '01-01-2026_00:00:00',
+             'user_role': 'admin' if i == 0 else 'customer', 'user_email': 'a@b.com', 'user_mobile': '0412345678'}
+            for i in range(users)])
+
+        first_seconds = _time_to_first_menu(temp_dir) # Ingests the products and builds the indexes
+        timings = [_time_to_first_menu(temp_dir) for _ in range(runs)]
+
+        print(f"users: {users}, runs: {runs}")
+        print(f"first start (catalog ingestion): {first_seconds:8.3f}s")
+        print(f"time to first menu, median     : {statistics.median(timings):8.3f}s")
+        print(f"time to first menu, best       : {min(timings):8.3f}s")
+
+
+SCALE_SIZES = (10_000, 100_000, 1_000_000, 10_000_000)
+SCALE_PASSWORD = 'scale123'
+SCALE_CUSTOMER = ('user_1', 'u_0000000001') # Owns every 1000th order of a generated dataset
+SCALE_FIGURES = ('generate_category_figure', 'generate_discount_figure', 'generate_likes_count_figure',
+                 'generate_discount_likes_count_figure', 'generate_single_customer_consumption_figure',
+                 'generate_all_customers_consumption_figure', 'generate_all_top_10_best_sellers_figure')
+
+
+def _letters(number):
+    """Spells a number with letters (0 -> 'a', 1 -> 'b', ...), for user names that must not contain digits."""
+    return ''.join(chr(ord('a') + int(digit)) for digit in str(number))
+
+
+def generate_scale_dataset(root_dir, rows, seed=0):
+    """
+    Writes a synthetic dataset of `rows` users, `rows` source products and `rows` orders into
+    root_dir/data. The products are split over one CSV per category in data/product/, like the
+    shipped sources; data/products.txt is left to extract_products_from_files. The same rows and
+    seed always give the same files, and they are written in chunks so that even 10M rows never
+    sit in memory at once.
+    """
+    import csv
+    from contextlib import ExitStack
+    from user_operation import UserOperation
+
+    random.seed(seed)
+    data_dir = os.path.join(root_dir, 'data')
+    os.makedirs(os.path.join(data_dir, 'product'), exist_ok=True)
+    password = UserOperation().encrypt_password(SCALE_PASSWORD) # Reproducible as well, since random is seeded
+    chunk = 100_000
+
+    with open(os.path.join(data_dir, 'users.txt'), 'w', encoding='utf-8') as f:
+        for start in range(0, rows, chunk):
+            f.write(''.join(encode_record({
+                'user_id': f"u_{i:010d}", 'user_name': 'admin' if i == 0 else f"user_{i}",
+                'user_password': password, 'user_register_time': '01-01-2026_00:00:00',
+                'user_role': 'admin' if i == 0 else 'customer', 'user_email': f"user_{i}@test.com",
+                'user_mobile': f"04{i % 10**8:08d}"}) + '\n' for i in range(start, min(start + chunk, rows))))
+
+    columns = ['id', 'model', 'category', 'name', 'current_price', 'raw_price', 'discount', 'likes_count']
+    with ExitStack() as stack:
+        writers = {}
+        for i in range(rows):
+            product = _sample_product(i)
+            category = product['pro_category']
+            if category not in writers:
+                f = stack.enter_context(open(os.path.join(data_dir, 'product', f"{category}.csv"), 'w',
+                                             encoding='utf-8', newline=''))
+                writers[category] = csv.writer(f)
+                writers[category].writerow(columns)
+            writers[category].writerow([product['pro_' + column] for column in columns])
+
+    first_time = time.mktime((2024, 1, 1, 0, 0, 0, 0, 0, -1))
+    with open(os.path.join(data_dir, 'orders.txt'), 'w', encoding='utf-8') as f:
+        for start in range(0, rows, chunk):
+            f.write(''.join(encode_record({
+                'order_id': f"o_{i:05d}",
+                'user_id': SCALE_CUSTOMER[1] if i % 1000 == 0 else f"u_{random.randrange(1, rows):010d}",
+                'pro_id': str(1000000 + random.randrange(rows)),
+                'order_time': time.strftime("%d-%m-%Y_%H:%M:%S",
+                                            time.localtime(first_time + random.randrange(2 * 365 * 86400)))})
+                + '\n' for i in range(start, min(start + chunk, rows))))
+
+
+def _scale_worker(root_dir, rows, repeat):
+    """
+    Times every operation on the generated dataset in root_dir. Runs in a fresh process per
+    dataset, so no cache or index of another size is reused. Returns {operation: {'cold', 'warm'}}
+    in seconds: cold is the first call, which loads or builds the caches, indexes and figures it
+    needs; warm is the median of the `repeat` calls after it (extraction then finds the sources
+    unchanged, as on a normal restart). A figure's warm calls render the PNG again, its entry in
+    the figure cache being dropped before each one; figures also report 'cached', the median of
+    the calls the figure cache answers without rendering.
+    """
+    import statistics
+    os.chdir(root_dir)
+    from customer_operation import CustomerOperation
+    from figure_cache import get_figure_cache
+    from order_operation import OrderOperation
+    from product_operation import ProductOperation
+    from user_operation import UserOperation
+
+    user_op, cust_op, prod_op, order_op = UserOperation(), CustomerOperation(), ProductOperation(), OrderOperation()
+    user_name, customer_id = SCALE_CUSTOMER
+    new_user_names = (f"scale_{_letters(n)}" for n in range(repeat + 1))
+    deleted_order_ids = (f"o_{i:05d}" for i in range(1, rows, 2))
+    operations = [
+        ('extract_products_from_files', prod_op.extract_products_from_files),
+        ('login', lambda: user_op.login(user_name, SCALE_PASSWORD)),
+        ('get_product_list', lambda: prod_op.get_product_list(max(1, rows // 20))),
+        ('get_product_list_by_keyword', lambda: prod_op.get_product_list_by_keyword('ring')),
+        ('get_order_list', lambda: order_op.get_order_list(customer_id, 1)),
+        ('register_customer', lambda: cust_op.register_customer(next(new_user_names), 'scale123',
+                                                                 'scale@test.com', '0412345678')),
+        ('delete_order', lambda: order_op.delete_order(next(deleted_order_ids))),
+    ]
+    for name in SCALE_FIGURES:
+        if name == 'generate_single_customer_consumption_figure':
+            operations.append((name, lambda: order_op.generate_single_customer_consumption_figure(customer_id)))
+        else:
+            operations.append((name, getattr(prod_op if hasattr(prod_op, name) else order_op, name)))
+
+    figure_cache = get_figure_cache(order_op.figure_path)
+
+    def rendered(function):
+        """Times a figure method with its figure cache entries dropped first, so it really renders."""
+        figure_cache.invalidate()
+        return _timed(function)[1]
+
+    timings = {}
+    for name, function in operations:
+        result, cold_seconds = _timed(function)
+        if name in ('login', 'register_customer', 'delete_order') and not result:
+            raise RuntimeError(f"{name} failed on the generated dataset")
+        if name in SCALE_FIGURES:
+            timings[name] = {'cold': cold_seconds,
+                             'warm': statistics.median(rendered(function) for _ in range(repeat)),
+                             'cached': statistics.median(_timed(function)[1] for _ in range(repeat))}
+        else:
+            timings[name] = {'cold': cold_seconds,
+                             'warm': statistics.median(_timed(function)[1] for _ in range(repeat))}
+    return timings
+
+
+def _compare_with_baseline(results, baseline, tolerance, noise=0.005):
+    """
+    Prints every timing against the same timing of a baseline report and returns the number of
+    regressions: timings more than `tolerance` (a fraction) and at least `noise` seconds slower
+    than the baseline, so that millisecond jitter is not flagged.
+    """
+    regressions = 0
+    print(f"{'rows':>10}  {'operation':45} {'':6}  {'baseline':>10}  {'now':>10}  {'ratio':>6}")
+    for rows, timings in results.items():
+        for name, seconds in timings.items():
+            for kind in seconds:
+                before = baseline.get(rows, {}).get(name, {}).get(kind)
+                if before is None:
+                    continue
+                now = seconds[kind]
+                regressed = now > before * (1 + tolerance) and now - before >= noise
+                regressions += regressed
+                print(f"{rows:>10}  {name:45} {kind:6}  {before:10.4f}  {now:10.4f}  {now / max(before, 1e-9):6.2f}"
+                      + ("  REGRESSION" if regressed else ""))
+    return regressions
+
+
+def bench_scale(sizes, repeat, seed, output, baseline, tolerance):
+    """
+    Generates a dataset of every size and times each operation on it (see _scale_worker).
+    The report is written as JSON to `output`; with a `baseline` report the timings are compared
+    against it. Returns the number of regressions found.
+    """
+    import json
+    import platform
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    results = {}
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            _, generate_seconds = _timed(generate_scale_dataset, temp_dir, rows, seed)
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                timings = pool.submit(_scale_worker, temp_dir, rows, repeat).result()
+        results[str(rows)] = timings
+        print(f"rows: {rows} (generated in {generate_seconds:.1f}s), warm calls: {repeat}")
+        for name, seconds in timings.items():
+            print(f"  {name:45} cold {seconds['cold']:10.4f}s  warm {seconds['warm']:10.4f}s"
+                  + (f"  cached {seconds['cached']:10.4f}s" if 'cached' in seconds else ""))
+
+    report = {'seed': seed, 'repeat': repeat, 'python': platform.python_version(),
+              'platform': platform.platform(), 'created': time.strftime("%d-%m-%Y_%H:%M:%S"), 'results': results}
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {output}")
+    if baseline:
+        with open(baseline, 'r', encoding='utf-8') as f:
+            baseline_results = json.load(f)['results']
+        regressions = _compare_with_baseline(results, baseline_results, tolerance)
+        print(f"regressions: {regressions} (tolerance {tolerance:.0%})")
+        return regressions
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="E-Commerce platform benchmarks.")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    codec_parser = subparsers.add_parser('codec', help="Parse throughput: eval() vs record codec.")
+    codec_parser.add_argument('--rows', type=int, default=1_000_000)
+
+    columnar_parser = subparsers.add_parser('columnar', help="Analytics load: dicts vs typed columnar store.")
+    columnar_parser.add_argument('--rows', type=int, default=1_000_000)
+
+    ingest_parser = subparsers.add_parser('ingest', help="Product extraction: iterrows vs parallel pruned parse.")
+    ingest_parser.add_argument('--rows', type=int, default=1_000_000)
+    ingest_parser.add_argument('--workers', type=int, default=None)
+
+    stream_parser = subparsers.add_parser('stream', help="Product extraction peak memory: in-memory vs streaming.")
+    stream_parser.add_argument('--rows', type=int, default=1_000_000)
+    stream_parser.add_argument('--memory-budget', type=int, default=64 * 2**20, help="Bytes per chunk.")
+
+    models_parser = subparsers.add_parser('models', help="Order/Product objects: per-instance dict vs __slots__.")
+    models_parser.add_argument('--rows', type=int, default=1_000_000)
+
+    concurrency_parser = subparsers.add_parser('concurrency', help="Many writer processes on the same data files.")
+    concurrency_parser.add_argument('--processes', type=int, default=8)
+    concurrency_parser.add_argument('--operations', type=int, default=500, help="Orders placed per process.")
+
+    service_parser = subparsers.add_parser('service', help="Load test of service.py on 127.0.0.1.")
+    service_parser.add_argument('--clients', type=int, default=50)
+    service_parser.add_argument('--requests', type=int, default=200, help="Requests per client.")
+
+    startup_parser = subparsers.add_parser('startup', help="Time from starting main.py to the first menu.")
+    startup_parser.add_argument('--users', type=int, default=100_000)
+    startup_parser.add_argument('--runs', type=int, default=5)
+
+    scale_parser = subparsers.add_parser('scale', help="Every operation on generated datasets of growing size.")
+    scale_parser.add_argument('--rows', type=int, nargs='+', default=list(SCALE_SIZES),
+                              help="Dataset sizes (users, products and orders each).")
+    scale_parser.add_argument('--repeat', type=int, default=5, help="Warm calls timed after the first one.")
+    scale_parser.add_argument('--seed', type=int, default=0)
+    scale_parser.add_argument('--output', default='scale_results.json', help="JSON report to write.")
+    scale_parser.add_argument('--baseline', help="JSON report of an earlier run to compare against.")
+    scale_parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slow-down, e.g. 0.25 for 25%%.")
+
+    args = parser.parse_args()
+    if args.benchmark == 'codec':
+        bench_codec(args.rows)
+    elif args.benchmark == 'columnar':
+        bench_columnar(args.rows)
+    elif args.benchmark == 'ingest':
+        bench_ingest(args.rows, args.workers)
+    elif args.benchmark == 'stream':
+        bench_stream(args.rows, args.memory_budget)
+    elif args.benchmark == 'models':
+        bench_models(args.rows)
+    elif args.benchmark == 'concurrency':
+        bench_concurrency(args.processes, args.operations)
+    elif args.benchmark == 'service':
+        bench_service(args.clients, args.requests)
+    elif args.benchmark == 'startup':
+        bench_startup(args.users, args.runs)
+    elif args.benchmark == 'scale':
+        if bench_scale(args.rows, args.repeat, args.seed, args.output, args.baseline, args.tolerance):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
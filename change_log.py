@@ -0,0 +1,255 @@
+# File: change_log.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the ChangeLog class, an append-only mutation log over a data file.
+
+import os
+import threading
+from record_cache import record_cache, file_signature
+from record_codec import write_records
+from file_lock import file_lock, temp_path_for
+
+
+class ChangeLog:
+    """
+    Records single-record edits of a data file (data/users.txt, data/orders.txt) as
+    upsert/tombstone entries appended to a log file next to it (data/users.log, ...),
+    so an edit costs O(1) I/O instead of a full rewrite.
+    Reads merge the log over the base file. Once the log grows past compaction_threshold
+    bytes it is folded back into the base file by a background thread.
+    The base file and its log share one file_lock: reads hold it shared and writes exclusive,
+    always taken before the in-memory lock, so several processes can use the files at once.
+    """
+    compaction_threshold = 256 * 1024  # Log size in bytes that triggers a compaction
+
+    def __init__(self, file_path, key_field, compaction_threshold=None):
+        """
+        Constructs the log of the given data file.
+
+        Args:
+            file_path (str): Path of the base data file.
+            key_field (str): Name of the primary key of the records (e.g. 'user_id').
+            compaction_threshold (int): Optional override of the class-wide threshold in bytes.
+        """
+        self.file_path = file_path
+        self.key_field = key_field
+        self.log_file_path = os.path.splitext(file_path)[0] + '.log'
+        if compaction_threshold is not None:
+            self.compaction_threshold = compaction_threshold
+        self._lock = threading.RLock()
+        self._compaction_thread = None
+        self._view = None            # key -> record, in file order
+        self._view_list = None       # Cached list(self._view.values())
+        self._view_signature = None  # (base signature, log signature) the view was built from
+        self._pending = None         # (log signature, {key: record or None})
+
+    def _signatures(self):
+        """Returns the current signatures of the base file and of the log file."""
+        return (file_signature(self.file_path), file_signature(self.log_file_path))
+
+    def pending(self):
+        """
+        Returns {key: record or None} with the latest log entry of every key
+        (None marks a deleted record). Only the log file is read, never the base file.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            return self._read_pending()
+
+    def _read_pending(self):
+        """Returns pending() from the cache, re-reading the log if it changed. Called with the locks held."""
+        log_signature = file_signature(self.log_file_path)
+        if self._pending is not None and self._pending[0] == log_signature:
+            return self._pending[1]
+        changes = {}
+        for entry in record_cache.load(self.log_file_path):
+            if entry.get('op') == 'upsert':
+                changes[entry['record'][self.key_field]] = entry['record']
+            elif entry.get('op') == 'delete':
+                changes[entry['key']] = None
+        self._pending = (log_signature, changes)
+        return changes
+
+    def _ensure_view(self):
+        """Builds the merged view of base file plus log if it is missing or out of date."""
+        signature = self._signatures()
+        if self._view is not None and self._view_signature == signature:
+            return
+        view = {}
+        for record in record_cache.load(self.file_path):
+            key = record.get(self.key_field)
+            if key not in view:
+                view[key] = record
+        for key, record in self._read_pending().items():
+            if record is None:
+                view.pop(key, None)
+            else:
+                view[key] = record
+        self._view = view
+        self._view_list = None
+        self._view_signature = signature
+
+    def _view_is_current(self):
+        """Checks whether the in-memory view still matches both files on disk."""
+        return self._view is not None and self._view_signature == self._signatures()
+
+    def read(self):
+        """
+        Returns the merged records (read-only, shared with other callers).
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            self._ensure_view()
+            if self._view_list is None:
+                self._view_list = list(self._view.values())
+            return self._view_list
+
+    def get(self, key):
+        """
+        Returns the current record with the given key, or None.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            self._ensure_view()
+            return self._view.get(key)
+
+    def contains(self, key):
+        """
+        Checks whether a live record with the given key exists.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            self._ensure_view()
+            return key in self._view
+
+    def append(self, records):
+        """
+        Appends new records to the base file. Returns the byte offset of each record.
+        """
+        records = list(records)
+        with file_lock(self.file_path), self._lock:
+            was_current = self._view_is_current()
+            offsets = record_cache.append(self.file_path, records)
+            if was_current and records:
+                for record in record_cache.load(self.file_path)[-len(records):]:
+                    self._view.setdefault(record.get(self.key_field), record)
+                self._view_list = None
+                self._view_signature = self._signatures()
+            return offsets
+
+    def _log(self, entry, key, record):
+        """Appends one entry to the log and applies it to the view if the view is current."""
+        with file_lock(self.file_path), self._lock:
+            was_current = self._view_is_current()
+            record_cache.append(self.log_file_path, [entry])
+            if was_current:
+                if record is None:
+                    self._view.pop(key, None)
+                else:
+                    self._view[key] = record
+                self._view_list = None
+                self._view_signature = self._signatures()
+        self.maybe_compact()
+
+    def upsert(self, record):
+        """
+        Records the new version of a record (inserted at the end if the key is new) in O(1).
+        """
+        record = dict(record)
+        self._log({'op': 'upsert', 'record': record}, record[self.key_field], record)
+
+    def delete(self, key):
+        """
+        Records a tombstone for the given key in O(1).
+        """
+        self._log({'op': 'delete', 'key': key}, key, None)
+
+    def rewrite(self, records):
+        """
+        Replaces the whole base file with the given records and discards the log.
+        """
+        with file_lock(self.file_path), self._lock:
+            write_records(self.file_path, records)
+            record_cache.invalidate(self.file_path)
+            record_cache.remove(self.log_file_path)
+            self._view = None
+
+    def remove(self):
+        """
+        Deletes the base file and the log.
+        """
+        with file_lock(self.file_path), self._lock:
+            record_cache.remove(self.file_path)
+            record_cache.remove(self.log_file_path)
+            self._view = None
+
+    def compact(self):
+        """
+        Folds the log into the base file. The new base file is written outside the lock;
+        records appended meanwhile are carried over, and log entries written meanwhile are
+        kept in the log (re-applying them is harmless because upserts and tombstones are
+        idempotent per key). If the base file was rewritten meanwhile the compaction is dropped.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            base_signature, log_signature = self._signatures()
+            if log_signature is None:
+                return
+            self._ensure_view()
+            snapshot = list(self._view.values())
+
+        temp_path = temp_path_for(self.file_path)
+        write_records(temp_path, snapshot)
+
+        with file_lock(self.file_path), self._lock:
+            current_base, current_log = self._signatures()
+            if base_signature is not None and (current_base is None or current_base[2] != base_signature[2]
+                                               or current_base[0] < base_signature[0]) \
+                    or current_log is None or current_log[2] != log_signature[2]:
+                os.remove(temp_path)
+                return
+
+            folded_base = base_signature[0] if base_signature else 0
+            if current_base is not None and current_base[0] > folded_base:
+                with open(self.file_path, 'rb') as source, open(temp_path, 'ab') as target:
+                    source.seek(folded_base)
+                    target.write(source.read())
+            with open(self.log_file_path, 'rb') as f:
+                f.seek(log_signature[0])
+                log_tail = f.read()
+
+            os.replace(temp_path, self.file_path)
+            if log_tail:
+                log_temp_path = temp_path_for(self.log_file_path)
+                with open(log_temp_path, 'wb') as f:
+                    f.write(log_tail)
+                os.replace(log_temp_path, self.log_file_path)
+            else:
+                os.remove(self.log_file_path)
+            record_cache.invalidate(self.file_path)
+            record_cache.invalidate(self.log_file_path)
+            self._view = None
+            self._pending = None
+
+    def maybe_compact(self):
+        """
+        Starts a background compaction if the log is over the threshold and none is running.
+        """
+        log_signature = file_signature(self.log_file_path)
+        if log_signature is None or log_signature[0] < self.compaction_threshold:
+            return
+        with self._lock:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return
+            # Not a daemon thread, so the interpreter waits for a running compaction at exit
+            self._compaction_thread = threading.Thread(target=self.compact, name='change-log-compaction')
+            self._compaction_thread.start()
+
+
+_logs = {}
+_logs_guard = threading.Lock()
+
+
+def get_change_log(file_path, key_field):
+    """
+    Returns the shared ChangeLog of the given data file.
+    """
+    with _logs_guard:
+        if file_path not in _logs:
+            _logs[file_path] = ChangeLog(file_path, key_field)
+        return _logs[file_path]
@@ -0,0 +1,146 @@
+# File: columnar_store.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the columnar, typed copies of the product and order data used for analytics.
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+from change_log import get_change_log
+from record_cache import record_cache, file_signature, sidecar_path
+from file_lock import temp_path_for
+
+# Value stored in an int64 time column for a missing/unparsable time; it reads back as NaT
+MISSING_TIME = np.iinfo(np.int64).min
+
+
+def _flat_signature(*signatures):
+    """Turns one or more file signatures (or None) into a flat int64 array for storage."""
+    return np.array([value for signature in signatures for value in (signature or (-1, -1, -1))], dtype=np.int64)
+
+
+class ColumnarStore:
+    """
+    Keeps a typed, column-per-array copy of a data file in data/index/<file>.columns.npz,
+    tagged with the signature of the text files it was built from. The columns are rebuilt
+    (and re-saved) only when those files change, and are memoised in-process as well.
+    """
+    def __init__(self, file_path, signature_paths, read_records, build_columns):
+        """
+        Constructs the store.
+
+        Args:
+            file_path (str): Path of the text data file the columns are built from.
+            signature_paths (list): Files whose signatures decide whether the columns are current.
+            read_records (callable): Returns the current records of the data file.
+            build_columns (callable): Turns the records into a dict of NumPy arrays.
+        """
+        self.file_path = file_path
+        self.store_file_path = os.path.splitext(sidecar_path(file_path, 'columns'))[0] + '.npz'
+        self.signature_paths = signature_paths
+        self.read_records = read_records
+        self.build_columns = build_columns
+        self._memo = None  # (signature, columns), swapped as one so concurrent readers never mix them
+
+    def load(self):
+        """
+        Returns the columns as a dict of NumPy arrays (read-only, shared with other callers).
+        """
+        signature = _flat_signature(*(file_signature(path) for path in self.signature_paths))
+        memo = self._memo
+        if memo is not None and np.array_equal(memo[0], signature):
+            return memo[1]
+
+        columns = self._load_file(signature)
+        if columns is None:
+            columns = self.build_columns(self.read_records())
+            os.makedirs(os.path.dirname(self.store_file_path), exist_ok=True)
+            temp_path = temp_path_for(self.store_file_path) + '.npz'
+            np.savez(temp_path, _signature=signature, **columns)
+            os.replace(temp_path, self.store_file_path)
+
+        self._memo = (signature, columns)
+        return columns
+
+    def _load_file(self, signature):
+        """Loads the persisted columns if they were built from the current files."""
+        try:
+            with np.load(self.store_file_path, allow_pickle=False) as data:
+                if not np.array_equal(data['_signature'], signature):
+                    return None
+                return {name: data[name] for name in data.files if name != '_signature'}
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def _numeric(values, dtype):
+    """Converts a list of raw values to a typed array; unparsable values become NaN (or 0 for ints)."""
+    numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+    if np.issubdtype(dtype, np.integer):
+        numbers = numbers.fillna(0)
+    return numbers.to_numpy(dtype=dtype)
+
+
+def build_product_columns(products):
+    """
+    Builds the product columns: string ids/names, categorical codes for pro_category,
+    float64 prices and discount, int64 likes.
+    """
+    categories, category_codes = np.unique(np.array([str(p.get('pro_category', '')) for p in products], dtype=str),
+                                           return_inverse=True)
+    return {
+        'pro_id': np.array([str(p.get('pro_id', '')) for p in products], dtype=str),
+        'pro_name': np.array([str(p.get('pro_name', '')) for p in products], dtype=str),
+        'pro_category_code': category_codes.astype(np.int32),
+        'pro_category_names': categories,
+        'pro_current_price': _numeric([p.get('pro_current_price') for p in products], np.float64),
+        'pro_raw_price': _numeric([p.get('pro_raw_price') for p in products], np.float64),
+        'pro_discount': _numeric([p.get('pro_discount') for p in products], np.float64),
+        'pro_likes_count': _numeric([p.get('pro_likes_count') for p in products], np.int64),
+    }
+
+
+def build_order_columns(orders):
+    """
+    Builds the order columns: string ids and the order time as int64 seconds since the epoch
+    (MISSING_TIME when it cannot be parsed).
+    """
+    times = pd.to_datetime(pd.Series([o.get('order_time') for o in orders], dtype=object),
+                           format='%d-%m-%Y_%H:%M:%S', errors='coerce')
+    epoch_seconds = times.to_numpy(dtype='datetime64[s]').astype(np.int64)
+    return {
+        'order_id': np.array([str(o.get('order_id', '')) for o in orders], dtype=str),
+        'user_id': np.array([str(o.get('user_id', '')) for o in orders], dtype=str),
+        'pro_id': np.array([str(o.get('pro_id', '')) for o in orders], dtype=str),
+        'order_time': epoch_seconds,
+    }
+
+
+_stores = {}
+_stores_guard = threading.Lock()
+
+
+def get_product_store(products_file_path):
+    """
+    Returns the shared ColumnarStore of the given products file.
+    """
+    key = ('products', products_file_path)
+    with _stores_guard:
+        if key not in _stores:
+            _stores[key] = ColumnarStore(products_file_path, [products_file_path],
+                                         lambda: record_cache.load(products_file_path), build_product_columns)
+        return _stores[key]
+
+
+def get_order_store(orders_file_path):
+    """
+    Returns the shared ColumnarStore of the given orders file (including edits pending in its change log).
+    """
+    key = ('orders', orders_file_path)
+    with _stores_guard:
+        if key not in _stores:
+            change_log = get_change_log(orders_file_path, 'order_id')
+            _stores[key] = ColumnarStore(orders_file_path, [orders_file_path, change_log.log_file_path],
+                                         change_log.read, build_order_columns)
+        return _stores[key]
@@ -0,0 +1,77 @@
+# File: compact_id_set.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the CompactIdSet class, a memory-efficient set of record ids.
+
+import numpy as np
+import pandas as pd
+
+
+class CompactIdSet:
+    """
+    Set of string ids used to drop duplicates while streaming large files.
+    Canonical decimal ids (like every pro_id in the source CSVs) are kept as sorted int64
+    arrays, 8 bytes per id instead of roughly 100 bytes for a str in a Python set. Any other
+    id falls back to an ordinary set.
+    Only the new ids of a batch are sorted; they become a new sorted run, and a run is merged
+    into the one before it once it reaches half its size. The runs keep geometrically growing
+    sizes, so there are only O(log n) of them to search and every id is merged O(log n) times,
+    instead of re-sorting the whole set on every batch.
+    """
+    def __init__(self):
+        """
+        Constructs an empty set.
+        """
+        self._runs = [] # Sorted int64 arrays of disjoint ids, each at least twice as long as the next
+        self._others = set()
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs) + len(self._others)
+
+    def _contains(self, numbers):
+        """Returns a boolean mask, True for every number already in one of the runs."""
+        seen = np.zeros(len(numbers), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, numbers)
+            in_range = positions < len(run)
+            seen[in_range] |= run[positions[in_range]] == numbers[in_range]
+        return seen
+
+    def _add_run(self, run):
+        """Adds a sorted array of numbers not in the set yet, merging the smallest runs as needed."""
+        self._runs.append(run)
+        while len(self._runs) > 1 and len(self._runs[-2]) < 2 * len(self._runs[-1]):
+            run = self._runs.pop()
+            previous = self._runs.pop()
+            # Linear merge of two sorted arrays: each number goes in front of the first larger one
+            self._runs.append(np.insert(previous, np.searchsorted(previous, run), run))
+
+    def add_new(self, ids):
+        """
+        Adds a batch of ids and reports which of them were not in the set yet.
+        Only the first occurrence of an id repeated within the batch counts as new.
+
+        Args:
+            ids (list): The ids (str) of the batch.
+
+        Returns:
+            numpy.ndarray: Boolean mask, True for every id that is new.
+        """
+        ids = pd.Series(ids, dtype=object).astype(str)
+        is_number = ids.str.fullmatch(r'0|[1-9][0-9]{0,17}').to_numpy()
+        is_new = np.zeros(len(ids), dtype=bool)
+
+        numbers = ids[is_number].astype(np.int64).to_numpy()
+        if len(numbers):
+            first = np.zeros(len(numbers), dtype=bool)
+            first[np.unique(numbers, return_index=True)[1]] = True
+            new = first & ~self._contains(numbers)
+            is_new[is_number] = new
+            if new.any():
+                self._add_run(np.sort(numbers[new]))
+
+        for position in np.flatnonzero(~is_number):
+            if ids.iat[position] not in self._others:
+                self._others.add(ids.iat[position])
+                is_new[position] = True
+        return is_new
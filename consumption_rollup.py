@@ -0,0 +1,245 @@
+# File: consumption_rollup.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the ConsumptionRollup class, the materialised customer x year x month consumption totals.
+
+import atexit
+import math
+import threading
+from datetime import datetime
+from change_log import get_change_log
+from file_lock import file_lock
+from offset_index import get_offset_index
+from record_cache import file_signature, sidecar_path, load_sidecar, save_sidecar
+from record_codec import as_record
+
+
+def bucket_of(order_time):
+    """
+    Returns the 'YYYY-MM' bucket of an order_time string ('DD-MM-YYYY_HH:MM:SS'),
+    or None if it cannot be parsed. Invalid dates such as '30-02-2026' are rejected too,
+    exactly as the rebuild drops them.
+    """
+    try:
+        order_time = datetime.strptime(order_time, '%d-%m-%Y_%H:%M:%S')
+    except (TypeError, ValueError):
+        return None
+    return f"{order_time.year:04d}-{order_time.month:02d}"
+
+
+def _price(product):
+    """Returns the current price of a product record as a float, or None if it is missing or not a number."""
+    try:
+        price = float(product.get('pro_current_price'))
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(price) else price
+
+
+class ConsumptionRollup:
+    """
+    Revenue (sum of the current price of the ordered products) and order count per
+    customer, year and month, so the consumption charts read a handful of precomputed
+    buckets instead of joining every order to its product.
+    The cube lives in data/index/orders.consumption.json with the signatures of
+    data/orders.txt, data/orders.log and data/products.txt. create_orders_bulk and
+    delete_order update it in place; any other change to those files (a compaction,
+    a product refresh) makes it rebuild from scratch on the next query.
+    """
+    def __init__(self, orders_file_path, products_file_path):
+        """
+        Constructs the rollup. Nothing is read until the first query.
+
+        Args:
+            orders_file_path (str): Path of the orders data file.
+            products_file_path (str): Path of the products data file the prices come from.
+        """
+        self.orders_file_path = orders_file_path
+        self.products_file_path = products_file_path
+        self.rollup_file_path = sidecar_path(orders_file_path, 'consumption')
+        self._change_log = get_change_log(orders_file_path, 'order_id')
+        self._signature = None
+        self._customers = {}  # user_id -> {'YYYY-MM': [revenue, order count]}
+        self._totals = {}     # 'YYYY-MM' -> [revenue, order count] over all customers
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+        self._save_registered = False
+
+    def _signatures(self):
+        """Returns the current signatures of the orders file, its change log and the products file."""
+        return [list(signature) if signature else None
+                for signature in (file_signature(self.orders_file_path),
+                                  file_signature(self._change_log.log_file_path),
+                                  file_signature(self.products_file_path))]
+
+    def is_current(self):
+        """
+        Checks whether the cube (loaded from its sidecar on first use) matches the files on disk.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            if not self._loaded:
+                self._loaded = True
+                data = load_sidecar(self.rollup_file_path)
+                if data is not None:
+                    self._signature = data.get('signature')
+                    self._customers = data['customers']
+                    self._totals = {}
+                    for buckets in self._customers.values():
+                        for bucket, (revenue, count) in buckets.items():
+                            self._add_to(self._totals, bucket, revenue, count)
+            return self._signature == self._signatures()
+
+    def _ensure_current(self):
+        """Rebuilds the cube if it no longer matches the data files."""
+        if not self.is_current():
+            self.rebuild()
+
+    def rebuild(self):
+        """
+        Rebuilds the cube from scratch from the typed order and product columns, and persists it.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            import pandas as pd # Only needed for a full rebuild
+            from analytics_engine import join_orders_to_products, order_months
+            from columnar_store import get_order_store, get_product_store
+
+            signature = self._signatures()
+            orders = get_order_store(self.orders_file_path).load()
+            products = get_product_store(self.products_file_path).load()
+            self._customers = {}
+            self._totals = {}
+            if len(orders['order_id']) and len(products['pro_id']):
+                keep, product_positions, prices = join_orders_to_products(products, orders)
+                cells = (pd.DataFrame({'user_id': orders['user_id'][keep], 'month': order_months(orders['order_time'][keep]),
+                                       'price': prices})
+                         .groupby(['user_id', 'month'])['price'].agg(['sum', 'count']))
+                for (user_id, month), revenue, count in zip(cells.index, cells['sum'], cells['count']):
+                    bucket = f"{1970 + month // 12:04d}-{month % 12 + 1:02d}"
+                    self._customers.setdefault(str(user_id), {})[bucket] = [round(float(revenue), 2), int(count)]
+                    self._add_to(self._totals, bucket, float(revenue), int(count))
+            self._signature = signature
+            self._loaded = True
+            self._dirty = True
+            self.save()
+
+    @staticmethod
+    def _add_to(buckets, bucket, revenue, count):
+        """Adds revenue and count to one bucket, dropping the bucket once it holds no orders."""
+        cell = buckets.setdefault(bucket, [0.0, 0])
+        cell[0] = round(cell[0] + revenue, 2)
+        cell[1] += count
+        if cell[1] <= 0:
+            del buckets[bucket]
+
+    def _apply(self, orders, sign):
+        """Adds (sign 1) or removes (sign -1) the given order records to/from the cube."""
+        product_index = get_offset_index(self.products_file_path, 'pro_id')
+        pro_ids = list({str(order.get('pro_id')) for order in orders}) # Catalog pro_ids are strings
+        prices = {product.get('pro_id'): _price(product) for product in product_index.find_many(pro_ids)}
+        for order in orders:
+            price = prices.get(str(order.get('pro_id')))
+            bucket = bucket_of(order.get('order_time'))
+            if price is None or bucket is None:
+                continue
+            user_id = order.get('user_id')
+            customer = self._customers.setdefault(user_id, {})
+            self._add_to(customer, bucket, sign * price, sign)
+            if not customer:
+                del self._customers[user_id]
+            self._add_to(self._totals, bucket, sign * price, sign)
+
+    def save(self):
+        """
+        Persists the in-memory cube if it has changed since it was last written.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            if not self._dirty:
+                return
+            save_sidecar(self.rollup_file_path, {'signature': self._signature, 'customers': self._customers})
+            self._dirty = False
+
+    def _mark_changed(self):
+        """Records the new file signatures after an in-place update and schedules a save."""
+        self._signature = self._signatures()
+        self._dirty = True
+        if not self._save_registered:
+            self._save_registered = True
+            atexit.register(self.save)
+
+    def orders_appended(self, orders, was_current):
+        """
+        Adds freshly created orders to their buckets.
+
+        Args:
+            orders (list): The appended Order objects or dicts.
+            was_current (bool): Whether is_current() held right before the append.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            if not was_current:
+                return # The signatures no longer match, so the next query rebuilds the cube
+            self._apply([as_record(order) for order in orders], 1)
+            self._mark_changed()
+
+    def order_deleted(self, order, was_current):
+        """
+        Removes a deleted order from its bucket.
+
+        Args:
+            order (dict): The record of the deleted order.
+            was_current (bool): Whether is_current() held right before the tombstone was logged.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            if not was_current:
+                return
+            self._apply([order], -1)
+            self._mark_changed()
+
+    def monthly_consumption(self, user_id=None):
+        """
+        Returns the consumption per month of one customer, or of all customers if no user_id is given.
+
+        Returns:
+            list: (year, month, revenue, order count) tuples in chronological order,
+                  with every month between the first and the last order (empty months as 0).
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            buckets = self._totals if user_id is None else self._customers.get(user_id, {})
+            if not buckets:
+                return []
+            first, last = min(buckets), max(buckets)
+            year, month = int(first[:4]), int(first[5:])
+            months = []
+            while f"{year:04d}-{month:02d}" <= last:
+                revenue, count = buckets.get(f"{year:04d}-{month:02d}", [0.0, 0])
+                months.append((year, month, revenue, count))
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            return months
+
+
+def consumption_series(months):
+    """
+    Turns the result of ConsumptionRollup.monthly_consumption into a pandas Series of revenue
+    labelled 'Jan 2026', 'Feb 2026', ... for the consumption charts.
+    """
+    import calendar
+    import pandas as pd
+
+    return pd.Series([revenue for year, month, revenue, count in months],
+                     index=[f"{calendar.month_abbr[month]} {year}" for year, month, revenue, count in months],
+                     name='pro_current_price')
+
+
+_rollups = {}
+_rollups_guard = threading.Lock()
+
+
+def get_consumption_rollup(orders_file_path, products_file_path):
+    """
+    Returns the shared ConsumptionRollup of the given orders file.
+    """
+    with _rollups_guard:
+        if orders_file_path not in _rollups:
+            _rollups[orders_file_path] = ConsumptionRollup(orders_file_path, products_file_path)
+        return _rollups[orders_file_path]
@@ -1,6 +1,6 @@
 # File: customer.py
 # Creation Date: 19/04/2025
-# Last Modified Date: 19/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This file contains the Customer class, which inherits from the User class.
 
 from user import User
@@ -9,6 +9,9 @@ class Customer(User):
     """
     Represents a customer in the e-commerce system, inheriting from User.
     """
+    __slots__ = ('user_email', 'user_mobile')
+    FIELDS = User.FIELDS + __slots__
+
     def __init__(self, user_id="", user_name="", user_password="",
                  user_register_time="00-00-0000_00:00:00", user_role="customer",
                  user_email="", user_mobile=""):
@@ -28,16 +31,11 @@ class Customer(User):
         self.user_email = user_email
         self.user_mobile = user_mobile
 
-    def __str__(self):
+    def to_record(self):
         """
-        Returns the customer information as a formatted string dictionary.
-
-        Returns:
-            str: A string representation of the Customer object.
+        Returns the customer information as the dict stored in data/users.txt.
         """
-        user_dict = super().__str__()
-        # The parent __str__ returns a string representation of a dict, so we need to evaluate it
-        user_data = eval(user_dict)
+        user_data = super().to_record()
         user_data['user_email'] = self.user_email
         user_data['user_mobile'] = self.user_mobile
-        return str(user_data)
+        return user_data
@@ -1,6 +1,6 @@
 # File: customer_operation.py
 # Creation Date: 20/04/2025
-# Last Modified Date: 20/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This file contains the CustomerOperation class.
 
 import re
@@ -9,6 +9,10 @@ import time
 import math
 from customer import Customer
 from user_operation import UserOperation
+from change_log import get_change_log
+from file_lock import file_lock
+from user_index import get_user_index
+from offset_index import get_offset_index
 
 class CustomerOperation:
     """
@@ -25,20 +29,15 @@ class CustomerOperation:
                 pass
             return []
         
-        with open(self.users_file_path, 'r', encoding='utf-8') as f:
-            users = []
-            for line in f:
-                try:
-                    users.append(eval(line.strip()))
-                except:
-                    continue
-            return users
+        return get_change_log(self.users_file_path, 'user_id').read()
+
+    def _customer_index(self):
+        """Helper method returning the byte-offset index of the customer records in users.txt."""
+        return get_offset_index(self.users_file_path, 'user_id', 'customer-offsets', ('user_role', 'customer'))
 
     def _write_users(self, users_list):
-        """Helper method to write a list of users back to the file."""
-        with open(self.users_file_path, 'w', encoding='utf-8') as f:
-            for user in users_list:
-                f.write(str(user) + '\n')
+        """Helper method to write a list of users back to the file (this also folds in data/users.log)."""
+        get_change_log(self.users_file_path, 'user_id').rewrite(users_list)
 
     def validate_email(self, user_email):
         """
@@ -66,7 +65,7 @@ class CustomerOperation:
         if not self.validate_email(user_email): return False
         if not self.validate_mobile(user_mobile): return False
 
-        # All checks passed, proceed with registration
+        # All checks passed, proceed with registration (the id is allocated before the users file is locked)
         new_customer = Customer(
             user_id=user_op.generate_unique_user_id(),
             user_name=user_name,
@@ -76,8 +75,12 @@ class CustomerOperation:
             user_mobile=user_mobile
         )
 
-        with open(self.users_file_path, 'a', encoding='utf-8') as f:
-            f.write(str(new_customer) + '\n')
+        # Another process may have registered the same username since the check above
+        with file_lock(self.users_file_path):
+            if user_op.check_username_exist(user_name): return False
+            offsets = get_change_log(self.users_file_path, 'user_id').append([new_customer])
+            get_user_index(self.users_file_path).records_appended([new_customer], offsets)
+            self._customer_index().records_appended([new_customer], offsets)
             
         return True
 
@@ -85,72 +88,89 @@ class CustomerOperation:
         """
         Updates the given customer object's attribute value.
         """
-        all_users = self._read_users()
-        user_found = False
-
-        for i, user_data in enumerate(all_users):
-            if user_data['user_id'] == customer_object.user_id:
-                # Validate the new value before updating
-                if attribute_name == 'user_password' and not UserOperation().validate_password(value):
-                    return False
-                if attribute_name == 'user_email' and not self.validate_email(value):
-                    return False
-                if attribute_name == 'user_mobile' and not self.validate_mobile(value):
-                    return False
-
-                # Encrypt password if it's being updated
-                if attribute_name == 'user_password':
-                    value = UserOperation().encrypt_password(value)
-                
-                # Update the attribute in the dictionary
-                all_users[i][attribute_name] = value
-                
-                # Also update the attribute in the passed customer_object
-                setattr(customer_object, attribute_name, value)
-                
-                user_found = True
-                break
+        if attribute_name not in Customer.FIELDS:
+            return False
+
+        # Validate the new value before updating
+        if attribute_name == 'user_password' and not UserOperation().validate_password(value):
+            return False
+        if attribute_name == 'user_email' and not self.validate_email(value):
+            return False
+        if attribute_name == 'user_mobile' and not self.validate_mobile(value):
+            return False
+        if attribute_name == 'user_name' and not UserOperation().validate_username(value):
+            return False
+
+        # Encrypt password if it's being updated
+        if attribute_name == 'user_password':
+            value = UserOperation().encrypt_password(value)
+        
+        # Read and write the record under one lock, so concurrent updates of other fields are not lost
+        with file_lock(self.users_file_path):
+            user_index = get_user_index(self.users_file_path)
+            user_data = user_index.get_user(customer_object.user_id)
+            if user_data is None:
+                return False
+            # A new user_name must not be held by another user (the index follows pending renames)
+            if attribute_name == 'user_name' and user_index.get_user_id(value) not in (None, customer_object.user_id):
+                return False
+            # Record the new version of the user in data/users.log instead of rewriting data/users.txt
+            get_change_log(self.users_file_path, 'user_id').upsert({**user_data, attribute_name: value})
         
-        if user_found:
-            self._write_users(all_users)
-            return True
+        # Also update the attribute in the passed customer_object
+        setattr(customer_object, attribute_name, value)
         
-        return False
+        return True
 
     def delete_customer(self, customer_id):
         """
         Deletes the customer from the data/users.txt file.
         """
-        all_users = self._read_users()
-        original_count = len(all_users)
+        if get_user_index(self.users_file_path).get_user(customer_id) is None:
+            return False
         
-        users_after_deletion = [user for user in all_users if user.get('user_id') != customer_id]
-        
-        if len(users_after_deletion) < original_count:
-            self._write_users(users_after_deletion)
-            return True
-            
-        return False
+        # A tombstone in data/users.log hides the user until the log is compacted
+        get_change_log(self.users_file_path, 'user_id').delete(customer_id)
+        return True
 
     def get_customer_list(self, page_number):
         """
         Retrieves one page of customers from the data/users.txt.
         """
-        all_users = self._read_users()
-        customers_data = [user for user in all_users if user.get('user_role') == 'customer']
-        
-        items_per_page = 10
-        total_pages = math.ceil(len(customers_data) / items_per_page)
-        
-        if page_number < 1 or page_number > total_pages:
-            return ([], page_number, total_pages) # Return empty list if page number is out of bounds
-
-        start_index = (page_number - 1) * items_per_page
-        end_index = start_index + items_per_page
-        
-        page_customers_data = customers_data[start_index:end_index]
-        
-        customer_objects = [Customer(**data) for data in page_customers_data]
+        customer_index = self._customer_index()
+        # Only the records of the requested page are decoded, through the byte-offset index. Edits
+        # pending in data/users.log are laid over it: a tombstone skips its record, an upsert
+        # replaces it, and customers only found in the log follow the indexed ones.
+        with file_lock(self.users_file_path, exclusive=False):
+            pending = get_change_log(self.users_file_path, 'user_id').pending()
+            skip, extra_customers = [], []
+            for user_id, user in pending.items():
+                is_customer = user is not None and user.get('user_role') == 'customer'
+                position = customer_index.position(user_id)
+                if position is None:
+                    if is_customer:
+                        extra_customers.append(user)
+                elif not is_customer:
+                    skip.append(position)
+            skip.sort()
+            indexed_customers = customer_index.count() - len(skip)
+            total_customers = indexed_customers + len(extra_customers)
+
+            items_per_page = 10
+            total_pages = math.ceil(total_customers / items_per_page)
+
+            if page_number < 1 or page_number > total_pages:
+                return ([], page_number, total_pages) # Return empty list if page number is out of bounds
+
+            start_index = (page_number - 1) * items_per_page
+            end_index = start_index + items_per_page
+
+            page_customers_data = [pending.get(user.get('user_id'), user) for user in
+                                   customer_index.read_range(start_index, min(end_index, indexed_customers), skip)]
+            page_customers_data.extend(extra_customers[max(0, start_index - indexed_customers):
+                                                       max(0, end_index - indexed_customers)])
+
+        customer_objects = [Customer.from_record(data) for data in page_customers_data]
 
         return (customer_objects, page_number, total_pages)
 
@@ -158,6 +178,8 @@ class CustomerOperation:
         """
         Removes all the customers from the data/users.txt file.
         """
-        all_users = self._read_users()
-        admins_only = [user for user in all_users if user.get('user_role') == 'admin']
-        self._write_users(admins_only)
+        # Read, filter and write under one lock, so a user written meanwhile by another process is not lost
+        with file_lock(self.users_file_path):
+            all_users = self._read_users()
+            admins_only = [user for user in all_users if user.get('user_role') == 'admin']
+            self._write_users(admins_only)
@@ -0,0 +1,101 @@
+# File: figure_cache.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the FigureCache class, which lets figure methods skip PNGs that are already up to date.
+
+import hashlib
+import json
+import os
+import threading
+from file_lock import file_lock
+from record_cache import file_signature, sidecar_path, load_sidecar, save_sidecar
+
+# Bump when the figures are drawn differently, so every cached PNG is rendered again
+FIGURE_VERSION = 3
+
+
+class FigureCache:
+    """
+    Remembers, for every PNG in data/figure, the fingerprint of the inputs it was rendered
+    from: the versions (signatures) of the data files plus any extra key such as a customer_id.
+    A figure whose PNG exists and whose recorded fingerprint equals the current one is a hit,
+    and its computation and rendering can be skipped. The fingerprints are kept in
+    data/index/figure.cache.json, which every write re-reads and merges into under its file lock,
+    so processes rendering different figures keep each other's entries; hits and misses are
+    counted per process.
+    """
+    def __init__(self, figure_path):
+        """
+        Constructs the cache of the given figure folder.
+
+        Args:
+            figure_path (str): Folder the PNG files are written to.
+        """
+        self.figure_path = figure_path
+        self.cache_file_path = sidecar_path(figure_path, 'cache')
+        self._fingerprints = load_sidecar(self.cache_file_path) or {}  # file name -> fingerprint
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, input_paths, *extra):
+        """
+        Returns the fingerprint of a figure drawn from the given data files and extra keys.
+        """
+        inputs = [FIGURE_VERSION, [file_signature(path) for path in input_paths], list(extra)]
+        return hashlib.sha256(json.dumps(inputs).encode('utf-8')).hexdigest()
+
+    def is_fresh(self, file_name, fingerprint):
+        """
+        Checks whether the PNG exists and was rendered from inputs with this fingerprint,
+        and counts the lookup as a hit or a miss.
+        """
+        with self._lock:
+            fresh = (self._fingerprints.get(file_name) == fingerprint
+                     and os.path.exists(os.path.join(self.figure_path, file_name)))
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return fresh
+
+    def store(self, file_name, fingerprint):
+        """
+        Records that the PNG was just rendered from inputs with this fingerprint.
+        """
+        with file_lock(self.cache_file_path), self._lock:
+            self._fingerprints = load_sidecar(self.cache_file_path) or {}
+            self._fingerprints[file_name] = fingerprint
+            save_sidecar(self.cache_file_path, self._fingerprints)
+
+    def invalidate(self, file_name=None):
+        """
+        Forgets one figure, or every figure if no file name is given, so it is rendered again.
+        """
+        with file_lock(self.cache_file_path), self._lock:
+            if file_name is None:
+                self._fingerprints = {}
+            else:
+                self._fingerprints = load_sidecar(self.cache_file_path) or {}
+                self._fingerprints.pop(file_name, None)
+            save_sidecar(self.cache_file_path, self._fingerprints)
+
+    def stats(self):
+        """
+        Returns the number of cache hits and misses in this process as a dict.
+        """
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+_caches = {}
+_caches_guard = threading.Lock()
+
+
+def get_figure_cache(figure_path):
+    """
+    Returns the shared FigureCache of the given figure folder.
+    """
+    with _caches_guard:
+        if figure_path not in _caches:
+            _caches[figure_path] = FigureCache(figure_path)
+        return _caches[figure_path]
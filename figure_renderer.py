@@ -0,0 +1,193 @@
+# File: figure_renderer.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the headless rendering functions for the statistical figures and the parallel rendering pipeline.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+def _new_figure(figsize):
+    """Creates a figure with its own Agg canvas and one set of axes; no pyplot state is involved."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def _month_ticks(monthly_consumption):
+    """Returns the tick positions and 'Mon YYYY' labels of a monthly series, at most ~24 of them."""
+    step = max(1, -(-len(monthly_consumption) // 24))
+    positions = range(0, len(monthly_consumption), step)
+    return positions, [monthly_consumption.index[position] for position in positions]
+
+
+def _save(fig, file_path):
+    """Writes the figure as a PNG, creating its folder if needed."""
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    fig.savefig(file_path)
+
+
+def render_category_figure(category_counts, file_path):
+    """
+    Renders the bar chart of product counts per category.
+    """
+    fig, ax = _new_figure((12, 8))
+    category_counts.plot(kind='bar', ax=ax)
+    ax.set_title('Total Number of Products per Category')
+    ax.set_xlabel('Category')
+    ax.set_ylabel('Number of Products')
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_horizontalalignment('right')
+    fig.tight_layout()
+    _save(fig, file_path)
+
+
+def render_discount_figure(discount_counts, file_path):
+    """
+    Renders the pie chart of product discount proportions.
+    """
+    fig, ax = _new_figure((8, 8))
+    ax.pie(discount_counts, labels=discount_counts.index, autopct='%1.1f%%', startangle=140)
+    ax.set_title('Proportion of Products by Discount Range')
+    ax.set_ylabel('') # Hide the y-label
+    _save(fig, file_path)
+
+
+def render_likes_count_figure(likes_by_category, file_path):
+    """
+    Renders the bar chart of total likes per category.
+    """
+    fig, ax = _new_figure((12, 8))
+    likes_by_category.plot(kind='barh', ax=ax) # Horizontal bar chart is good for long labels
+    ax.set_title("Sum of Product Likes per Category")
+    ax.set_xlabel("Total Likes Count")
+    ax.set_ylabel("Category")
+    fig.tight_layout()
+    _save(fig, file_path)
+
+
+def render_discount_likes_count_figure(discount_likes, file_path):
+    """
+    Renders the scatter chart of likes against discount.
+    """
+    fig, ax = _new_figure((10, 6))
+    ax.scatter(discount_likes['pro_discount'], discount_likes['pro_likes_count'], alpha=0.5)
+    ax.set_title('Relationship between Discount and Likes Count')
+    ax.set_xlabel('Discount (%)')
+    ax.set_ylabel('Likes Count')
+    ax.grid(True)
+    _save(fig, file_path)
+
+
+def render_single_customer_consumption_figure(monthly_consumption, customer_id, file_path):
+    """
+    Renders the bar chart of one customer's monthly consumption.
+    """
+    fig, ax = _new_figure((10, 6))
+    monthly_consumption.plot(kind='bar', ax=ax)
+    ax.set_title(f'Monthly Consumption for Customer: {customer_id}')
+    ax.set_xlabel('Month')
+    ax.set_ylabel('Total Consumption ($)')
+    positions, labels = _month_ticks(monthly_consumption)
+    ax.set_xticks(positions, labels=labels, rotation=45)
+    fig.tight_layout()
+    _save(fig, file_path)
+
+
+def render_all_customers_consumption_figure(monthly_consumption, file_path):
+    """
+    Renders the line chart of all customers' combined monthly consumption.
+    """
+    fig, ax = _new_figure((10, 6))
+    monthly_consumption.plot(kind='line', marker='o', ax=ax)
+    ax.set_title('Total Monthly Consumption (All Customers)')
+    ax.set_xlabel('Month')
+    ax.set_ylabel('Total Consumption ($)')
+    positions, labels = _month_ticks(monthly_consumption)
+    ax.set_xticks(positions, labels=labels, rotation=45, ha='right')
+    ax.grid(True)
+    fig.tight_layout()
+    _save(fig, file_path)
+
+
+def render_top_10_best_sellers_figure(top_10, file_path):
+    """
+    Renders the bar chart of the top 10 best-selling products.
+    """
+    fig, ax = _new_figure((12, 8))
+    top_10.sort_values(ascending=True).plot(kind='barh', ax=ax)
+    ax.set_title('Top 10 Best-Selling Products')
+    ax.set_xlabel('Number of Orders')
+    ax.set_ylabel('Product Name')
+    fig.tight_layout()
+    _save(fig, file_path)
+
+
+# The admin figures: (file name in data/figure, render function, aggregate it is drawn from,
+# whether it is drawn from the 'products' alone or from the 'orders' joined to the products)
+ALL_FIGURES = [
+    ('generate_category_figure.png', render_category_figure, 'category_counts', 'products'),
+    ('generate_discount_figure.png', render_discount_figure, 'discount_counts', 'products'),
+    ('generate_likes_count_figure.png', render_likes_count_figure, 'likes_by_category', 'products'),
+    ('generate_discount_likes_count_figure.png', render_discount_likes_count_figure, 'discount_likes', 'products'),
+    ('all_customers_consumption.png', render_all_customers_consumption_figure, 'monthly_consumption', 'orders'),
+    ('all_top_10_best_sellers.png', render_top_10_best_sellers_figure, 'top_sellers', 'orders'),
+]
+
+
+def _timed_render(render, aggregate, file_path):
+    """Renders one figure (in a worker process) and returns the time it took in seconds."""
+    start = time.perf_counter()
+    render(aggregate, file_path)
+    return time.perf_counter() - start
+
+
+def render_all_figures(analytics, figure_path, workers=None, fingerprints=None):
+    """
+    Renders every admin figure whose aggregate is available, concurrently in a process pool.
+    With fingerprints, figures that the FigureCache reports as up to date are skipped, and the
+    aggregates are not even computed when every figure is up to date.
+
+    Args:
+        analytics: Aggregates from AnalyticsEngine.compute(), or a callable returning them.
+        figure_path (str): Folder the PNG files are written to.
+        workers (int): Maximum number of worker processes (defaults to the CPU count; 1 renders in-process).
+        fingerprints (dict): Optional input fingerprint of the 'products' and of the 'orders' figures.
+
+    Returns:
+        dict: File name -> render time in seconds (None for a figure served from the cache).
+    """
+    from figure_cache import get_figure_cache
+
+    figure_cache = get_figure_cache(figure_path)
+    render_times = {}
+    stale_figures = []
+    for file_name, render, key, inputs in ALL_FIGURES:
+        if fingerprints is not None and figure_cache.is_fresh(file_name, fingerprints[inputs]):
+            render_times[file_name] = None
+        else:
+            stale_figures.append((file_name, render, key, inputs))
+    if not stale_figures:
+        return render_times
+    if callable(analytics):
+        analytics = analytics()
+
+    jobs = [(file_name, render, analytics[key], inputs) for file_name, render, key, inputs in stale_figures
+            if analytics.get(key) is not None]
+    os.makedirs(figure_path, exist_ok=True)
+    if workers == 1 or len(jobs) <= 1:
+        render_times.update({file_name: _timed_render(render, aggregate, os.path.join(figure_path, file_name))
+                             for file_name, render, aggregate, inputs in jobs})
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(jobs))) as pool:
+            futures = {file_name: pool.submit(_timed_render, render, aggregate, os.path.join(figure_path, file_name))
+                       for file_name, render, aggregate, inputs in jobs}
+            render_times.update({file_name: future.result() for file_name, future in futures.items()})
+
+    if fingerprints is not None:
+        for file_name, render, aggregate, inputs in jobs:
+            figure_cache.store(file_name, fingerprints[inputs])
+    return {figure[0]: render_times[figure[0]] for figure in ALL_FIGURES if figure[0] in render_times}
@@ -0,0 +1,157 @@
+# File: file_lock.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the advisory file locks that make the data files safe to share between processes.
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # Windows: no advisory locks, so only the threads of one process are kept apart
+    fcntl = None
+
+
+def lock_path(file_path):
+    """
+    Returns the lock file guarding a data file and its change log, e.g.
+    lock_path('data/orders.txt') == lock_path('data/orders.log') == 'data/index/orders.lock'.
+    Files already in data/index (such as the id allocator state) are locked next to themselves.
+    """
+    directory, file_name = os.path.split(file_path)
+    stem = os.path.splitext(file_name)[0]
+    if os.path.basename(directory) != 'index':
+        directory = os.path.join(directory, 'index')
+    return os.path.join(directory, f"{stem}.lock")
+
+
+class _HeldLock:
+    """
+    The state of one lock file in this process: an open descriptor, the lock currently taken on
+    it, and which threads hold it. Several threads may hold it shared at once; an exclusive
+    holder has it alone. The flock on the descriptor follows the strongest hold of any thread.
+    """
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.fd = None
+        self.pid = None
+        self.mode = None          # flock currently held on fd: None, fcntl.LOCK_SH or fcntl.LOCK_EX
+        self.readers = {}         # thread id -> depth of its shared holds
+        self.writer = None        # thread id of the exclusive holder
+        self.writer_depth = 0
+        self.waiting_writers = 0  # New readers wait while a writer does, so writers are not starved
+
+    def set_mode(self, mode):
+        """Takes mode (LOCK_SH, LOCK_EX or None to unlock) on the lock file. Called with the condition held."""
+        if fcntl is None or self.mode == mode:
+            return
+        fcntl.flock(self.fd, fcntl.LOCK_UN if mode is None else mode)
+        self.mode = mode
+
+    def acquire(self, path, exclusive):
+        """
+        Takes the lock for the calling thread and returns what release() has to undo:
+        'nested' (already held strongly enough), 'shared', 'exclusive', or the depth of a
+        shared hold the thread gave up to upgrade to an exclusive one.
+        """
+        me = threading.get_ident()
+        with self.condition:
+            if fcntl is not None and (self.fd is None or self.pid != os.getpid()):
+                # First use, or a forked child, which needs its own descriptor and holds nothing yet
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+                self.pid = os.getpid()
+                self.mode, self.readers, self.writer, self.writer_depth, self.waiting_writers = None, {}, None, 0, 0
+            if self.writer == me:
+                self.writer_depth += 1
+                return 'nested'
+            if not exclusive:
+                if me in self.readers:
+                    self.readers[me] += 1
+                    return 'nested'
+                self.condition.wait_for(lambda: self.writer is None and not self.waiting_writers)
+                if not self.readers:
+                    self.set_mode(fcntl.LOCK_SH if fcntl else None)
+                self.readers[me] = 1
+                return 'shared'
+
+            # An upgrade gives up the shared hold while it waits (as flock does between processes),
+            # so two threads upgrading at once take turns instead of waiting for each other
+            shared_depth = self.readers.pop(me, 0)
+            if shared_depth and not self.readers:
+                self.set_mode(None)
+            self.condition.notify_all()
+            self.waiting_writers += 1
+            try:
+                self.condition.wait_for(lambda: self.writer is None and not self.readers)
+            finally:
+                self.waiting_writers -= 1
+            self.set_mode(fcntl.LOCK_EX if fcntl else None)
+            self.writer, self.writer_depth = me, 1
+            return shared_depth or 'exclusive'
+
+    def release(self, held):
+        """Undoes one acquire(), given what it returned."""
+        me = threading.get_ident()
+        with self.condition:
+            if held == 'nested':
+                if self.writer == me:
+                    self.writer_depth -= 1
+                else:
+                    self.readers[me] -= 1
+                return
+            if held == 'shared':
+                del self.readers[me]
+                if not self.readers:
+                    self.set_mode(None)
+            else:
+                self.writer, self.writer_depth = None, 0
+                if held == 'exclusive':
+                    self.set_mode(None)
+                else: # Back to the shared hold the upgrade gave up
+                    self.set_mode(fcntl.LOCK_SH if fcntl else None)
+                    self.readers[me] = held
+            self.condition.notify_all()
+
+
+_held_locks = {}
+_held_locks_guard = threading.Lock()
+
+
+def _held_lock(path):
+    """Returns the shared _HeldLock of the given lock file."""
+    with _held_locks_guard:
+        if path not in _held_locks:
+            _held_locks[path] = _HeldLock()
+        return _held_locks[path]
+
+
+@contextmanager
+def file_lock(file_path, exclusive=True):
+    """
+    Holds the advisory lock of a data file for the duration of a with block: shared for readers,
+    exclusive for writers. This applies between processes and between the threads of this one:
+    any number of threads may read a file at once, while a writer waits for them and then has the
+    file alone. The lock is re-entrant within a thread, and a nested exclusive request upgrades a
+    shared lock for the inner block; like flock, an upgrade is not atomic, so what was read
+    before it must be checked again under the exclusive lock.
+    Locks must be taken before any in-memory lock (e.g. ChangeLog._lock) to avoid deadlocks,
+    and the orders lock before the products lock when both are needed (prices, best sellers).
+
+    Args:
+        file_path (str): The data file to lock.
+        exclusive (bool): Whether to lock for writing (True) or for reading (False).
+    """
+    path = lock_path(file_path)
+    held_lock = _held_lock(path)
+    held = held_lock.acquire(path, exclusive)
+    try:
+        yield
+    finally:
+        held_lock.release(held)
+
+
+def temp_path_for(file_path):
+    """Returns a temporary file name next to file_path that no other process or thread uses."""
+    return f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
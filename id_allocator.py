@@ -0,0 +1,111 @@
+# File: id_allocator.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the IdAllocator class, which hands out unique user and order ids.
+
+import os
+import threading
+from change_log import get_change_log
+from record_cache import record_cache, sidecar_path, load_sidecar, save_sidecar
+from record_codec import decode_lines
+from file_lock import file_lock
+
+
+class IdAllocator:
+    """
+    Allocates sequential ids such as 'o_00042' or 'u_0000000042' in constant time.
+    The next free number (the high-water mark) is kept in data/index/<file>.ids.json and advanced
+    under a file_lock of that state file by exactly the numbers a call takes, so several processes
+    can allocate concurrently and ids stay consecutive (u_0000000001, u_0000000002, ...).
+    Numbers keep growing past the zero-padded width (o_99999, o_100000, ...), so the id space is
+    no longer capped while the 'o_'/'u_' prefixes stay the same.
+    Allocated ids are appended in increasing order, so if the state file is missing the high-water
+    mark is recovered from the tail of the data file and its change log. Files migrated from the
+    old format hold random ids instead; recover() scans those once, right after the migration.
+    """
+    tail_size = 1 << 16 # Bytes read from the end of the data file when the state file is missing
+
+    def __init__(self, file_path, key_field, prefix, width):
+        """
+        Constructs the allocator of one data file.
+
+        Args:
+            file_path (str): Path of the data file whose records carry the ids.
+            key_field (str): Name of the id field (e.g. 'order_id').
+            prefix (str): Id prefix (e.g. 'o_').
+            width (int): Minimum number of digits after the prefix.
+        """
+        self.file_path = file_path
+        self.key_field = key_field
+        self.prefix = prefix
+        self.width = width
+        self.state_file_path = sidecar_path(file_path, 'ids')
+
+    def _high_water(self, record_ids):
+        """Returns one more than the largest id number among the given ids (0 if there is none)."""
+        high_water = 0
+        for record_id in record_ids:
+            if isinstance(record_id, str) and record_id.startswith(self.prefix) and record_id[len(self.prefix):].isdigit():
+                high_water = max(high_water, int(record_id[len(self.prefix):]) + 1)
+        return high_water
+
+    def _tail_records(self):
+        """Returns the records of the last tail_size bytes of the data file (its first, partial line is skipped)."""
+        try:
+            with open(self.file_path, 'rb') as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - self.tail_size))
+                tail = f.read()
+        except OSError: # No data file yet
+            return []
+        lines = tail.decode('utf-8', errors='replace').split('\n')
+        return decode_lines(lines if size <= self.tail_size else lines[1:])
+
+    def recover(self):
+        """
+        Raises the persisted high-water mark above every id in the data file and its change log.
+        Reads the whole file; it is only needed once, for a file migrated from the old format.
+        """
+        with file_lock(self.state_file_path):
+            ids = [record.get(self.key_field) for record in record_cache.load(self.file_path)]
+            ids.extend(get_change_log(self.file_path, self.key_field).pending())
+            state = load_sidecar(self.state_file_path)
+            next_number = max(state['next_id'] if state else 0, self._high_water(ids))
+            save_sidecar(self.state_file_path, {'next_id': next_number})
+
+    def allocate_many(self, count):
+        """
+        Returns count new unique ids, in increasing order.
+        """
+        # Locked, so processes allocating at the same time get different numbers. Callers must not
+        # hold the lock of the data file itself, which the recovery below may need.
+        with file_lock(self.state_file_path):
+            state = load_sidecar(self.state_file_path)
+            if state:
+                next_number = state['next_id']
+            else:
+                ids = [record.get(self.key_field) for record in self._tail_records()]
+                ids.extend(get_change_log(self.file_path, self.key_field).pending())
+                next_number = self._high_water(ids)
+            save_sidecar(self.state_file_path, {'next_id': next_number + count})
+        return [f"{self.prefix}{number:0{self.width}d}" for number in range(next_number, next_number + count)]
+
+    def allocate(self):
+        """
+        Returns a new unique id.
+        """
+        return self.allocate_many(1)[0]
+
+
+_allocators = {}
+_allocators_guard = threading.Lock()
+
+
+def get_id_allocator(file_path, key_field, prefix, width):
+    """
+    Returns the shared IdAllocator of the given data file.
+    """
+    with _allocators_guard:
+        if file_path not in _allocators:
+            _allocators[file_path] = IdAllocator(file_path, key_field, prefix, width)
+        return _allocators[file_path]
@@ -1,6 +1,6 @@
 # File: io_interface.py
 # Creation Date: 25/04/2025
-# Last Modified Date: 25/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This file contains the IOInterface class for all user interactions.
 
 class IOInterface:
@@ -43,7 +43,7 @@ class IOInterface:
         print("="*40)
         print("1. Show products (e.g., '1' or '1 2' for page 2)")
         print("2. Show customers (e.g., '2' or '2 3' for page 3)")
-        print("3. Show orders (e.g., '3' or '3 4' for page 4)")
+        print("3. Show orders (e.g., '3', '3 next' for the next page or '3 u_1234567890' for one customer)")
         print("4. Generate test data")
         print("5. Generate all statistical figures")
         print("6. Delete all data")
@@ -0,0 +1,205 @@
+# File: keyword_index.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the KeywordIndex class, an inverted trigram index over product names.
+
+import os
+import threading
+from file_lock import file_lock, temp_path_for
+from record_cache import record_cache, file_signature, sidecar_path, load_sidecar, save_sidecar
+from record_codec import as_record
+
+
+def _gram_key(gram):
+    """Packs a 3-character string into one integer (21 bits per code point), the form the index stores."""
+    return (ord(gram[0]) << 42) | (ord(gram[1]) << 21) | ord(gram[2])
+
+
+class KeywordIndex:
+    """
+    Inverted index over the lower-cased pro_name of every product in data/products.txt.
+    Each product gets a document number (its position in the file); every 3-character substring
+    (trigram) of its name has a sorted posting list of document numbers. A keyword search takes
+    the shortest posting list among the keyword's trigrams and checks only those candidates for the
+    whole keyword, so its cost follows the rarest trigram, not the catalog size; keywords shorter
+    than a trigram are matched against every name. Either way the result is exactly the products
+    whose name contains the keyword, in file order.
+    The postings are kept in data/index/products.keyword.bin (the sorted trigram keys, where each
+    posting list starts, then all lists) and memory-mapped on load; the JSON header next to it
+    holds the signature of the products file, the pro_ids and the names.
+    Deleted products keep their document number but are marked dead, so delete_product
+    does not have to rebuild the postings.
+    """
+    gram_size = 3
+
+    def __init__(self, products_file_path):
+        """
+        Constructs the index of the given products file. Nothing is read until the first search.
+
+        Args:
+            products_file_path (str): Path of the products data file.
+        """
+        self.products_file_path = products_file_path
+        self.header_file_path = sidecar_path(products_file_path, 'keyword')
+        self.postings_file_path = os.path.splitext(self.header_file_path)[0] + '.bin'
+        self._signature = None
+        self._pro_ids = []    # document number -> pro_id (None once deleted)
+        self._names = []      # document number -> lower-cased pro_name
+        self._keys = None     # sorted trigram keys (numpy uint64)
+        self._starts = None   # posting list i is _postings[_starts[i]:_starts[i + 1]]
+        self._postings = None # every posting list, one after the other (numpy uint32)
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    def _ensure_current(self):
+        """Loads the persisted index or rebuilds it if it no longer matches the products file."""
+        signature = file_signature(self.products_file_path)
+        if self._loaded and self._signature == signature:
+            return
+        if not self._loaded:
+            self._loaded = True
+            if self._load(signature):
+                return
+        self.build(record_cache.load(self.products_file_path))
+
+    def _load(self, signature):
+        """Loads the index from its sidecar files if they describe the current products file."""
+        import numpy as np # Imported on first use so that starting the application stays fast
+
+        header = load_sidecar(self.header_file_path)
+        if header is None or header.get('signature') != (list(signature) if signature else None) \
+                or not isinstance(header.get('grams'), int): # Missing, stale, or in an older layout
+            return False
+        try:
+            data = np.memmap(self.postings_file_path, dtype=np.uint8, mode='r')
+        except (OSError, ValueError): # Missing, or empty
+            return False
+        gram_count, posting_count = header['grams'], header['postings']
+        if len(data) != 8 * gram_count + 8 * (gram_count + 1) + 4 * posting_count:
+            return False
+        self._signature = signature
+        self._pro_ids = header['pro_ids']
+        self._names = header['names']
+        self._keys = data[:8 * gram_count].view(np.uint64)
+        self._starts = data[8 * gram_count:16 * gram_count + 8].view(np.uint64)
+        self._postings = data[16 * gram_count + 8:].view(np.uint32)
+        return True
+
+    def build(self, products):
+        """
+        Builds the index from the given product records (dicts or Product objects),
+        which must be the current content of the products file, and persists it.
+        """
+        import numpy as np # Imported on first use so that starting the application stays fast
+
+        with file_lock(self.products_file_path, exclusive=False), self._lock:
+            self._pro_ids = []
+            self._names = []
+            for product in products:
+                product = as_record(product)
+                name = product.get('pro_name', '')
+                self._pro_ids.append(product.get('pro_id'))
+                self._names.append(name.lower().replace('\0', ' ') if isinstance(name, str) else '')
+
+            # All names as one array of code points, each followed by a 0 that no trigram may span
+            code_points = np.frombuffer(('\0'.join(self._names) + '\0').encode('utf-32-le'), dtype=np.uint32)
+            first, second, third = code_points[:-2], code_points[1:-1], code_points[2:]
+            valid = (first != 0) & (second != 0) & (third != 0)
+            keys = ((first[valid].astype(np.uint64) << np.uint64(42))
+                    | (second[valid].astype(np.uint64) << np.uint64(21)) | third[valid].astype(np.uint64))
+            documents = np.cumsum(code_points == 0, dtype=np.uint32)[:-2][valid] # Separators before = document
+            # Documents ascend with the position, so one stable sort by trigram leaves every posting list sorted
+            order = np.argsort(keys, kind='stable')
+            keys, documents = keys[order], documents[order]
+            new_key = np.ones(len(keys), dtype=bool)
+            new_key[1:] = keys[1:] != keys[:-1]
+            kept = new_key.copy() # A trigram seen twice in one name is posted once
+            kept[1:] |= documents[1:] != documents[:-1]
+            self._keys = keys[new_key]
+            self._postings = documents[kept]
+            self._starts = np.append(np.flatnonzero(new_key[kept]), len(self._postings)).astype(np.uint64)
+            self._signature = file_signature(self.products_file_path)
+            self._loaded = True
+            self.save()
+
+    def save(self):
+        """
+        Persists the index: a JSON header plus one binary file with the trigram keys and every posting list.
+        """
+        with file_lock(self.products_file_path, exclusive=False), self._lock:
+            os.makedirs(os.path.dirname(self.postings_file_path), exist_ok=True)
+            # The postings are swapped in whole (temp file + rename) before the header that describes them
+            temp_path = temp_path_for(self.postings_file_path)
+            with open(temp_path, 'wb') as f:
+                for array in (self._keys, self._starts, self._postings):
+                    f.write(array.tobytes())
+            os.replace(temp_path, self.postings_file_path)
+            save_sidecar(self.header_file_path, {
+                'signature': list(self._signature) if self._signature else None,
+                'grams': len(self._keys),
+                'postings': len(self._postings),
+                'pro_ids': self._pro_ids,
+                'names': self._names
+            })
+
+    def remove(self, product_id, previous_signature):
+        """
+        Marks a deleted product as dead after the products file was rewritten without it.
+
+        Args:
+            product_id: The pro_id of the deleted product.
+            previous_signature (tuple): Signature of the products file before the rewrite.
+        """
+        with file_lock(self.products_file_path, exclusive=False), self._lock:
+            if not self._loaded or self._signature != previous_signature:
+                # The index was already stale; it will be reloaded or rebuilt on the next search
+                self._loaded = False
+                return
+            self._pro_ids = [None if pro_id == product_id else pro_id for pro_id in self._pro_ids]
+            self._signature = file_signature(self.products_file_path)
+            save_sidecar(self.header_file_path, {
+                **load_sidecar(self.header_file_path),
+                'signature': list(self._signature) if self._signature else None,
+                'pro_ids': self._pro_ids
+            })
+
+    def search(self, keyword):
+        """
+        Returns the pro_id of every product whose name contains the keyword (case insensitive),
+        in file order.
+        """
+        import numpy as np # Imported on first use so that starting the application stays fast
+
+        with file_lock(self.products_file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            keyword = keyword.lower()
+            if len(keyword) < self.gram_size:
+                candidates = range(len(self._names))
+            else:
+                # Only the shortest posting list among the keyword's trigrams is read
+                gram_keys = np.array(sorted({_gram_key(keyword[i:i + self.gram_size])
+                                             for i in range(len(keyword) - self.gram_size + 1)}), dtype=np.uint64)
+                positions = np.searchsorted(self._keys, gram_keys)
+                if np.any(positions >= len(self._keys)) or np.any(self._keys[positions] != gram_keys):
+                    return [] # A trigram no product name contains
+                lengths = self._starts[positions + 1] - self._starts[positions]
+                rarest = positions[np.argmin(lengths)]
+                candidates = self._postings[self._starts[rarest]:self._starts[rarest + 1]].tolist()
+
+            pro_ids, names = self._pro_ids, self._names
+            return [pro_ids[document] for document in candidates
+                    if pro_ids[document] is not None and keyword in names[document]]
+
+
+_indexes = {}
+_indexes_guard = threading.Lock()
+
+
+def get_keyword_index(products_file_path):
+    """
+    Returns the shared KeywordIndex of the given products file.
+    """
+    with _indexes_guard:
+        if products_file_path not in _indexes:
+            _indexes[products_file_path] = KeywordIndex(products_file_path)
+        return _indexes[products_file_path]
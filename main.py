@@ -1,20 +1,29 @@
 # File: main.py
 # Creation Date: 25/04/2025
-# Last Modified Date: 25/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This is the main entry point for the e-commerce application.
 
 # Import all necessary classes
+import argparse
+import sys
 from io_interface import IOInterface
 from user_operation import UserOperation
 from customer_operation import CustomerOperation
 from admin_operation import AdminOperation
 from product_operation import ProductOperation
 from order_operation import OrderOperation
+from record_codec import migrate_data_files
 
-def main():
+def main(argv=None):
     """
     The main control function for the application.
+    With --batch, commands are read from a file (or '-' for stdin) and executed without menus,
+    writing one JSON line per command to stdout (see BatchRunner).
     """
+    parser = argparse.ArgumentParser(description="E-Commerce platform.")
+    parser.add_argument('--batch', metavar='FILE', help="Run the commands in FILE ('-' for stdin) and exit.")
+    options = parser.parse_args(argv)
+
     # Initialize all operation and interface classes
     io = IOInterface()
     user_op = UserOperation()
@@ -24,16 +33,35 @@ def main():
     order_op = OrderOperation()
 
     # --- Initial System Setup ---
+    # 0. Convert any data files still in the old dict-literal format to JSON lines. Their ids were
+    # random, so the id allocators are moved past the largest one
+    migrated = migrate_data_files()
+    for operation, file_path in ((user_op, user_op.users_file_path), (order_op, order_op.orders_file_path)):
+        if file_path in migrated:
+            operation.id_allocator().recover()
     # 1. Ensure a default admin account exists
     admin_op.register_admin()
     # 2. Extract product data from CSVs into products.txt
-    # This runs once to populate our main product file from the source CSVs.
-    if not prod_op._read_products(): # Only run if products.txt is empty
-        io.print_message("First time setup: Extracting product data from source files...")
-        prod_op.extract_products_from_files()
-        io.print_message("Product extraction complete.")
+    # This keeps our main product file in sync with the source CSVs. An empty products.txt is
+    # detected from its size; otherwise only source files added, changed or removed since the
+    # last run cost any work, so when nothing changed this is one stat per source file.
+    parsed_files, removed_files = prod_op.extract_products_from_files()
+    if (parsed_files or removed_files) and options.batch is None: # Batch output stays machine-readable
+        io.print_message(f"Product catalog refreshed: {parsed_files} source file(s) ingested, "
+                         f"{removed_files} removed.")
+
+    if options.batch is not None:
+        from batch import BatchRunner
+        runner = BatchRunner(sys.stdout, user_op, cust_op, admin_op, prod_op, order_op)
+        if options.batch == '-':
+            failed = runner.run(sys.stdin)
+        else:
+            with open(options.batch, 'r', encoding='utf-8') as f:
+                failed = runner.run(f)
+        return 1 if failed else 0
 
     logged_in_user = None
+    order_pages = None # Admin 'Show orders' listing: [customer filter, cursor of the next page, page number]
 
     # --- Main Application Loop ---
     while True:
@@ -85,33 +113,33 @@ def main():
                     io.show_list('admin', 'Customer', cust_list_tuple)
 
                 elif choice == '3': # Show orders
-                    # Admin needs to see all orders. We'll need to adapt get_order_list or create a new method.
-                    # For now, let's show orders of a specific test user if available.
-                    io.print_message("Admin 'Show Orders' shows all orders. This is a complex feature.")
-                    io.print_message("Functionality to show ALL orders is not specified, showing for first customer.")
-                    customers_tuple = cust_op.get_customer_list(1)
-                    if customers_tuple[0]:
-                        first_customer_id = customers_tuple[0][0].user_id
-                        page = int(param) if param.isdigit() else 1
-                        order_list_tuple = order_op.get_order_list(first_customer_id, page)
-                        io.show_list('admin', f'Order for user {first_customer_id}', order_list_tuple)
+                    # Orders of all customers (or of one customer with '3 u_...'), oldest first.
+                    # '3 next' continues from the cursor of the last page shown instead of a page number.
+                    try:
+                        orders, page, total_pages, order_pages = order_op.browse_all_orders(param, order_pages)
+                    except ValueError:
+                        io.print_message("No more orders to show. Type '3' to start from the first page.")
                     else:
-                        io.print_message("No customers to show orders for.")
+                        customer_filter = order_pages[0]
+                        io.show_list('admin', 'Order' if customer_filter is None else f'Order for user {customer_filter}',
+                                     (orders, page, total_pages))
+                        if order_pages[1] is not None:
+                            io.print_message("Type '3 next' for the next page.")
 
 
                 elif choice == '4': # Generate test data
                     io.print_message("Generating test data... This may take a moment.")
-                    order_op.generate_test_order_data()
-                    io.print_message("Test data generation complete.")
+                    try:
+                        order_count, orders_per_second = order_op.generate_test_order_data()
+                        io.print_message(f"Test data generation complete: {order_count} orders ({orders_per_second:,.0f} orders/sec).")
+                    except ValueError as e:
+                        io.print_error_message("Generate Test Data", str(e))
 
                 elif choice == '5': # Generate all statistical figures
                     io.print_message("Generating all statistical figures...")
-                    prod_op.generate_category_figure()
-                    prod_op.generate_discount_figure()
-                    prod_op.generate_likes_count_figure()
-                    prod_op.generate_discount_likes_count_figure()
-                    order_op.generate_all_customers_consumption_figure()
-                    order_op.generate_all_top_10_best_sellers_figure()
+                    render_times = order_op.generate_all_figures()
+                    for file_name, seconds in render_times.items():
+                        io.print_message(f"  {file_name}: " + (f"{seconds:.2f}s" if seconds is not None else "up to date"))
                     io.print_message("All figures generated in 'data/figure' folder.")
 
                 elif choice == '6': # Delete all data
@@ -126,6 +154,7 @@ def main():
 
                 elif choice == '7': # Logout
                     logged_in_user = None
+                    order_pages = None
                     io.print_message("You have been logged out.")
                 
                 else:
@@ -191,4 +220,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
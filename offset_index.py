@@ -0,0 +1,210 @@
+# File: offset_index.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the OffsetIndex class, a byte-offset index used for paging and primary-key lookups.
+
+import atexit
+import bisect
+import threading
+from file_lock import file_lock
+from record_cache import file_signature, sidecar_path, load_sidecar, save_sidecar
+from record_codec import as_record, read_records_at, iter_records_with_offsets
+
+
+class OffsetIndex:
+    """
+    Stores the byte offset of every record of a data file (optionally only the records whose
+    filter field has a given value) together with its primary key, so fetching page N or one
+    record by key only decodes the records that are returned.
+    The index is kept in data/index/<file>.<kind>.json with the signature of the data file and
+    is rebuilt whenever the data file changed behind its back.
+    """
+    def __init__(self, file_path, key_field, kind='offsets', record_filter=None):
+        """
+        Constructs the index. Nothing is read until the first lookup.
+
+        Args:
+            file_path (str): Path of the data file.
+            key_field (str): Primary key of the records (e.g. 'pro_id').
+            kind (str): Name of the sidecar, unique per data file.
+            record_filter (tuple): Optional (field, value); only matching records are indexed.
+        """
+        self.file_path = file_path
+        self.key_field = key_field
+        self.record_filter = record_filter
+        self.index_file_path = sidecar_path(file_path, kind)
+        self._signature = None
+        self._offsets = []
+        self._keys = []
+        self._positions = {}  # key -> record number
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+        self._save_registered = False
+
+    def _matches(self, record):
+        """Checks a record against the optional filter."""
+        return self.record_filter is None or record.get(self.record_filter[0]) == self.record_filter[1]
+
+    def _ensure_current(self):
+        """Loads the persisted index or rebuilds it if it no longer matches the data file."""
+        signature = file_signature(self.file_path)
+        if self._loaded and self._signature == signature:
+            return
+
+        if not self._loaded:
+            self._loaded = True
+            data = load_sidecar(self.index_file_path)
+            if data is not None and data.get('signature') == (list(signature) if signature else None):
+                self._signature = signature
+                self._offsets = data['offsets']
+                self._keys = data['keys']
+                self._positions = {}
+                for position, key in enumerate(self._keys):
+                    self._positions.setdefault(key, position)
+                return
+
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Rebuilds the index from a full scan of the data file and persists it.
+        """
+        # Scanned under the shared lock, with the signature taken first (see OrderIndex.rebuild)
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            signature = file_signature(self.file_path)
+            self._offsets = []
+            self._keys = []
+            self._positions = {}
+            for offset, record in iter_records_with_offsets(self.file_path):
+                if self._matches(record):
+                    key = record.get(self.key_field)
+                    self._positions.setdefault(key, len(self._offsets))
+                    self._offsets.append(offset)
+                    self._keys.append(key)
+            self._signature = signature
+            self._loaded = True
+            self._dirty = True
+            self.save()
+
+    def save(self):
+        """
+        Persists the in-memory index if it has changed since it was last written.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            if not self._dirty:
+                return
+            save_sidecar(self.index_file_path, {
+                'signature': list(self._signature) if self._signature else None,
+                'offsets': self._offsets,
+                'keys': self._keys
+            })
+            self._dirty = False
+
+    def records_appended(self, records, offsets):
+        """
+        Extends the index with freshly appended records in O(1) each.
+
+        Args:
+            records (list): The appended model objects or dicts.
+            offsets (list): Byte offset of each record, as returned by RecordCache.append.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            # The index is only extended if it described the file exactly up to the append
+            indexed_size = self._signature[0] if self._signature else 0
+            if not self._loaded or not offsets or offsets[0] != indexed_size:
+                self._loaded = False
+                return
+            for record, offset in zip(records, offsets):
+                record = as_record(record)
+                if self._matches(record):
+                    key = record.get(self.key_field)
+                    self._positions.setdefault(key, len(self._offsets))
+                    self._offsets.append(offset)
+                    self._keys.append(key)
+            self._signature = file_signature(self.file_path)
+            self._dirty = True
+            if not self._save_registered:
+                self._save_registered = True
+                atexit.register(self.save)
+
+    def count(self):
+        """
+        Returns the number of indexed records.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            return len(self._offsets)
+
+    def read_range(self, start, stop, skip=()):
+        """
+        Returns the decoded records number start (inclusive) to stop (exclusive).
+        With skip, a sorted list of record numbers (see position), those records are left out and
+        start and stop count only the remaining ones; the cost grows with len(skip), not the file.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            if not skip:
+                return read_records_at(self.file_path, self._offsets[start:stop])
+            # The first kept record number p is the smallest with p == start + (skipped numbers <= p)
+            position = start
+            while (next_position := start + bisect.bisect_right(skip, position)) != position:
+                position = next_position
+            skipped = set(skip)
+            offsets = []
+            while position < len(self._offsets) and len(offsets) < stop - start:
+                if position not in skipped:
+                    offsets.append(self._offsets[position])
+                position += 1
+            return read_records_at(self.file_path, offsets)
+
+    def position(self, key):
+        """
+        Returns the record number of the given key, or None if it is not indexed.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            return self._positions.get(key)
+
+    def contains(self, key):
+        """
+        Checks whether a record with the given key is indexed.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            return key in self._positions
+
+    def find(self, key):
+        """
+        Returns the decoded record with the given key, or None.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            position = self._positions.get(key)
+            if position is None:
+                return None
+            return read_records_at(self.file_path, [self._offsets[position]])[0]
+
+    def find_many(self, keys):
+        """
+        Returns the decoded records of the given keys (unknown keys are skipped), in the given order.
+        """
+        with file_lock(self.file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            positions = [self._positions.get(key) for key in keys]
+            return read_records_at(self.file_path, [self._offsets[position] for position in positions
+                                                    if position is not None])
+
+
+_indexes = {}
+_indexes_guard = threading.Lock()
+
+
+def get_offset_index(file_path, key_field, kind='offsets', record_filter=None):
+    """
+    Returns the shared OffsetIndex of the given data file and kind.
+    """
+    with _indexes_guard:
+        if (file_path, kind) not in _indexes:
+            _indexes[(file_path, kind)] = OffsetIndex(file_path, key_field, kind, record_filter)
+        return _indexes[(file_path, kind)]
@@ -1,12 +1,20 @@
 # File: order.py
 # Creation Date: 19/04/2025
-# Last Modified Date: 19/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This file contains the Order class.
 
-class Order:
+from record_codec import RecordModel
+
+class Order(RecordModel):
     """
     Represents an order in the e-commerce system.
+    Attributes live in __slots__ (no per-instance __dict__), and to_record/from_record convert
+    directly between objects and the dicts stored in data/orders.txt.
     """
+    # Fields of the stored record, in file order
+    FIELDS = ('order_id', 'user_id', 'pro_id', 'order_time')
+    __slots__ = FIELDS
+
     def __init__(self, order_id="", user_id="", pro_id="", order_time="00-00-0000_00:00:00"):
         """
         Constructs an Order object.
@@ -22,6 +30,17 @@ class Order:
         self.pro_id = pro_id
         self.order_time = order_time
 
+    def to_record(self):
+        """
+        Returns the order information as the dict stored in data/orders.txt.
+        """
+        return {
+            'order_id': self.order_id,
+            'user_id': self.user_id,
+            'pro_id': self.pro_id,
+            'order_time': self.order_time
+        }
+
     def __str__(self):
         """
         Returns the order information as a formatted string dictionary.
@@ -29,9 +48,4 @@ class Order:
         Returns:
             str: A string representation of the Order object.
         """
-        return str({
-            'order_id': self.order_id,
-            'user_id': self.user_id,
-            'pro_id': self.pro_id,
-            'order_time': self.order_time
-        })
+        return str(self.to_record())
@@ -0,0 +1,570 @@
+# File: order_index.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the OrderIndex class, an on-disk index from customer, product and time to orders.
+
+import bisect
+import calendar
+import math
+import mmap
+import os
+import struct
+import threading
+from itertools import islice
+from change_log import get_change_log
+from file_lock import file_lock, temp_path_for
+from record_cache import file_signature, sidecar_path, load_sidecar, save_sidecar
+from record_codec import as_record, encode_record, decode_record, read_records_at, iter_records_with_offsets
+
+
+def order_time_key(order_time):
+    """
+    Turns an order_time string ('DD-MM-YYYY_HH:MM:SS') into seconds since the epoch for sorting.
+    Unparsable times sort first (0).
+    """
+    try:
+        return calendar.timegm((int(order_time[6:10]), int(order_time[3:5]), int(order_time[0:2]),
+                                int(order_time[11:13]), int(order_time[14:16]), int(order_time[17:19])))
+    except (TypeError, ValueError):
+        return 0
+
+
+def order_number(order_id):
+    """
+    Returns the number of an order id ('o_00042' -> 42), so ids sort numerically past the
+    zero-padded width ('o_99999' < 'o_100000'). Ids without a number sort first (-1).
+    """
+    return int(order_id[2:]) if isinstance(order_id, str) and order_id[2:].isdigit() else -1
+
+
+def _key_text(value):
+    """Returns the user_id or pro_id an entry is grouped by as a string (None becomes '')."""
+    return '' if value is None else str(value)
+
+
+# Bump when the layout of the persisted entries changes, so older sidecars are rebuilt
+INDEX_VERSION = 4
+
+# The listings kept sorted on disk: name -> field the entries are grouped by (None: all orders)
+LISTINGS = {'user': 'user_id', 'product': 'pro_id', 'time': None}
+
+
+class _EntryFile:
+    """
+    A sorted file of fixed-width entries (group key, time key, order number, byte offset), read
+    through a memory map. It supports len() and indexing, so bisect can search it while only
+    the entries it looks at are decoded.
+    """
+    def __init__(self, file_path, key_width):
+        """
+        Opens the file; a missing or empty file is an empty listing.
+
+        Args:
+            file_path (str): Path of the entry file.
+            key_width (int): Bytes of the group key, or None for entries without one.
+        """
+        self.key_width = key_width
+        self.struct = _entry_struct(key_width)
+        self._map = None
+        self._length = 0
+        try:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size >= self.struct.size:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._length = len(self._map) // self.struct.size
+        except FileNotFoundError:
+            pass
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        if not 0 <= position < self._length:
+            raise IndexError(position)
+        return self.struct.unpack_from(self._map, position * self.struct.size)
+
+    def __iter__(self):
+        if self._map is None:
+            return iter(())
+        return self.struct.iter_unpack(self._map[:self._length * self.struct.size])
+
+    def close(self):
+        """Releases the memory map."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._length = 0
+
+
+def _entry_struct(key_width):
+    """Returns the struct of one entry: an optional NUL-padded group key, then three signed 64-bit integers."""
+    return struct.Struct('<qqq' if key_width is None else f'<{key_width}sqqq')
+
+
+class OrderIndex:
+    """
+    Lists the live orders of data/orders.txt in (order_time, order number) order, per customer,
+    per product and over all orders, so one page of a customer's history, or one keyset (cursor)
+    page of the admin listing, costs O(log n + page size) however many orders the system holds.
+
+    Each listing is a file of fixed-width entries sorted by (group key, time key, order number,
+    byte offset) in data/index (orders.by-user.<generation>.user.bin, ...), which is searched
+    through a memory map and never loaded as a whole. Orders appended or deleted since the files
+    were written are recorded as one JSON line per change in orders.by-user.delta, together with
+    the signatures of data/orders.txt and data/orders.log after the change, and are merged into the
+    files once the delta outgrows merge_threshold. The header data/index/orders.by-user.json names
+    the current generation of the files. Whenever the orders files changed in any other way (a log
+    compaction, another writer without the index) the index is rebuilt from a full scan.
+    """
+    merge_threshold = 4096  # Delta entries that trigger a merge (at least 1/32 of the indexed orders)
+
+    def __init__(self, orders_file_path):
+        """
+        Constructs the index of the given orders file. Nothing is read until the first lookup.
+
+        Args:
+            orders_file_path (str): Path of the orders data file.
+        """
+        self.orders_file_path = orders_file_path
+        self.index_file_path = sidecar_path(orders_file_path, 'by-user')
+        self.delta_file_path = os.path.splitext(self.index_file_path)[0] + '.delta'
+        self._change_log = get_change_log(orders_file_path, 'order_id')
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._signature = None
+        self._header = None
+        self._files = {}        # listing -> _EntryFile of the current generation
+        self._reset_delta()
+
+    def _reset_delta(self):
+        """Forgets the in-memory delta."""
+        self._delta_size = 0
+        self._added = {}   # offset -> entry [user_id, pro_id, time key, order number, offset]
+        self._deleted = {} # offset -> entry, for deleted orders that are in the entry files
+        self._added_groups = {listing: {} for listing in LISTINGS}   # listing -> group -> sorted (time, number, offset)
+        self._deleted_groups = {listing: {} for listing in LISTINGS}
+
+    def _signatures(self):
+        """Returns the current signatures of the orders file and its change log as one list."""
+        return [list(signature) if signature else None
+                for signature in (file_signature(self.orders_file_path),
+                                  file_signature(self._change_log.log_file_path))]
+
+    def _entry_file_path(self, generation, listing):
+        """Returns the path of one entry file of the given generation."""
+        return f"{os.path.splitext(self.index_file_path)[0]}.{generation}.{listing}.bin"
+
+    @staticmethod
+    def _group_of(entry, listing):
+        """Returns the group key of an entry [user_id, pro_id, time, number, offset] in a listing."""
+        return None if LISTINGS[listing] is None else entry[0 if listing == 'user' else 1]
+
+    def is_current(self):
+        """
+        Checks whether the index (in memory, or else as persisted) matches the files on disk.
+        Loading the persisted index only reads its header and delta, never the entry files.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            if self._loaded and self._signature == self._signatures():
+                return True
+            return self._load()
+
+    def _load(self):
+        """Loads the persisted header and delta; returns whether they describe the orders files on disk."""
+        self._loaded = False
+        header = load_sidecar(self.index_file_path)
+        if header is None or header.get('version') != INDEX_VERSION:
+            return False
+        if self._header is None or self._header.get('generation') != header['generation']:
+            self._open_files(header)
+        self._header = header
+        self._reset_delta()
+        signature = header['signature']
+        try:
+            with open(self.delta_file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    change = decode_record(line)
+                    if change is None: # A torn write: the delta cannot be trusted
+                        return False
+                    if change.get('generation') != header['generation']:
+                        continue # Left over from before the last merge, already in the entry files
+                    self._apply(change['op'], change['entries'])
+                    signature = change['signature']
+        except FileNotFoundError:
+            pass
+        self._signature = signature
+        self._loaded = signature == self._signatures()
+        return self._loaded
+
+    def _open_files(self, header):
+        """Memory-maps the entry files of the header's generation."""
+        for entry_file in self._files.values():
+            entry_file.close()
+        self._files = {listing: _EntryFile(self._entry_file_path(header['generation'], listing),
+                                           header['widths'].get(listing))
+                       for listing in LISTINGS}
+
+    def _ensure_current(self):
+        """Loads the persisted index or rebuilds it if it no longer matches the orders files."""
+        if not self.is_current():
+            self.rebuild()
+
+    def rebuild(self):
+        """
+        Rebuilds the index from a full scan of the orders file and its change log, and persists it.
+        """
+        # Under the shared lock no other process can write while the files are scanned, so the
+        # signature taken first describes exactly what was indexed
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            signature = self._signatures()
+            pending = self._change_log.pending()
+            seen = set()
+            entries = []
+            for offset, order_data in iter_records_with_offsets(self.orders_file_path):
+                order_id = order_data.get('order_id')
+                if order_id in seen or order_id in pending:
+                    continue
+                seen.add(order_id)
+                entries.append(self._entry(order_data, offset))
+            self._write_generation(self._rows(entries), signature)
+
+    @staticmethod
+    def _entry(order_data, offset):
+        """Returns the index entry [user_id, pro_id, time key, order number, offset] of an order."""
+        order_id = order_data.get('order_id')
+        return [_key_text(order_data.get('user_id')), _key_text(order_data.get('pro_id')),
+                order_time_key(order_data.get('order_time')), order_number(order_id), offset]
+
+    def _rows(self, entries):
+        """Returns listing -> unsorted rows ((key bytes,) time key, order number, offset) of the given entries."""
+        rows = {}
+        for listing in LISTINGS:
+            if LISTINGS[listing] is None:
+                rows[listing] = [(entry[2], entry[3], entry[4]) for entry in entries]
+            else:
+                rows[listing] = [(self._group_of(entry, listing).encode('utf-8'), entry[2], entry[3], entry[4])
+                                 for entry in entries]
+        return rows
+
+    def _write_generation(self, rows, signature):
+        """Writes the entry files of a new generation from the rows of every listing (see _rows), then its header."""
+        header = load_sidecar(self.index_file_path)
+        generation = max(self._header['generation'] if self._header else 0,
+                         header.get('generation', 0) if header else 0) + 1
+        widths = {}
+        for listing, listing_rows in rows.items():
+            if LISTINGS[listing] is None:
+                widths[listing] = None
+            else:
+                width = widths[listing] = max((len(row[0]) for row in listing_rows), default=1) or 1
+                listing_rows = [(row[0].ljust(width, b'\0'),) + row[1:] for row in listing_rows]
+            listing_rows.sort()
+            pack = _entry_struct(widths[listing]).pack
+            _write_atomically(self._entry_file_path(generation, listing),
+                              b''.join(pack(*row) for row in listing_rows))
+        header = {'version': INDEX_VERSION, 'generation': generation, 'signature': signature,
+                  'widths': widths, 'count': len(rows['time'])}
+        save_sidecar(self.index_file_path, header)
+        try:
+            os.remove(self.delta_file_path)
+        except FileNotFoundError:
+            pass
+        self._open_files(header)
+        # Entry files of older generations are no longer named by the header
+        directory, stem = os.path.split(os.path.splitext(self.index_file_path)[0])
+        current = f"{stem}.{generation}."
+        for file_name in os.listdir(directory):
+            if file_name.startswith(stem + '.') and file_name.endswith('.bin') and not file_name.startswith(current):
+                try:
+                    os.remove(os.path.join(directory, file_name))
+                except OSError: # Still mapped on a platform that forbids removing it; removed next time
+                    pass
+        self._header = header
+        self._reset_delta()
+        self._signature = signature
+        self._loaded = True
+
+    def _apply(self, op, entries):
+        """Applies added or deleted entries to the in-memory delta."""
+        for entry in entries:
+            offset = entry[4]
+            position = (entry[2], entry[3], offset)
+            if op == 'add':
+                self._added[offset] = entry
+                groups = self._added_groups
+            elif offset in self._added:
+                del self._added[offset]
+                for listing in LISTINGS:
+                    group = self._added_groups[listing][self._group_of(entry, listing)]
+                    group.pop(bisect.bisect_left(group, position))
+                continue
+            else:
+                self._deleted[offset] = entry
+                groups = self._deleted_groups
+            for listing in LISTINGS:
+                bisect.insort(groups[listing].setdefault(self._group_of(entry, listing), []), position)
+        self._delta_size += len(entries)
+
+    def _record_change(self, op, entries):
+        """Persists one change as a line of the delta, applies it, and merges the delta if it grew too large."""
+        signature = self._signatures()
+        change = {'generation': self._header['generation'], 'op': op, 'entries': entries, 'signature': signature}
+        os.makedirs(os.path.dirname(self.delta_file_path), exist_ok=True)
+        with open(self.delta_file_path, 'a', encoding='utf-8') as f:
+            f.write(encode_record(change) + '\n')
+        self._apply(op, entries)
+        self._signature = signature
+        if self._delta_size > max(self.merge_threshold, self._header['count'] // 32):
+            self.merge()
+
+    def merge(self):
+        """
+        Folds the delta into a new generation of entry files.
+        """
+        with file_lock(self.orders_file_path), self._lock:
+            if not self.is_current():
+                return
+            rows = self._rows(list(self._added.values()))
+            for listing, entry_file in self._files.items():
+                if LISTINGS[listing] is None:
+                    rows[listing].extend(row for row in entry_file if row[-1] not in self._deleted)
+                else:
+                    rows[listing].extend((row[0].rstrip(b'\0'),) + row[1:] for row in entry_file
+                                         if row[-1] not in self._deleted)
+            self._write_generation(rows, self._signature)
+
+    def orders_appended(self, orders, offsets, was_current):
+        """
+        Records freshly appended orders with a single append to the delta.
+
+        Args:
+            orders (list): The appended Order objects or dicts.
+            offsets (list): Byte offset of each order, as returned by ChangeLog.append.
+            was_current (bool): Whether is_current() held right before the append.
+        """
+        with file_lock(self.orders_file_path), self._lock:
+            # The index is only extended if it described data/orders.txt exactly up to the append
+            indexed_size = self._signature[0][0] if was_current and self._signature[0] else 0
+            if not was_current or not offsets or offsets[0] != indexed_size:
+                self._loaded = False
+                return
+            self._record_change('add', [self._entry(as_record(order), offset)
+                                        for order, offset in zip(orders, offsets)])
+
+    def order_deleted(self, order, was_current):
+        """
+        Records a deleted order with a single append to the delta.
+
+        Args:
+            order (dict): The record of the deleted order.
+            was_current (bool): Whether is_current() held right before the tombstone was logged.
+        """
+        with file_lock(self.orders_file_path), self._lock:
+            # A compaction may have rewritten data/orders.txt in the meantime, which moves every offset
+            if not was_current or self._signatures()[0] != self._signature[0]:
+                self._loaded = False
+                return
+            entry = self._find_entry(as_record(order))
+            if entry is None:
+                self._signature = self._signatures()
+                return
+            self._record_change('delete', [entry])
+
+    def _find_entry(self, order_data):
+        """Returns the live entry of an order (found by customer, time and number), or None."""
+        order_id = order_data.get('order_id')
+        entry = self._entry(order_data, 0)
+        user_id, time_key, number = entry[0], entry[2], entry[3]
+        listing = self._listing('user', user_id)
+        first = listing.bisect_left((time_key, number))
+        last = listing.bisect_left((time_key, number, math.inf))
+        candidates = [position[2] for position in islice(listing.iter_from_index(first), last - first)]
+        if len(candidates) > 1: # Several orders share the time and number (ids without a number)
+            records = read_records_at(self.orders_file_path, candidates)
+            candidates = [offset for offset, record in zip(candidates, records)
+                          if record is not None and record.get('order_id') == order_id]
+        if not candidates:
+            return None
+        return [user_id, entry[1], time_key, number, candidates[0]]
+
+    def _listing(self, listing, group=None):
+        """Returns the live entries of one listing (and group) as a _Listing."""
+        entry_file = self._files[listing]
+        if entry_file.key_width is None:
+            prefix = ()
+        else:
+            key = group.encode('utf-8')
+            prefix = (key.ljust(entry_file.key_width, b'\0'),) if len(key) <= entry_file.key_width else (key,)
+        return _Listing(entry_file, prefix, self._added_groups[listing].get(group, []),
+                        self._deleted_groups[listing].get(group, []))
+
+    def _listing_for(self, user_id=None, pro_id=None):
+        """Returns the listing of one customer, else of one product, else of all orders."""
+        if user_id is not None:
+            return self._listing('user', _key_text(user_id))
+        if pro_id is not None:
+            return self._listing('product', _key_text(pro_id))
+        return self._listing('time')
+
+    def count(self, user_id=None):
+        """
+        Returns the number of live orders of the given customer, or of all customers if no user_id is given.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            return len(self._listing_for(user_id))
+
+    def read_page(self, user_id, start, stop):
+        """
+        Returns the decoded orders number start (inclusive) to stop (exclusive) of the given customer,
+        oldest first.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            positions = islice(self._listing_for(user_id).iter_from_index(start), max(0, stop - start))
+            return read_records_at(self.orders_file_path, [position[2] for position in positions])
+
+    def read_after(self, cursor, limit, user_id=None, pro_id=None):
+        """
+        Returns up to limit decoded orders that come after the cursor in (order_time, order number)
+        order, optionally only those of one customer and/or one product. Costs O(log n + limit)
+        unless both filters are given, in which case the customer's later orders are scanned.
+
+        Args:
+            cursor (tuple): (time key, order number, offset) of the last order already shown,
+                or None to start at the oldest.
+            limit (int): Maximum number of orders to return.
+            user_id (str): Only return orders of this customer, if given.
+            pro_id (str): Only return orders of this product, if given.
+
+        Returns:
+            tuple: (list of order records, cursor of the last one, or None if no orders follow it)
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            positions = self._listing_for(user_id, pro_id).iter_after(None if cursor is None else tuple(cursor))
+            if user_id is None or pro_id is None:
+                page = list(islice(positions, limit + 1)) # One extra entry tells whether a next page exists
+                records = read_records_at(self.orders_file_path, [position[2] for position in page[:limit]])
+            else:
+                # The customer's entries carry no pro_id, so their records are read in batches and filtered
+                page, records = [], []
+                while len(page) <= limit:
+                    batch = list(islice(positions, limit + 1))
+                    if not batch:
+                        break
+                    for position, record in zip(batch, read_records_at(self.orders_file_path,
+                                                                       [position[2] for position in batch])):
+                        if record is not None and _key_text(record.get('pro_id')) == _key_text(pro_id):
+                            page.append(position)
+                            records.append(record)
+                records = records[:limit]
+            next_cursor = tuple(page[limit - 1]) if len(page) > limit else None
+            return records, next_cursor
+
+
+class _Listing:
+    """
+    The live entries of one listing (e.g. one customer's orders) in sorted order: a range of an
+    _EntryFile minus the deleted entries, merged with the entries added since the file was written.
+    Positions are (time key, order number, offset) tuples.
+    """
+    def __init__(self, entry_file, prefix, added, deleted):
+        self._file = entry_file
+        self._prefix = prefix
+        self._skip = len(prefix)
+        self._added = added
+        self._first = bisect.bisect_left(entry_file, prefix)
+        self._last = bisect.bisect_left(entry_file, prefix + (math.inf,)) if prefix else len(entry_file)
+        # File positions of the deleted entries of this listing
+        self._deleted = []
+        for position in deleted:
+            file_position = bisect.bisect_left(entry_file, prefix + position, self._first, self._last)
+            if file_position < self._last and entry_file[file_position][self._skip:] == position:
+                self._deleted.append(file_position)
+        self._deleted.sort()
+        self._deleted_set = set(self._deleted)
+
+    def __len__(self):
+        return self._last - self._first - len(self._deleted) + len(self._added)
+
+    def _position(self, file_position):
+        """Returns the position stored at a file position."""
+        return self._file[file_position][self._skip:]
+
+    def bisect_left(self, position):
+        """Returns the number of live entries that sort before the given (possibly partial) position."""
+        file_position = bisect.bisect_left(self._file, self._prefix + position, self._first, self._last)
+        return (file_position - self._first - bisect.bisect_left(self._deleted, file_position)
+                + bisect.bisect_left(self._added, position))
+
+    def _merged(self, file_position, added_position):
+        """Yields the live positions from the given file position and added position onwards, in order."""
+        while file_position < self._last or added_position < len(self._added):
+            if file_position < self._last and file_position in self._deleted_set:
+                file_position += 1
+                continue
+            stored = self._position(file_position) if file_position < self._last else None
+            if stored is not None and (added_position == len(self._added) or stored < self._added[added_position]):
+                yield stored
+                file_position += 1
+            else:
+                yield self._added[added_position]
+                added_position += 1
+
+    def iter_after(self, cursor):
+        """Yields the live positions after the cursor (all of them if cursor is None)."""
+        if cursor is None:
+            return self._merged(self._first, 0)
+        return self._merged(bisect.bisect_right(self._file, self._prefix + cursor, self._first, self._last),
+                            bisect.bisect_right(self._added, cursor))
+
+    def iter_from_index(self, index):
+        """Yields the live positions from the index-th onwards in O(log n) to reach it."""
+        # consumed(p): live entries before file position p, when file entry p is the next one stored
+        def consumed(file_position):
+            return (file_position - self._first - bisect.bisect_left(self._deleted, file_position)
+                    + bisect.bisect_left(self._added, self._position(file_position)))
+
+        low, high, best = self._first, self._last, None
+        while low < high: # The last file position with consumed <= index
+            middle = (low + high) // 2
+            if consumed(middle) <= index:
+                best, low = middle, middle + 1
+            else:
+                high = middle
+        if best is None:
+            file_position, added_position, before = self._first, 0, 0
+        else:
+            file_position = best
+            added_position = bisect.bisect_left(self._added, self._position(best))
+            before = consumed(best)
+        return islice(self._merged(file_position, added_position), max(0, index - before), None)
+
+
+def _write_atomically(file_path, data):
+    """Writes a binary file through a temporary file and a rename."""
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    temp_path = temp_path_for(file_path)
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+_indexes = {}
+_indexes_guard = threading.Lock()
+
+
+def get_order_index(orders_file_path):
+    """
+    Returns the shared OrderIndex of the given orders file.
+    """
+    with _indexes_guard:
+        if orders_file_path not in _indexes:
+            _indexes[orders_file_path] = OrderIndex(orders_file_path)
+        return _indexes[orders_file_path]
@@ -1,18 +1,26 @@
 # File: order_operation.py
 # Creation Date: 23/04/2025
-# Last Modified Date: 23/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This file contains the OrderOperation class.
 
 import os
 import random
+import string
 import time
 import math
-import pandas as pd
-import matplotlib.pyplot as plt
 from order import Order
+from product import Product
 from customer_operation import CustomerOperation
 from product_operation import ProductOperation
 from user_operation import UserOperation
+from change_log import get_change_log
+from file_lock import file_lock
+from id_allocator import get_id_allocator
+from order_index import get_order_index
+from figure_cache import get_figure_cache
+from consumption_rollup import get_consumption_rollup
+from sales_counter import get_sales_counter
+from offset_index import get_offset_index
 
 class OrderOperation:
     """
@@ -27,75 +35,154 @@ class OrderOperation:
             os.makedirs(os.path.dirname(self.orders_file_path), exist_ok=True)
             return []
         
-        with open(self.orders_file_path, 'r', encoding='utf-8') as f:
-            orders = []
-            for line in f:
-                try:
-                    orders.append(eval(line.strip()))
-                except:
-                    continue
-            return orders
+        # Deletions pending in data/orders.log are applied on top of data/orders.txt
+        return get_change_log(self.orders_file_path, 'order_id').read()
 
     def _write_orders(self, orders_list):
         """Helper method to write a list of orders back to the file."""
         os.makedirs(os.path.dirname(self.orders_file_path), exist_ok=True)
-        with open(self.orders_file_path, 'w', encoding='utf-8') as f:
-            for order in orders_list:
-                f.write(str(order) + '\n')
+        get_change_log(self.orders_file_path, 'order_id').rewrite(orders_list)
     
+    def id_allocator(self):
+        """
+        Returns the IdAllocator of the order ids in data/orders.txt.
+        """
+        return get_id_allocator(self.orders_file_path, 'order_id', 'o_', 5)
+
     def generate_unique_order_id(self):
         """
-        Generates a unique 5-digit order id starting with 'o_'.
+        Generates a unique order id starting with 'o_' (at least 5 digits) in constant time.
         """
-        orders = self._read_orders()
-        existing_ids = {order.get('order_id') for order in orders}
-        
-        while True:
-            new_id = f"o_{random.randint(0, 99999):05d}"
-            if new_id not in existing_ids:
-                return new_id
+        return self.id_allocator().allocate()
 
     def create_an_order(self, customer_id, product_id, create_time=None):
         """
         Creates a new order and saves it to the database.
         """
-        if create_time is None:
-            create_time = time.strftime("%d-%m-%Y_%H:%M:%S")
-            
-        new_order = Order(
-            order_id=self.generate_unique_order_id(),
-            user_id=customer_id,
-            pro_id=product_id,
-            order_time=create_time
-        )
-        
-        with open(self.orders_file_path, 'a', encoding='utf-8') as f:
-            f.write(str(new_order) + '\n')
+        self.create_orders_bulk([(customer_id, product_id, create_time)])
         return True
 
-    def delete_order(self, order_id):
+    def _consumption_rollup(self):
+        """Helper returning the customer x year x month consumption rollup of the orders."""
+        return get_consumption_rollup(self.orders_file_path, ProductOperation().products_file_path)
+
+    def _sales_counter(self):
+        """Helper returning the per-product sales counters of the orders."""
+        return get_sales_counter(self.orders_file_path, ProductOperation().products_file_path)
+
+    def get_monthly_consumption(self, customer_id=None):
         """
-        Deletes an order from data/orders.txt based on the order_id.
+        Returns the consumption per month of one customer, or of all customers if no customer_id
+        is given, from the precomputed rollup.
+
+        Returns:
+            list: (year, month, revenue, order count) tuples in chronological order.
+        """
+        return self._consumption_rollup().monthly_consumption(customer_id)
+
+    def get_best_sellers(self, top_n=10, category=None):
+        """
+        Returns the best-selling products, from the per-product sales counters. Like the old
+        top-10 chart, only orders with a valid time whose product is still in the catalog with
+        a price are counted.
+
+        Args:
+            top_n (int): Number of products to return.
+            category (str): Only rank the products of this category, if given.
+
+        Returns:
+            list: (Product, number of orders) tuples, best first; ties in order of first sale
+                  (in catalog order within a category).
         """
-        all_orders = self._read_orders()
-        original_count = len(all_orders)
+        products_file_path = ProductOperation().products_file_path
+        product_index = get_offset_index(products_file_path, 'pro_id')
+        sales = self._sales_counter()
+        if category is None:
+            best = sales.top(top_n)
+        else:
+            from columnar_store import get_product_store # NumPy is only loaded for a category query
+            columns = get_product_store(products_file_path).load()
+            codes = [code for code, name in enumerate(columns['pro_category_names']) if name == category]
+            if not codes: return []
+            best = sales.top(top_n, candidates=columns['pro_id'][columns['pro_category_code'] == codes[0]].tolist())
+        products = {product.get('pro_id'): product for product in product_index.find_many([pro_id for pro_id, count in best])}
+        return [(Product.from_record(products[pro_id]), count) for pro_id, count in best if pro_id in products]
+
+    def create_orders_bulk(self, order_requests):
+        """
+        Creates many orders at once: all ids are taken from the id allocator in one call
+        and all new rows are written to data/orders.txt with a single buffered append.
+
+        Args:
+            order_requests (iterable): (customer_id, product_id, create_time) tuples;
+                create_time may be None for the current time.
+
+        Returns:
+            tuple: (number of orders created, orders per second)
+        """
+        start_time = time.perf_counter()
+        now = time.strftime("%d-%m-%Y_%H:%M:%S")
+        
+        order_requests = list(order_requests)
+        new_orders = []
+        for order_id, (customer_id, product_id, create_time) in zip(
+                self.id_allocator().allocate_many(len(order_requests)), order_requests):
+            new_orders.append(Order(
+                order_id=order_id,
+                user_id=customer_id,
+                pro_id=product_id,
+                order_time=create_time if create_time is not None else now
+            ))
         
-        orders_after_deletion = [o for o in all_orders if o.get('order_id') != order_id]
+        if new_orders:
+            order_index = get_order_index(self.orders_file_path)
+            rollup = self._consumption_rollup()
+            sales = self._sales_counter()
+            # Locked, so no other process appends between the is_current() checks and the append
+            with file_lock(self.orders_file_path):
+                was_current = order_index.is_current()
+                rollup_was_current = rollup.is_current()
+                sales_was_current = sales.is_current()
+                offsets = get_change_log(self.orders_file_path, 'order_id').append(new_orders)
+                order_index.orders_appended(new_orders, offsets, was_current)
+                rollup.orders_appended(new_orders, rollup_was_current)
+                sales.orders_appended(new_orders, sales_was_current)
         
-        if len(orders_after_deletion) < original_count:
-            self._write_orders([Order(**o) for o in orders_after_deletion])
-            return True
-        return False
+        elapsed = time.perf_counter() - start_time
+        return (len(new_orders), len(new_orders) / elapsed if elapsed > 0 else 0.0)
+
+    def delete_order(self, order_id):
+        """
+        Deletes an order from data/orders.txt based on the order_id.
+        """
+        change_log = get_change_log(self.orders_file_path, 'order_id')
+        with file_lock(self.orders_file_path):
+            order = change_log.get(order_id)
+            if order is None:
+                return False
+            
+            # A tombstone in data/orders.log hides the order until the log is compacted
+            order_index = get_order_index(self.orders_file_path)
+            rollup = self._consumption_rollup()
+            sales = self._sales_counter()
+            was_current = order_index.is_current()
+            rollup_was_current = rollup.is_current()
+            sales_was_current = sales.is_current()
+            change_log.delete(order_id)
+            order_index.order_deleted(order, was_current)
+            rollup.order_deleted(order, rollup_was_current)
+            sales.order_deleted(order, sales_was_current)
+        return True
 
     def get_order_list(self, customer_id, page_number):
         """
-        Retrieves one page of orders for a given customer.
+        Retrieves one page of orders for a given customer, oldest first.
         """
-        all_orders = self._read_orders()
-        customer_orders_data = [o for o in all_orders if o.get('user_id') == customer_id]
+        # The per-customer index holds this customer's order offsets sorted by order_time
+        order_index = get_order_index(self.orders_file_path)
         
         items_per_page = 10
-        total_pages = math.ceil(len(customer_orders_data) / items_per_page)
+        total_pages = math.ceil(order_index.count(customer_id) / items_per_page)
         
         if page_number < 1 or (page_number > total_pages and total_pages > 0):
             return ([], page_number, total_pages)
@@ -103,29 +190,81 @@ class OrderOperation:
         start_index = (page_number - 1) * items_per_page
         end_index = start_index + items_per_page
         
-        page_orders_data = customer_orders_data[start_index:end_index]
-        order_objects = [Order(**data) for data in page_orders_data]
+        page_orders_data = order_index.read_page(customer_id, start_index, end_index)
+        order_objects = [Order.from_record(data) for data in page_orders_data]
 
         return (order_objects, page_number, total_pages)
+
+    def get_all_orders_page(self, cursor=None, customer_id=None, product_id=None, page_size=10):
+        """
+        Retrieves one page of the orders of all customers, oldest first, with keyset pagination:
+        instead of a page number, the caller passes back the cursor returned with the previous page,
+        so every page costs the same however deep it is.
+
+        Args:
+            cursor (tuple): Cursor returned with the previous page, or None for the first page.
+            customer_id (str): Only list the orders of this customer, if given.
+            product_id (str): Only list the orders of this product, if given.
+            page_size (int): Maximum number of orders per page.
+
+        Returns:
+            tuple: (list of Order objects, cursor of the next page or None if this is the last page)
+        """
+        page_orders_data, next_cursor = get_order_index(self.orders_file_path).read_after(
+            cursor, page_size, user_id=customer_id, pro_id=product_id)
+        return ([Order.from_record(data) for data in page_orders_data], next_cursor)
+
+    def browse_all_orders(self, param='', state=None):
+        """
+        Returns one page of the admin order listing, oldest first, through keyset pagination.
+
+        Args:
+            param (str): '' for all orders, a user_id for the orders of that customer, or 'next'
+                to continue the listing described by state.
+            state (list): The state returned with the previous page ('next' only).
+
+        Returns:
+            tuple: (list of Order objects, page number, total pages,
+                    state for the next call: [customer filter, cursor of the next page or None, page number])
+
+        Raises:
+            ValueError: If 'next' is asked for but no page follows.
+        """
+        if param == 'next':
+            if state is None or state[1] is None:
+                raise ValueError("No more orders to show.")
+            customer_filter, cursor, page = state[0], state[1], state[2] + 1
+        else:
+            customer_filter, cursor, page = param or None, None, 1
+        orders, next_cursor = self.get_all_orders_page(cursor, customer_id=customer_filter)
+        total_pages = math.ceil(self.count_orders(customer_filter) / 10)
+        return (orders, page, total_pages, [customer_filter, next_cursor, page])
+
+    def count_orders(self, customer_id=None):
+        """
+        Returns the number of orders of the given customer, or of all customers if no customer_id is given.
+        """
+        return get_order_index(self.orders_file_path).count(customer_id)
         
     def generate_test_order_data(self):
         """
         Generates test data: 10 customers and 50-200 orders for each.
+        Returns the (orders created, orders per second) result of create_orders_bulk.
+        Raises ValueError if there are no products to order.
         """
         cust_op = CustomerOperation()
         prod_op = ProductOperation()
         
         all_products_data = prod_op._read_products()
         if not all_products_data:
-            print("Cannot generate test orders: No products found in data/products.txt.")
-            return
+            raise ValueError("Cannot generate test orders: No products found in data/products.txt.")
 
         product_ids = [p['pro_id'] for p in all_products_data]
 
         new_customer_ids = []
         for i in range(10):
-            # Ensure unique username for test users
-            username = f'testuser_{int(time.time())}_{i}'
+            # Ensure unique username for test users (usernames may only contain letters and underscores)
+            username = 'testuser_' + ''.join(random.choice(string.ascii_lowercase) for _ in range(8))
             if not UserOperation().check_username_exist(username):
                 cust_op.register_customer(
                     username,
@@ -137,6 +276,7 @@ class OrderOperation:
                 if user_obj:
                     new_customer_ids.append(user_obj.user_id)
 
+        order_requests = []
         for user_id in new_customer_ids:
             num_orders = random.randint(50, 200)
             for _ in range(num_orders):
@@ -144,95 +284,102 @@ class OrderOperation:
                 now = time.time()
                 random_past_time = now - random.uniform(0, 365 * 24 * 60 * 60)
                 random_time_str = time.strftime("%d-%m-%Y_%H:%M:%S", time.localtime(random_past_time))
-                self.create_an_order(user_id, random_product_id, random_time_str)
+                order_requests.append((user_id, random_product_id, random_time_str))
 
-    def _get_orders_with_product_details(self):
-        """Helper to create a merged DataFrame of orders and product prices."""
-        orders_df = pd.DataFrame(self._read_orders())
-        products_df = pd.DataFrame(ProductOperation()._read_products())
+        # All orders are allocated and written in one go
+        return self.create_orders_bulk(order_requests)
 
-        if orders_df.empty or products_df.empty:
-            return pd.DataFrame()
-        
-        products_df['pro_current_price'] = pd.to_numeric(products_df['pro_current_price'], errors='coerce')
-        merged_df = pd.merge(orders_df, products_df[['pro_id', 'pro_current_price', 'pro_name']], on='pro_id', how='left')
-        merged_df['order_time'] = pd.to_datetime(merged_df['order_time'], format='%d-%m-%Y_%H:%M:%S', errors='coerce')
-        merged_df.dropna(subset=['order_time', 'pro_current_price'], inplace=True)
-        
-        return merged_df
+    def generate_all_figures(self):
+        """
+        Generates every statistical figure: products and orders are loaded and aggregated once,
+        then the figures render in parallel. Figures whose data files have not changed since they
+        were rendered are skipped. pandas and matplotlib are only imported here.
+
+        Returns:
+            dict: File name -> render seconds, or None for a figure that was already up to date.
+        """
+        from analytics_engine import AnalyticsEngine
+        from figure_renderer import render_all_figures
+        prod_op = ProductOperation()
+        analytics = AnalyticsEngine(prod_op.products_file_path, self.orders_file_path).compute
+        fingerprints = {'products': prod_op.figure_fingerprint(), 'orders': self.figure_fingerprint()}
+        return render_all_figures(analytics, prod_op.figure_path, fingerprints=fingerprints)
+
+    def figure_fingerprint(self, *extra):
+        """Returns the fingerprint of the inputs of the order figures (see FigureCache)."""
+        input_paths = [ProductOperation().products_file_path, self.orders_file_path,
+                       get_change_log(self.orders_file_path, 'order_id').log_file_path]
+        return get_figure_cache(self.figure_path).fingerprint(input_paths, *extra)
+
+    def _get_analytics(self, analytics):
+        """Helper returning the given aggregates, or computing them (orders joined to products) if none were given."""
+        if analytics is None:
+            from analytics_engine import AnalyticsEngine # pandas/NumPy are only loaded for analytics
+            analytics = AnalyticsEngine(ProductOperation().products_file_path, self.orders_file_path).compute()
+        return analytics
 
     def generate_single_customer_consumption_figure(self, customer_id):
         """
-        Generates a bar chart of a single customer's monthly consumption.
+        Generates a bar chart of a single customer's monthly consumption, read from the rollup.
+
+        Args:
+            customer_id (str): The customer whose orders are charted.
         """
-        df = self._get_orders_with_product_details()
-        if df.empty: return
-        
-        customer_df = df[df['user_id'] == customer_id]
-        if customer_df.empty: return
+        file_name = f'single_customer_consumption_{customer_id}.png'
+        fingerprint = self.figure_fingerprint(customer_id)
+        if get_figure_cache(self.figure_path).is_fresh(file_name, fingerprint): return
 
-        customer_df['month'] = customer_df['order_time'].dt.month
-        monthly_consumption = customer_df.groupby('month')['pro_current_price'].sum().reindex(range(1, 13), fill_value=0)
-        
-        plt.figure(figsize=(10, 6))
-        monthly_consumption.plot(kind='bar')
-        plt.title(f'Monthly Consumption for Customer: {customer_id}')
-        plt.xlabel('Month')
-        plt.ylabel('Total Consumption ($)')
-        plt.xticks(ticks=range(12), labels=['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'], rotation=45)
-        plt.tight_layout()
-        
-        os.makedirs(self.figure_path, exist_ok=True)
-        plt.savefig(os.path.join(self.figure_path, f'single_customer_consumption_{customer_id}.png'))
-        plt.close()
+        months = self.get_monthly_consumption(customer_id)
+        if not months: return
+
+        from consumption_rollup import consumption_series
+        from figure_renderer import render_single_customer_consumption_figure
+        render_single_customer_consumption_figure(consumption_series(months), customer_id,
+                                                  os.path.join(self.figure_path, file_name))
+        get_figure_cache(self.figure_path).store(file_name, fingerprint)
 
-    def generate_all_customers_consumption_figure(self):
+    def generate_all_customers_consumption_figure(self, analytics=None):
         """
         Generates a line chart of all customers' combined monthly consumption.
+
+        Args:
+            analytics (dict): Aggregates from AnalyticsEngine.compute(); computed here if not given.
         """
-        df = self._get_orders_with_product_details()
-        if df.empty: return
+        file_name = 'all_customers_consumption.png'
+        fingerprint = self.figure_fingerprint()
+        if get_figure_cache(self.figure_path).is_fresh(file_name, fingerprint): return
 
-        df['month'] = df['order_time'].dt.month
-        monthly_consumption = df.groupby('month')['pro_current_price'].sum().reindex(range(1, 13), fill_value=0)
-        
-        plt.figure(figsize=(10, 6))
-        monthly_consumption.plot(kind='line', marker='o')
-        plt.title('Total Monthly Consumption (All Customers)')
-        plt.xlabel('Month')
-        plt.ylabel('Total Consumption ($)')
-        plt.xticks(ticks=range(1, 13), labels=['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
-        plt.grid(True)
-        plt.tight_layout()
-        
-        os.makedirs(self.figure_path, exist_ok=True)
-        plt.savefig(os.path.join(self.figure_path, 'all_customers_consumption.png'))
-        plt.close()
+        monthly_consumption = self._get_analytics(analytics)['monthly_consumption']
+        if monthly_consumption is None: return
+        from figure_renderer import render_all_customers_consumption_figure
+        render_all_customers_consumption_figure(monthly_consumption,
+                                                os.path.join(self.figure_path, file_name))
+        get_figure_cache(self.figure_path).store(file_name, fingerprint)
 
-    def generate_all_top_10_best_sellers_figure(self):
+    def generate_all_top_10_best_sellers_figure(self, analytics=None):
         """
         Generates a bar chart of the top 10 best-selling products.
+
+        Args:
+            analytics (dict): Aggregates from AnalyticsEngine.compute(); computed here if not given.
         """
-        df = self._get_orders_with_product_details()
-        if df.empty: return
-        
-        top_10 = df['pro_name'].value_counts().nlargest(10)
-        
-        plt.figure(figsize=(12, 8))
-        top_10.sort_values(ascending=True).plot(kind='barh')
-        plt.title('Top 10 Best-Selling Products')
-        plt.xlabel('Number of Orders')
-        plt.ylabel('Product Name')
-        plt.tight_layout()
-        
-        os.makedirs(self.figure_path, exist_ok=True)
-        plt.savefig(os.path.join(self.figure_path, 'all_top_10_best_sellers.png'))
-        plt.close()
+        file_name = 'all_top_10_best_sellers.png'
+        fingerprint = self.figure_fingerprint()
+        if get_figure_cache(self.figure_path).is_fresh(file_name, fingerprint): return
+
+        if analytics is None:
+            from analytics_engine import AnalyticsEngine # pandas is only loaded for the figure
+            top_10 = AnalyticsEngine(ProductOperation().products_file_path, self.orders_file_path).top_sellers()
+        else:
+            top_10 = analytics['top_sellers']
+        if top_10 is None: return
+        from figure_renderer import render_top_10_best_sellers_figure
+        render_top_10_best_sellers_figure(top_10, os.path.join(self.figure_path, file_name))
+        get_figure_cache(self.figure_path).store(file_name, fingerprint)
 
     def delete_all_orders(self):
         """
         Removes all order data from data/orders.txt.
         """
-        if os.path.exists(self.orders_file_path):
-            os.remove(self.orders_file_path)
+        get_change_log(self.orders_file_path, 'order_id').remove()
 
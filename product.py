@@ -1,12 +1,21 @@
 # File: product.py
 # Creation Date: 19/04/2025
-# Last Modified Date: 19/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This file contains the Product class.
 
-class Product:
+from record_codec import RecordModel
+
+class Product(RecordModel):
     """
     Represents a product in the e-commerce system.
+    Attributes live in __slots__ (no per-instance __dict__), and to_record/from_record convert
+    directly between objects and the dicts stored in data/products.txt.
     """
+    # Fields of the stored record, in file order
+    FIELDS = ('pro_id', 'pro_model', 'pro_category', 'pro_name',
+              'pro_current_price', 'pro_raw_price', 'pro_discount', 'pro_likes_count')
+    __slots__ = FIELDS
+
     def __init__(self, pro_id="", pro_model="", pro_category="", pro_name="",
                  pro_current_price=0.0, pro_raw_price=0.0, pro_discount=0.0, pro_likes_count=0):
         """
@@ -31,14 +40,11 @@ class Product:
         self.pro_discount = pro_discount
         self.pro_likes_count = pro_likes_count
 
-    def __str__(self):
+    def to_record(self):
         """
-        Returns the product information as a formatted string dictionary.
-
-        Returns:
-            str: A string representation of the Product object.
+        Returns the product information as the dict stored in data/products.txt.
         """
-        return str({
+        return {
             'pro_id': self.pro_id,
             'pro_model': self.pro_model,
             'pro_category': self.pro_category,
@@ -47,4 +53,13 @@ class Product:
             'pro_raw_price': self.pro_raw_price,
             'pro_discount': self.pro_discount,
             'pro_likes_count': self.pro_likes_count
-        })
+        }
+
+    def __str__(self):
+        """
+        Returns the product information as a formatted string dictionary.
+
+        Returns:
+            str: A string representation of the Product object.
+        """
+        return str(self.to_record())
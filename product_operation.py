@@ -1,14 +1,104 @@
 # File: product_operation.py
 # Creation Date: 22/04/2025
-# Last Modified Date: 22/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This file contains the ProductOperation class.
 
 import os
 import glob
-import pandas as pd
 import math
-import matplotlib.pyplot as plt
 from product import Product
+from record_cache import record_cache, file_signature
+from record_codec import encode_record
+from file_lock import file_lock, temp_path_for
+from source_manifest import SourceManifest
+from offset_index import get_offset_index
+from keyword_index import get_keyword_index
+from figure_cache import get_figure_cache
+
+# Source CSV column -> Product attribute, and the dtype each source column is parsed with
+SOURCE_COLUMNS = {
+    'id': 'pro_id', 'model': 'pro_model', 'category': 'pro_category',
+    'name': 'pro_name', 'current_price': 'pro_current_price',
+    'raw_price': 'pro_raw_price', 'discount': 'pro_discount',
+    'likes_count': 'pro_likes_count'
+}
+SOURCE_DTYPES = {
+    'id': str, 'model': str, 'category': str, 'name': str,
+    'current_price': 'float64', 'raw_price': 'float64', 'discount': 'float64',
+    'likes_count': 'Int64'
+}
+
+
+def _read_source_csv(file_path, chunk_rows=None):
+    """Reads only the mapped columns of a source CSV with explicit dtypes (in chunks if chunk_rows is given)."""
+    import pandas as pd # Imported on first use so that starting the application stays fast
+
+    return pd.read_csv(file_path, usecols=lambda column: column in SOURCE_COLUMNS,
+                       dtype=SOURCE_DTYPES, chunksize=chunk_rows)
+
+
+def _product_frame(df):
+    """Renames the source columns to Product attributes and adds any missing one."""
+    df = df.rename(columns=SOURCE_COLUMNS)
+
+    # Ensure all required columns exist, fill missing with defaults if necessary
+    for col in SOURCE_COLUMNS.values():
+        if col not in df.columns:
+            df[col] = ""
+    return df[list(SOURCE_COLUMNS.values())]
+
+
+def _encode_frame(df):
+    """Serialises every row of a product frame to a JSON line in one vectorised call."""
+    if df.empty:
+        return []
+    return df.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n').split('\n')
+
+
+def read_product_source(file_path):
+    """
+    Parses one source CSV into product rows. Runs in a worker process during ingestion.
+    Only the mapped columns are read, with explicit dtypes, and the rows are serialised to
+    JSON lines in one vectorised call instead of building a Product per row.
+
+    Returns:
+        tuple: (list of pro_id, list of pro_name, list of encoded record lines)
+    """
+    df = _product_frame(_read_source_csv(file_path)).drop_duplicates(subset=['pro_id'])
+    return (df['pro_id'].tolist(), df['pro_name'].tolist(), _encode_frame(df))
+
+
+def source_chunk_rows(file_path, memory_budget):
+    """
+    Returns how many rows of a source CSV to read at a time so one chunk, its DataFrame and
+    its JSON lines stay within memory_budget bytes. The cost of a row is estimated from the
+    average line length of the first 64 KiB of the file.
+    """
+    with open(file_path, 'rb') as f:
+        sample = f.read(1 << 16)
+    average_line = len(sample) / max(1, sample.count(b'\n'))
+    # Raw text, its JSON line and ~8 pandas values of ~64 bytes each per row
+    return max(1000, int(memory_budget // (3 * average_line + 512)))
+
+
+def read_product_sources(csv_files, workers=None):
+    """
+    Parses the given source CSV files with read_product_source, concurrently in a process pool.
+
+    Args:
+        csv_files (list): Paths of the CSV files.
+        workers (int): Maximum number of worker processes (defaults to the CPU count).
+
+    Returns:
+        list: One (pro_ids, pro_names, lines) tuple per file, in the given order.
+    """
+    if len(csv_files) <= 1 or workers == 1:
+        return [read_product_source(file) for file in csv_files]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(csv_files))) as pool:
+        return list(pool.map(read_product_source, csv_files))
+
 
 class ProductOperation:
     """
@@ -20,74 +110,145 @@ class ProductOperation:
 
     def _read_products(self):
         """Helper method to read all products from the products.txt file."""
-        if not os.path.exists(self.products_file_path):
-            return []
-        
-        with open(self.products_file_path, 'r', encoding='utf-8') as f:
-            products = []
-            for line in f:
-                try:
-                    products.append(eval(line.strip()))
-                except:
-                    continue
-            return products
+        return record_cache.load(self.products_file_path)
 
     def _write_products(self, products_list):
         """Helper method to write a list of products back to the file."""
         os.makedirs(os.path.dirname(self.products_file_path), exist_ok=True)
-        with open(self.products_file_path, 'w', encoding='utf-8') as f:
-            for product in products_list:
-                f.write(str(product) + '\n')
-
-    def extract_products_from_files(self):
-        """
-        Extracts product information from source CSV files into data/products.txt.
-        """
-        csv_files = glob.glob(self.products_source_path)
-        if not csv_files:
-            return # No source files found
-
-        all_products = []
-        for file in csv_files:
-            df = pd.read_csv(file)
-            # Rename columns to match our Product class attributes
-            # This requires knowing the structure of the source CSVs. We'll assume a mapping.
-            # Example mapping: 'id'->'pro_id', 'name'->'pro_name', etc.
-            # For this assignment, we will assume the columns are consistently named across files.
-            df = df.rename(columns={
-                'id': 'pro_id', 'model': 'pro_model', 'category': 'pro_category',
-                'name': 'pro_name', 'current_price': 'pro_current_price',
-                'raw_price': 'pro_raw_price', 'discount': 'pro_discount',
-                'likes_count': 'pro_likes_count'
-            })
-            
-            # Ensure all required columns exist, fill missing with defaults if necessary
-            required_cols = ['pro_id', 'pro_model', 'pro_category', 'pro_name', 
-                             'pro_current_price', 'pro_raw_price', 'pro_discount', 'pro_likes_count']
-            for col in required_cols:
-                if col not in df.columns:
-                    df[col] = "" # or appropriate default like 0 for numbers
-
-            all_products.append(df[required_cols])
-
-        if not all_products:
-            return
-
-        combined_df = pd.concat(all_products, ignore_index=True)
-        combined_df.drop_duplicates(subset=['pro_id'], inplace=True)
-        
-        product_objects = [Product(**row) for index, row in combined_df.iterrows()]
-        self._write_products(product_objects)
+        record_cache.write(self.products_file_path, products_list)
+
+    def extract_products_from_files(self, workers=None, memory_budget=None):
+        """
+        Brings data/products.txt up to date with the source CSV files.
+        Only the CSV files added or changed since the last extraction (according to the source
+        manifest) are parsed, concurrently in a process pool. Their rows are merged into the
+        catalog by pro_id and the products of removed files are dropped.
+        Every pro_id is written as a string (the id column is read with dtype str), whereas
+        letting pandas infer the column used to store all-numeric ids as int.
+        With a memory_budget, the catalog is instead rebuilt in streaming mode (see
+        stream_products_from_files), which keeps peak memory flat for very large sources.
+
+        Args:
+            workers (int): Maximum number of worker processes (defaults to the CPU count).
+            memory_budget (int): Optional memory budget in bytes for streaming mode.
+
+        Returns:
+            tuple: (number of source files parsed, number of source files removed)
+        """
+        # Concurrent processes (e.g. two CLIs starting at once) refresh the catalog one after the other
+        with file_lock(self.products_file_path):
+            csv_files = sorted(glob.glob(self.products_source_path))
+            manifest = SourceManifest(self.products_file_path)
+            signature = file_signature(self.products_file_path)
+            if signature is None or signature[0] == 0:
+                manifest.clear() # Empty catalog: every source file is ingested again
+
+            changed, removed = manifest.changes(csv_files)
+            if not changed and not removed:
+                manifest.save() # Keeps the refreshed timestamps of files that were only touched
+                return (0, 0)
+            if memory_budget is not None:
+                return self.stream_products_from_files(memory_budget)
+
+            # A catalog without a manifest was built before manifests existed, and one ingested in
+            # streaming mode does not know which file provided which product: both are replaced as a whole
+            if not manifest.files or any(manifest.pro_ids(path) is None for path in manifest.files):
+                manifest.clear()
+                changed = csv_files
+            existing = self._read_products() if manifest.files else []
+
+            # Products of changed or removed files are dropped; an unchanged file that also provides
+            # one of them is parsed again so its row takes the dropped one's place
+            dropped = set()
+            for path in changed + removed:
+                dropped.update(manifest.pro_ids(path) or [])
+            to_parse = set(changed)
+            if dropped:
+                to_parse.update(path for path in csv_files if path in manifest.files
+                                and not dropped.isdisjoint(manifest.pro_ids(path)))
+            to_parse = sorted(to_parse)
+
+            # The first file that provides a pro_id wins, as with drop_duplicates over the concatenation
+            new_products = {}  # pro_id -> (encoded line, pro_name)
+            for path, (pro_ids, pro_names, lines) in zip(to_parse, read_product_sources(to_parse, workers)):
+                manifest.record(path, pro_ids)
+                for pro_id, pro_name, line in zip(pro_ids, pro_names, lines):
+                    new_products.setdefault(pro_id, (line, pro_name))
+            for path in removed:
+                manifest.forget(path)
+
+            # Existing products keep their position (re-ingested ones are replaced in place); new ones go last
+            lines = []
+            keyword_records = []
+            for product in existing:
+                pro_id = product.get('pro_id')
+                if pro_id in new_products:
+                    line, pro_name = new_products.pop(pro_id)
+                    lines.append(line)
+                    keyword_records.append({'pro_id': pro_id, 'pro_name': pro_name})
+                elif pro_id not in dropped:
+                    lines.append(encode_record(product))
+                    keyword_records.append(product)
+            for pro_id, (line, pro_name) in new_products.items():
+                lines.append(line)
+                keyword_records.append({'pro_id': pro_id, 'pro_name': pro_name})
+
+            os.makedirs(os.path.dirname(self.products_file_path), exist_ok=True)
+            record_cache.write_lines(self.products_file_path, lines)
+            get_keyword_index(self.products_file_path).build(keyword_records)
+            manifest.save()
+            return (len(to_parse), len(removed))
+
+    def stream_products_from_files(self, memory_budget=64 * 2**20):
+        """
+        Rebuilds data/products.txt from every source CSV file in bounded memory.
+        Each CSV is read in chunks sized to the memory budget; duplicate pro_ids are dropped
+        with a CompactIdSet (8 bytes per numeric id) and every chunk is written out before the
+        next one is read. The new catalog replaces the old one only once it is complete.
+        The keyword index is rebuilt lazily by the next keyword search.
+
+        Args:
+            memory_budget (int): Approximate memory budget in bytes for one chunk.
+
+        Returns:
+            tuple: (number of source files parsed, number of source files removed)
+        """
+        csv_files = sorted(glob.glob(self.products_source_path))
+        manifest = SourceManifest(self.products_file_path)
+        present = set(csv_files)
+        removed = [path for path in manifest.files if path not in present]
+        manifest.clear()
+
+        from compact_id_set import CompactIdSet
+
+        seen_ids = CompactIdSet()
+        os.makedirs(os.path.dirname(self.products_file_path), exist_ok=True)
+        temp_path = temp_path_for(self.products_file_path)
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for path in csv_files:
+                for chunk in _read_source_csv(path, source_chunk_rows(path, memory_budget)):
+                    chunk = _product_frame(chunk)
+                    lines = _encode_frame(chunk[seen_ids.add_new(chunk['pro_id'].tolist())])
+                    if lines:
+                        f.write('\n'.join(lines) + '\n')
+                # The pro_ids of each file are not kept, so a later refresh rebuilds the whole catalog
+                manifest.record(path, None)
+        with file_lock(self.products_file_path):
+            os.replace(temp_path, self.products_file_path)
+            record_cache.invalidate(self.products_file_path)
+            manifest.save()
+        return (len(csv_files), len(removed))
 
 
     def get_product_list(self, page_number):
         """
         Retrieves one page of products from the database.
         """
-        products_data = self._read_products()
+        # Only the records of the requested page are decoded, through the byte-offset index
+        product_index = get_offset_index(self.products_file_path, 'pro_id')
         
         items_per_page = 10
-        total_pages = math.ceil(len(products_data) / items_per_page)
+        total_pages = math.ceil(product_index.count() / items_per_page)
         
         if page_number < 1 or page_number > total_pages:
             return ([], page_number, total_pages)
@@ -95,8 +256,8 @@ class ProductOperation:
         start_index = (page_number - 1) * items_per_page
         end_index = start_index + items_per_page
         
-        page_products_data = products_data[start_index:end_index]
-        product_objects = [Product(**data) for data in page_products_data]
+        page_products_data = product_index.read_range(start_index, end_index)
+        product_objects = [Product.from_record(data) for data in page_products_data]
 
         return (product_objects, page_number, total_pages)
 
@@ -104,139 +265,126 @@ class ProductOperation:
         """
         Deletes a product from data/products.txt based on product_id.
         """
-        all_products = self._read_products()
-        original_count = len(all_products)
-        
-        products_after_deletion = [p for p in all_products if p.get('pro_id') != product_id]
-        
-        if len(products_after_deletion) < original_count:
-            self._write_products(products_after_deletion)
-            return True
+        product_id = str(product_id) # pro_ids are strings in the catalog
+        # Read, filter and write under one lock, so a concurrent extraction or deletion is not lost
+        with file_lock(self.products_file_path):
+            all_products = self._read_products()
+            original_count = len(all_products)
+
+            products_after_deletion = [p for p in all_products if p.get('pro_id') != product_id]
+
+            if len(products_after_deletion) < original_count:
+                previous_signature = file_signature(self.products_file_path)
+                self._write_products(products_after_deletion)
+                get_keyword_index(self.products_file_path).remove(product_id, previous_signature)
+                return True
         return False
 
     def get_product_list_by_keyword(self, keyword):
         """
         Retrieves all products whose name contains the keyword (case insensitive).
         """
-        all_products = self._read_products()
-        
-        matching_products_data = [
-            p for p in all_products if keyword.lower() in p.get('pro_name', '').lower()
-        ]
+        # The n-gram index narrows the search down to a few candidates; only matches are decoded
+        matching_ids = get_keyword_index(self.products_file_path).search(keyword)
+        matching_products_data = get_offset_index(self.products_file_path, 'pro_id').find_many(matching_ids)
         
-        product_objects = [Product(**data) for data in matching_products_data]
+        product_objects = [Product.from_record(data) for data in matching_products_data]
         return product_objects
 
     def get_product_by_id(self, product_id):
         """
         Returns one product object based on the given product_id.
         """
-        all_products = self._read_products()
-        for p_data in all_products:
-            if p_data.get('pro_id') == product_id:
-                return Product(**p_data)
+        # pro_ids are strings in the catalog, whatever type the caller passes
+        p_data = get_offset_index(self.products_file_path, 'pro_id').find(str(product_id))
+        if p_data is not None:
+            return Product.from_record(p_data)
         return None
 
-    def _get_products_as_dataframe(self):
-        """Helper to load products into a pandas DataFrame for analysis."""
-        products_data = self._read_products()
-        if not products_data:
-            return pd.DataFrame()
-        return pd.DataFrame(products_data)
+    def figure_fingerprint(self):
+        """Returns the fingerprint of the inputs of the product figures (see FigureCache)."""
+        return get_figure_cache(self.figure_path).fingerprint([self.products_file_path])
 
-    def generate_category_figure(self):
+    def _get_analytics(self, analytics):
+        """Helper returning the given aggregates, or computing the product aggregates if none were given."""
+        if analytics is None:
+            from analytics_engine import AnalyticsEngine # pandas/NumPy are only loaded for analytics
+            analytics = AnalyticsEngine(self.products_file_path).compute(include_orders=False)
+        return analytics
+
+    def generate_category_figure(self, analytics=None):
         """
         Generates a bar chart of product counts per category.
+
+        Args:
+            analytics (dict): Aggregates from AnalyticsEngine.compute(); computed here if not given.
         """
-        df = self._get_products_as_dataframe()
-        if df.empty: return
-        
-        category_counts = df['pro_category'].value_counts().sort_values(ascending=False)
-        
-        plt.figure(figsize=(12, 8))
-        category_counts.plot(kind='bar')
-        plt.title('Total Number of Products per Category')
-        plt.xlabel('Category')
-        plt.ylabel('Number of Products')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        
-        os.makedirs(self.figure_path, exist_ok=True)
-        plt.savefig(os.path.join(self.figure_path, 'generate_category_figure.png'))
-        plt.close()
+        file_name = 'generate_category_figure.png'
+        fingerprint = self.figure_fingerprint()
+        if get_figure_cache(self.figure_path).is_fresh(file_name, fingerprint): return
 
-    def generate_discount_figure(self):
+        category_counts = self._get_analytics(analytics)['category_counts']
+        if category_counts is None: return
+        from figure_renderer import render_category_figure
+        render_category_figure(category_counts, os.path.join(self.figure_path, file_name))
+        get_figure_cache(self.figure_path).store(file_name, fingerprint)
+
+    def generate_discount_figure(self, analytics=None):
         """
         Generates a pie chart of product discount proportions.
+
+        Args:
+            analytics (dict): Aggregates from AnalyticsEngine.compute(); computed here if not given.
         """
-        df = self._get_products_as_dataframe()
-        if df.empty: return
-        
-        df['pro_discount'] = pd.to_numeric(df['pro_discount'], errors='coerce')
-        
-        bins = [-1, 29, 60, float('inf')]
-        labels = ['< 30%', '30% - 60%', '> 60%']
-        df['discount_group'] = pd.cut(df['pro_discount'], bins=bins, labels=labels, right=True)
-        
-        discount_counts = df['discount_group'].value_counts()
-        
-        plt.figure(figsize=(8, 8))
-        plt.pie(discount_counts, labels=discount_counts.index, autopct='%1.1f%%', startangle=140)
-        plt.title('Proportion of Products by Discount Range')
-        plt.ylabel('') # Hide the y-label
-        
-        os.makedirs(self.figure_path, exist_ok=True)
-        plt.savefig(os.path.join(self.figure_path, 'generate_discount_figure.png'))
-        plt.close()
+        file_name = 'generate_discount_figure.png'
+        fingerprint = self.figure_fingerprint()
+        if get_figure_cache(self.figure_path).is_fresh(file_name, fingerprint): return
 
+        discount_counts = self._get_analytics(analytics)['discount_counts']
+        if discount_counts is None: return
+        from figure_renderer import render_discount_figure
+        render_discount_figure(discount_counts, os.path.join(self.figure_path, file_name))
+        get_figure_cache(self.figure_path).store(file_name, fingerprint)
 
-    def generate_likes_count_figure(self):
+    def generate_likes_count_figure(self, analytics=None):
         """
         Generates a bar chart of total likes per category.
+
+        Args:
+            analytics (dict): Aggregates from AnalyticsEngine.compute(); computed here if not given.
         """
-        df = self._get_products_as_dataframe()
-        if df.empty: return
-        
-        df['pro_likes_count'] = pd.to_numeric(df['pro_likes_count'], errors='coerce')
-        likes_by_category = df.groupby('pro_category')['pro_likes_count'].sum().sort_values(ascending=True)
-        
-        plt.figure(figsize=(12, 8))
-        likes_by_category.plot(kind='barh') # Horizontal bar chart is good for long labels
-        plt.title("Sum of Product Likes per Category")
-        plt.xlabel("Total Likes Count")
-        plt.ylabel("Category")
-        plt.tight_layout()
+        file_name = 'generate_likes_count_figure.png'
+        fingerprint = self.figure_fingerprint()
+        if get_figure_cache(self.figure_path).is_fresh(file_name, fingerprint): return
 
-        os.makedirs(self.figure_path, exist_ok=True)
-        plt.savefig(os.path.join(self.figure_path, 'generate_likes_count_figure.png'))
-        plt.close()
+        likes_by_category = self._get_analytics(analytics)['likes_by_category']
+        if likes_by_category is None: return
+        from figure_renderer import render_likes_count_figure
+        render_likes_count_figure(likes_by_category, os.path.join(self.figure_path, file_name))
+        get_figure_cache(self.figure_path).store(file_name, fingerprint)
 
-    def generate_discount_likes_count_figure(self):
+    def generate_discount_likes_count_figure(self, analytics=None):
         """
         Generates a scatter chart showing relationship between likes and discount.
+
+        Args:
+            analytics (dict): Aggregates from AnalyticsEngine.compute(); computed here if not given.
         """
-        df = self._get_products_as_dataframe()
-        if df.empty: return
-        
-        df['pro_likes_count'] = pd.to_numeric(df['pro_likes_count'], errors='coerce')
-        df['pro_discount'] = pd.to_numeric(df['pro_discount'], errors='coerce')
-        df.dropna(subset=['pro_likes_count', 'pro_discount'], inplace=True)
-
-        plt.figure(figsize=(10, 6))
-        plt.scatter(df['pro_discount'], df['pro_likes_count'], alpha=0.5)
-        plt.title('Relationship between Discount and Likes Count')
-        plt.xlabel('Discount (%)')
-        plt.ylabel('Likes Count')
-        plt.grid(True)
-        
-        os.makedirs(self.figure_path, exist_ok=True)
-        plt.savefig(os.path.join(self.figure_path, 'generate_discount_likes_count_figure.png'))
-        plt.close()
+        file_name = 'generate_discount_likes_count_figure.png'
+        fingerprint = self.figure_fingerprint()
+        if get_figure_cache(self.figure_path).is_fresh(file_name, fingerprint): return
+
+        discount_likes = self._get_analytics(analytics)['discount_likes']
+        if discount_likes is None: return
+        from figure_renderer import render_discount_likes_count_figure
+        render_discount_likes_count_figure(discount_likes,
+                                           os.path.join(self.figure_path, file_name))
+        get_figure_cache(self.figure_path).store(file_name, fingerprint)
 
     def delete_all_products(self):
         """
         Removes all product data from data/products.txt.
         """
-        if os.path.exists(self.products_file_path):
-            os.remove(self.products_file_path)
+        record_cache.remove(self.products_file_path)
+        SourceManifest(self.products_file_path).clear()
 
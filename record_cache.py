@@ -0,0 +1,146 @@
+# File: record_cache.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the in-process cache of parsed data files shared by all operation classes.
+
+import json
+import os
+import threading
+from record_codec import read_records, write_records, write_lines, append_records, encode_record, decode_record
+from file_lock import file_lock, temp_path_for
+
+
+def file_signature(file_path):
+    """
+    Returns a cheap fingerprint of a file (size, modification time, inode) from one os.stat call,
+    or None if the file does not exist.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+def sidecar_path(file_path, kind):
+    """
+    Returns the path of a derived file (index, log, ...) kept next to a data file,
+    e.g. sidecar_path('data/users.txt', 'user') -> 'data/index/users.user.json'.
+    """
+    directory, file_name = os.path.split(file_path)
+    stem = os.path.splitext(file_name)[0]
+    return os.path.join(directory, 'index', f"{stem}.{kind}.json")
+
+
+def load_sidecar(path):
+    """Loads a JSON sidecar file. Returns None if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_sidecar(path, data):
+    """Writes a JSON sidecar file atomically (temp file + rename)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = temp_path_for(path)
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+
+class RecordCache:
+    """
+    Keeps the parsed records of each data file in memory and re-parses a file only when
+    its signature changes. Writes made through this class keep the cache up to date.
+    The returned lists are shared between callers and must be treated as read-only.
+    Files are read under a shared file_lock and written under an exclusive one, so other
+    processes never see a half-written append or rewrite.
+    """
+    def __init__(self):
+        """
+        Constructs an empty cache.
+        """
+        self._entries = {}  # file_path -> (signature, records)
+        self._parse_lock = threading.Lock() # Threads reading a changed file at once parse it only once
+
+    def load(self, file_path):
+        """
+        Returns the records of the given file, re-reading it only if it changed on disk.
+        """
+        signature = file_signature(file_path)
+        if signature is None:
+            self._entries.pop(file_path, None)
+            return []
+
+        entry = self._entries.get(file_path)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        with file_lock(file_path, exclusive=False), self._parse_lock:
+            signature = file_signature(file_path)
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == signature: # Parsed by another thread meanwhile
+                return entry[1]
+            records = read_records(file_path)
+            self._entries[file_path] = (signature, records)
+        return records
+
+    def invalidate(self, file_path=None):
+        """
+        Drops the cached records of one file, or of every file if no path is given.
+        """
+        if file_path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(file_path, None)
+
+    def write(self, file_path, records):
+        """
+        Overwrites the file with the given records and drops its cached copy.
+        """
+        with file_lock(file_path):
+            write_records(file_path, records)
+            self.invalidate(file_path)
+
+    def write_lines(self, file_path, lines):
+        """
+        Overwrites the file with already encoded record lines and drops its cached copy.
+        """
+        with file_lock(file_path):
+            write_lines(file_path, lines)
+            self.invalidate(file_path)
+
+    def append(self, file_path, records):
+        """
+        Appends records to the file. If the cached copy was current before the append,
+        it is extended in place instead of being re-read on the next load.
+        Returns the byte offset at which each appended record starts.
+        """
+        records = list(records)
+        with file_lock(file_path):
+            entry = self._entries.get(file_path)
+            was_current = entry is not None and entry[0] == file_signature(file_path)
+
+            offsets = append_records(file_path, records)
+
+            if was_current:
+                entry[1].extend(decode_record(encode_record(record)) for record in records)
+                self._entries[file_path] = (file_signature(file_path), entry[1])
+            else:
+                self.invalidate(file_path)
+        return offsets
+
+    def remove(self, file_path):
+        """
+        Deletes the file (if present) and its cached copy.
+        """
+        with file_lock(file_path):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            self.invalidate(file_path)
+
+
+# Shared instance used by UserOperation, CustomerOperation, AdminOperation, ProductOperation and OrderOperation
+record_cache = RecordCache()
@@ -0,0 +1,231 @@
+# File: record_codec.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the record codec used to read and write the data/*.txt files.
+
+import ast
+import json
+import mmap
+import os
+import sys
+from file_lock import temp_path_for
+
+
+def _to_builtin(value):
+    """Converts numpy/pandas scalars (e.g. np.int64) into plain Python values."""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not serialisable")
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False, default=_to_builtin)
+_decode = json.JSONDecoder().decode
+
+
+def as_record(record):
+    """
+    Returns a record as a dict: dicts are returned as they are, model objects through their
+    to_record() (or their attributes, for objects without one).
+    """
+    if isinstance(record, dict):
+        return record
+    to_record = getattr(record, 'to_record', None)
+    return to_record() if to_record is not None else vars(record)
+
+
+class RecordModel:
+    """
+    Base of the slotted model classes (User, Order, Product): subclasses list the fields of their
+    stored record in FIELDS and implement to_record(); from_record() builds an object back.
+    """
+    __slots__ = ()
+    FIELDS = ()
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Constructs an object of this class from a stored record (dict).
+        Fields the class does not have (e.g. a customer's email read as an Admin) are ignored.
+        """
+        try:
+            return cls(**record)
+        except TypeError: # The record holds fields this class does not have
+            return cls(**{field: record[field] for field in cls.FIELDS if field in record})
+
+
+def encode_record(record):
+    """
+    Encodes one record (a dict or a model object) as a single JSON line without the newline.
+    """
+    return _encoder.encode(as_record(record))
+
+
+def decode_record(line):
+    """
+    Decodes one line into a dict. Lines written in the old dict-literal format are
+    parsed with ast.literal_eval, so file content is never executed.
+    Returns None for empty or malformed lines.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = _decode(line)
+    except ValueError:
+        try:
+            record = ast.literal_eval(line)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            return None
+    return record if isinstance(record, dict) else None
+
+
+def decode_lines(lines):
+    """
+    Decodes an iterable of lines into a list of dicts.
+    The whole batch is decoded with a single JSON parse; if any line is not valid JSON
+    (legacy or corrupted data) it falls back to decoding line by line.
+    """
+    stripped = [line.strip() for line in lines]
+    stripped = [line for line in stripped if line]
+    if not stripped:
+        return []
+    try:
+        records = _decode('[' + ','.join(stripped) + ']')
+        if all(isinstance(record, dict) for record in records):
+            return records
+    except ValueError:
+        pass
+    records = []
+    for line in stripped:
+        record = decode_record(line)
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def read_records(file_path):
+    """Reads and decodes every record in the given file. Returns [] if the file is missing."""
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return decode_lines(f.read().splitlines())
+
+
+def _replace_atomically(file_path, write):
+    """
+    Writes a new version of the file through write(f) into a temporary file next to it and renames
+    it over the original, so readers (also in other processes) see either the old or the new content.
+    """
+    temp_path = temp_path_for(file_path)
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def write_records(file_path, records):
+    """Atomically replaces the given file with the encoded records."""
+    _replace_atomically(file_path, lambda f: f.write(''.join(encode_record(record) + '\n' for record in records)))
+
+
+def write_lines(file_path, lines):
+    """Atomically replaces the given file with already encoded record lines (without newlines)."""
+    def write(f):
+        for start in range(0, len(lines), 100000):
+            f.write('\n'.join(lines[start:start + 100000]) + '\n')
+    _replace_atomically(file_path, write)
+
+
+def append_records(file_path, records):
+    """
+    Appends the encoded records to the end of the given file.
+    Returns the byte offset at which each appended record starts.
+    """
+    lines = [(encode_record(record) + '\n').encode('utf-8') for record in records]
+    with open(file_path, 'ab') as f:
+        offset = f.tell()
+        offsets = []
+        for line in lines:
+            offsets.append(offset)
+            offset += len(line)
+        f.write(b''.join(lines))
+    return offsets
+
+
+def read_record_at(file_path, offset):
+    """Decodes the single record that starts at the given byte offset of the file."""
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        return decode_record(f.readline().decode('utf-8'))
+
+
+def read_records_at(file_path, offsets):
+    """
+    Decodes the records starting at the given byte offsets through a memory map of the file,
+    so only the requested lines are touched.
+    """
+    if not offsets:
+        return []
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        records = []
+        for offset in offsets:
+            end = mm.find(b'\n', offset)
+            line = mm[offset:end if end != -1 else len(mm)]
+            records.append(decode_record(line.decode('utf-8')))
+        return records
+
+
+def iter_records_with_offsets(file_path):
+    """Yields (byte offset, record) for every decodable line of the file."""
+    if not os.path.exists(file_path):
+        return
+    with open(file_path, 'rb') as f:
+        offset = 0
+        for line in f:
+            record = decode_record(line.decode('utf-8'))
+            if record is not None:
+                yield offset, record
+            offset += len(line)
+
+
+def is_legacy_file(file_path):
+    """Checks whether the first record of the file is still in the old dict-literal format."""
+    if not os.path.exists(file_path):
+        return False
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                return not line.startswith('{"') and line != '{}'
+    return False
+
+
+def migrate_file(file_path):
+    """
+    Rewrites a data file from the old dict-literal format into JSON lines.
+    Malformed lines are dropped, exactly as the old eval() readers skipped them.
+    Returns the number of records written.
+    """
+    if not is_legacy_file(file_path):
+        return 0
+    with open(file_path, 'r', encoding='utf-8') as f:
+        records = [record for record in map(decode_record, f) if record is not None]
+    write_records(file_path, records)
+    return len(records)
+
+
+def migrate_data_files(file_paths=('data/users.txt', 'data/products.txt', 'data/orders.txt')):
+    """Migrates every legacy data file in the list. Returns {path: records migrated}."""
+    return {path: migrate_file(path) for path in file_paths if is_legacy_file(path)}
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or ['data/users.txt', 'data/products.txt', 'data/orders.txt']
+    for path, count in migrate_data_files(paths).items():
+        print(f"Migrated {count} records in {path}")
@@ -0,0 +1,240 @@
+# File: sales_counter.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the SalesCounter class, the per-product number of orders used for best-seller queries.
+
+import atexit
+import heapq
+import threading
+from collections import Counter
+from datetime import datetime
+from change_log import get_change_log
+from file_lock import file_lock
+from offset_index import get_offset_index
+from record_cache import file_signature, sidecar_path, load_sidecar, save_sidecar
+from record_codec import as_record
+
+
+def _has_time(order_time):
+    """Checks whether an order_time string parses as 'DD-MM-YYYY_HH:MM:SS'."""
+    try:
+        datetime.strptime(order_time, '%d-%m-%Y_%H:%M:%S')
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _has_price(product):
+    """Checks whether a product record has a numeric current price."""
+    try:
+        price = float(product.get('pro_current_price'))
+    except (TypeError, ValueError):
+        return False
+    return price == price # NaN is no price
+
+
+class SalesCounter:
+    """
+    Number of orders of every product, so a top-N query is a heapq.nlargest over the sold
+    products instead of a scan and join of every order. As with the old merge + dropna +
+    value_counts, only orders with a valid order_time whose product is in the catalog with a
+    price are counted. The counts are kept per pro_id (best-seller listings) and summed per
+    pro_name (the top-10 chart, which groups products by name). Products and names appear in
+    the order of their first sale, which is how ties are broken.
+    The counters live in data/index/orders.sales.json with the signatures of data/orders.txt,
+    data/orders.log and data/products.txt. create_orders_bulk and delete_order update them in
+    place; any other change to those files (a compaction, a product refresh or deletion) makes
+    them rebuild on the next query.
+    """
+    def __init__(self, orders_file_path, products_file_path):
+        """
+        Constructs the counters of the given orders file. Nothing is read until the first use.
+
+        Args:
+            orders_file_path (str): Path of the orders data file.
+            products_file_path (str): Path of the products data file the names and prices come from.
+        """
+        self.orders_file_path = orders_file_path
+        self.products_file_path = products_file_path
+        self.counter_file_path = sidecar_path(orders_file_path, 'sales')
+        self._change_log = get_change_log(orders_file_path, 'order_id')
+        self._signature = None
+        self._counts = {}       # pro_id -> number of counted orders
+        self._names = {}        # pro_id -> pro_name, for every counted pro_id
+        self._name_counts = {}  # pro_name -> number of counted orders
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+        self._save_registered = False
+
+    def _signatures(self):
+        """Returns the current signatures of the orders file, its change log and the products file."""
+        return [list(signature) if signature else None
+                for signature in (file_signature(self.orders_file_path),
+                                  file_signature(self._change_log.log_file_path),
+                                  file_signature(self.products_file_path))]
+
+    def _sum_names(self):
+        """Recomputes the per-name counts from the per-product ones."""
+        self._name_counts = {}
+        for pro_id, count in self._counts.items():
+            name = self._names[pro_id]
+            self._name_counts[name] = self._name_counts.get(name, 0) + count
+
+    def is_current(self):
+        """
+        Checks whether the counters (loaded from their sidecar on first use) match the files on disk.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            if not self._loaded:
+                self._loaded = True
+                data = load_sidecar(self.counter_file_path)
+                if data is not None and 'names' in data:
+                    self._signature = data.get('signature')
+                    self._counts = data['counts']
+                    self._names = data['names']
+                    self._sum_names()
+            return self._signature == self._signatures()
+
+    def _ensure_current(self):
+        """Rebuilds the counters if they no longer match the data files."""
+        if not self.is_current():
+            self.rebuild()
+
+    def rebuild(self):
+        """
+        Recounts every order from the typed order and product columns and persists the counters.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            from analytics_engine import join_orders_to_products
+            from columnar_store import get_order_store, get_product_store
+
+            signature = self._signatures()
+            orders = get_order_store(self.orders_file_path).load()
+            products = get_product_store(self.products_file_path).load()
+            self._counts = {}
+            self._names = {}
+            if len(orders['order_id']) and len(products['pro_id']):
+                keep, product_positions, prices = join_orders_to_products(products, orders)
+                sold = orders['pro_id'][keep].tolist()
+                self._counts = dict(Counter(sold))
+                self._names = dict(zip(sold, products['pro_name'][product_positions].tolist()))
+            self._sum_names()
+            self._signature = signature
+            self._loaded = True
+            self._dirty = True
+            self.save()
+
+    def save(self):
+        """
+        Persists the in-memory counters if they have changed since they were last written.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            if not self._dirty:
+                return
+            save_sidecar(self.counter_file_path, {'signature': self._signature, 'counts': self._counts,
+                                                 'names': self._names})
+            self._dirty = False
+
+    def _mark_changed(self):
+        """Records the new file signatures after an in-place update and schedules a save."""
+        self._signature = self._signatures()
+        self._dirty = True
+        if not self._save_registered:
+            self._save_registered = True
+            atexit.register(self.save)
+
+    def _apply(self, orders, sign):
+        """Counts (sign 1) or uncounts (sign -1) the given order records."""
+        product_index = get_offset_index(self.products_file_path, 'pro_id')
+        pro_ids = list({str(order.get('pro_id')) for order in orders}) # Catalog pro_ids are strings
+        names = {product.get('pro_id'): product.get('pro_name')
+                 for product in product_index.find_many(pro_ids) if _has_price(product)}
+        for order in orders:
+            key = str(order.get('pro_id'))
+            if key not in names or not _has_time(order.get('order_time')):
+                continue
+            name = str(names[key])
+            self._counts[key] = self._counts.get(key, 0) + sign
+            self._names[key] = name
+            self._name_counts[name] = self._name_counts.get(name, 0) + sign
+            if self._counts[key] <= 0:
+                del self._counts[key], self._names[key]
+            if self._name_counts[name] <= 0:
+                del self._name_counts[name]
+
+    def orders_appended(self, orders, was_current):
+        """
+        Counts freshly created orders.
+
+        Args:
+            orders (list): The appended Order objects or dicts.
+            was_current (bool): Whether is_current() held right before the append.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            if not was_current:
+                return # The signatures no longer match, so the next query recounts
+            self._apply([as_record(order) for order in orders], 1)
+            self._mark_changed()
+
+    def order_deleted(self, order, was_current):
+        """
+        Uncounts a deleted order.
+
+        Args:
+            order (dict): The record of the deleted order.
+            was_current (bool): Whether is_current() held right before the tombstone was logged.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            if not was_current:
+                return
+            self._apply([order], -1)
+            self._mark_changed()
+
+    def count(self, pro_id):
+        """
+        Returns the number of counted orders of the given product.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            return self._counts.get(str(pro_id), 0)
+
+    def top(self, top_n, candidates=None):
+        """
+        Returns the top_n best-selling products as (pro_id, number of orders) pairs, best first,
+        in O(m log top_n) for m sold (or candidate) products.
+
+        Args:
+            top_n (int): Number of products to return.
+            candidates (iterable): Optional pro_ids to choose from (e.g. the products of one category).
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            if candidates is None:
+                items = self._counts.items()
+            else:
+                items = ((pro_id, self._counts[pro_id]) for pro_id in candidates if pro_id in self._counts)
+            return heapq.nlargest(top_n, items, key=lambda item: item[1])
+
+    def top_names(self, top_n):
+        """
+        Returns the top_n best-selling product names as (pro_name, number of orders) pairs, best first,
+        the orders of every product with the same name added up.
+        """
+        with file_lock(self.orders_file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            return heapq.nlargest(top_n, self._name_counts.items(), key=lambda item: item[1])
+
+
+_counters = {}
+_counters_guard = threading.Lock()
+
+
+def get_sales_counter(orders_file_path, products_file_path):
+    """
+    Returns the shared SalesCounter of the given orders file.
+    """
+    with _counters_guard:
+        if orders_file_path not in _counters:
+            _counters[orders_file_path] = SalesCounter(orders_file_path, products_file_path)
+        return _counters[orders_file_path]
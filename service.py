@@ -0,0 +1,312 @@
+# File: service.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the PlatformService class, a local asyncio HTTP/JSON front-end over the operation classes.
+#              Run e.g. `python service.py --port 8080` and call `curl 'http://127.0.0.1:8080/products?page=2'`.
+
+import argparse
+import asyncio
+import json
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from user_operation import UserOperation
+from customer_operation import CustomerOperation
+from admin_operation import AdminOperation
+from product_operation import ProductOperation
+from order_operation import OrderOperation
+from record_codec import migrate_data_files
+from file_lock import file_lock
+from user_index import get_user_index
+
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 401: 'Unauthorized', 403: 'Forbidden', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large', 431: 'Request Header Fields Too Large',
+           500: 'Internal Server Error'}
+MAX_BODY_SIZE = 64 * 1024
+
+
+class RequestError(Exception):
+    """
+    A request the service rejects, answered with the given HTTP status and message.
+    """
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PlatformService:
+    """
+    Serves the customer-facing operations as JSON over HTTP/1.1 (with keep-alive):
+
+        POST /login          {"user_name", "user_password"} -> {"user", "token"}
+        POST /logout         (token)
+        POST /register       {"user_name", "user_password", "user_email", "user_mobile"}
+        GET  /products       ?page=N or ?keyword=text
+        POST /orders         {"product_id"} (customer token)
+        GET  /orders         ?page=N (customer token), or ?customer_id=u_...&page=N (admin token)
+
+    A login returns a session token, which the order routes require in an
+    'Authorization: Bearer <token>' header; orders are always placed for and listed of the
+    customer the token belongs to, and only an admin may name another customer.
+
+    Connections are handled on one asyncio event loop; every operation call, which reads or
+    writes the data files, runs on a bounded thread pool so slow file work never blocks other
+    clients. Reads hold the shared file_lock of the data file they use, which any number of the
+    pool's threads hold at once, and writes lock themselves exclusively, so the threads (and
+    other processes, such as a running main.py) stay consistent; the shared indexes, counters
+    and caches the operations use also lock every access.
+    """
+    def __init__(self, workers=8):
+        """
+        Constructs the service and its operation objects.
+
+        Args:
+            workers (int): Maximum number of threads running operation calls at once.
+        """
+        self.user_op = UserOperation()
+        self.cust_op = CustomerOperation()
+        self.prod_op = ProductOperation()
+        self.order_op = OrderOperation()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='service')
+        self.sessions = {}  # token -> {'user_id', 'user_role'}; only touched on the event loop thread
+        self.routes = {
+            ('POST', '/login'): self.login,
+            ('POST', '/logout'): self.logout,
+            ('POST', '/register'): self.register,
+            ('GET', '/products'): self.list_products,
+            ('POST', '/orders'): self.create_order,
+            ('GET', '/orders'): self.list_orders,
+        }
+
+    def prepare(self):
+        """
+        Runs the same start-up steps as main.py: data file migration, default admin, catalog refresh.
+        """
+        migrated = migrate_data_files()
+        for operation, file_path in ((self.user_op, self.user_op.users_file_path),
+                                     (self.order_op, self.order_op.orders_file_path)):
+            if file_path in migrated:
+                operation.id_allocator().recover()
+        AdminOperation().register_admin()
+        self.prod_op.extract_products_from_files()
+
+    async def _run(self, function, *args):
+        """Runs a blocking operation call on the thread pool and awaits its result."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    # --- Handlers: (query, body, session) -> (status, JSON-serialisable result) ---
+
+    async def login(self, query, body, session):
+        """Checks a username and password and returns the user without the password."""
+        user = await self._run(self._locked_read, self.user_op.users_file_path, self.user_op.login,
+                               _field(body, 'user_name'), _field(body, 'user_password'))
+        if user is None:
+            raise RequestError(401, "Invalid username or password.")
+        user_data = user.to_record()
+        del user_data['user_password']
+        token = secrets.token_urlsafe(32)
+        self.sessions[token] = {'user_id': user.user_id, 'user_role': user.user_role}
+        return 200, {'user': user_data, 'token': token}
+
+    async def logout(self, query, body, session):
+        """Ends the session of the token sent with the request."""
+        _require(session)
+        self.sessions.pop(session['token'], None)
+        return 200, {'logged_out': True}
+
+    async def register(self, query, body, session):
+        """Registers a new customer."""
+        registered = await self._run(self.cust_op.register_customer, _field(body, 'user_name'),
+                                     _field(body, 'user_password'), _field(body, 'user_email'),
+                                     _field(body, 'user_mobile'))
+        if not registered:
+            raise RequestError(400, "Registration failed. Username may exist, or details are invalid.")
+        return 201, {'registered': True}
+
+    async def list_products(self, query, body, session):
+        """Returns one page of products, or every product whose name contains the keyword."""
+        if 'keyword' in query:
+            products = await self._run(self._locked_read, self.prod_op.products_file_path,
+                                       self.prod_op.get_product_list_by_keyword, query['keyword'])
+            return 200, {'products': [product.to_record() for product in products]}
+        products, page, total_pages = await self._run(self._locked_read, self.prod_op.products_file_path,
+                                                      self.prod_op.get_product_list, _page(query))
+        return 200, {'products': [product.to_record() for product in products],
+                     'page': page, 'total_pages': total_pages}
+
+    async def create_order(self, query, body, session):
+        """Places an order of an existing product for the logged-in customer."""
+        customer_id, product_id = _require(session, 'customer')['user_id'], _field(body, 'product_id')
+        product = await self._run(self._locked_read, self.prod_op.products_file_path,
+                                  self.prod_op.get_product_by_id, product_id)
+        if product is None:
+            raise RequestError(404, f"Product {product_id} not found.")
+        await self._run(self.order_op.create_an_order, customer_id, product_id)
+        return 201, {'created': True}
+
+    async def list_orders(self, query, body, session):
+        """Returns one page of the logged-in customer's order history, or of any customer for an admin."""
+        if _require(session)['user_role'] != 'admin':
+            customer_id = _require(session, 'customer')['user_id']
+            if query.get('customer_id', customer_id) != customer_id:
+                raise RequestError(403, "Customers can only see their own orders.")
+        elif 'customer_id' in query:
+            customer_id = query['customer_id']
+            user = await self._run(self._locked_read, self.user_op.users_file_path,
+                                   get_user_index(self.user_op.users_file_path).get_user, customer_id)
+            if user is None or user.get('user_role') != 'customer':
+                raise RequestError(404, f"Customer {customer_id} not found.")
+        else:
+            raise RequestError(400, "Missing query parameter 'customer_id'.")
+        orders, page, total_pages = await self._run(self._locked_read, self.order_op.orders_file_path,
+                                                    self.order_op.get_order_list, customer_id, _page(query))
+        return 200, {'orders': [order.to_record() for order in orders], 'page': page, 'total_pages': total_pages}
+
+    @staticmethod
+    def _locked_read(file_path, function, *args):
+        """Calls a read-only operation while holding the shared lock of the data file it reads."""
+        with file_lock(file_path, exclusive=False):
+            return function(*args)
+
+    # --- HTTP ---
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves the requests of one client connection until it closes or asks to close.
+        """
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line.strip():
+                        break
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if not line.strip():
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError: # A line longer than the reader's limit; the rest of the stream is unusable
+                    self._respond(writer, 431, {'error': "Request line or header too long."}, keep_alive=False)
+                    await writer.drain()
+                    break
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                    keep_alive = keep_alive and version == 'HTTP/1.1'
+                    length = int(headers.get('content-length') or 0)
+                    if length > MAX_BODY_SIZE:
+                        keep_alive = False
+                        raise RequestError(413, "Request body too large.")
+                    status, result = await self._dispatch(method, target, headers, await reader.readexactly(length))
+                except RequestError as e:
+                    status, result = e.status, {'error': str(e)}
+                except ValueError:
+                    status, result, keep_alive = 400, {'error': "Malformed request."}, False
+                except Exception as e:
+                    status, result = 500, {'error': f"An unexpected error occurred: {e}"}
+
+                self._respond(writer, status, result, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass # The client went away mid-request
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer, status, result, keep_alive):
+        """Writes one JSON response."""
+        payload = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                     + payload)
+
+    async def _dispatch(self, method, target, headers, raw_body):
+        """Routes one request to its handler and returns (status, result)."""
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self.routes):
+                raise RequestError(405, f"{method} is not allowed on {url.path}.")
+            raise RequestError(404, f"No such endpoint: {url.path}.")
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            raise RequestError(400, "The request body is not valid JSON.")
+        if not isinstance(body, dict):
+            raise RequestError(400, "The request body must be a JSON object.")
+        scheme, _, token = headers.get('authorization', '').partition(' ')
+        session = self.sessions.get(token) if scheme.lower() == 'bearer' else None
+        return await handler(query, body, session and {**session, 'token': token})
+
+    async def serve(self, host='127.0.0.1', port=8080, ready=None):
+        """
+        Accepts connections until cancelled.
+
+        Args:
+            host (str): Address to listen on.
+            port (int): Port to listen on (0 picks a free one).
+            ready (callable): Optional callback receiving the bound port once the server listens.
+        """
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_BODY_SIZE)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=True)
+
+
+def _field(body, name):
+    """Returns a required string field of the JSON body."""
+    value = body.get(name)
+    if not isinstance(value, str) or not value:
+        raise RequestError(400, f"Missing field '{name}'.")
+    return value
+
+
+def _require(session, role=None):
+    """Returns the session of the request, which must exist (and belong to the given role, if any)."""
+    if session is None:
+        raise RequestError(401, "Log in first and send the token as 'Authorization: Bearer <token>'.")
+    if role is not None and session['user_role'] != role:
+        raise RequestError(403, f"Only a {role} may do this.")
+    return session
+
+
+def _page(query):
+    """Returns the page number of the query string (defaults to 1)."""
+    page = query.get('page', '1')
+    if not page.isdigit():
+        raise RequestError(400, "'page' must be a positive number.")
+    return int(page)
+
+
+def main():
+    """
+    Parses the command line, runs the start-up steps and serves until interrupted (Ctrl+C).
+    """
+    parser = argparse.ArgumentParser(description="E-Commerce platform JSON service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=8, help="Threads running operation calls.")
+    args = parser.parse_args()
+
+    service = PlatformService(args.workers)
+    service.prepare()
+    try:
+        asyncio.run(service.serve(args.host, args.port,
+                                  ready=lambda port: print(f"Serving on http://{args.host}:{port}", flush=True)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# File: source_manifest.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the SourceManifest class, which tracks the source CSV files already ingested.
+
+import hashlib
+import os
+from record_cache import sidecar_path, load_sidecar, save_sidecar
+
+
+def file_digest(file_path):
+    """
+    Returns the SHA-256 hex digest of a file's content, read in 1 MiB blocks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SourceManifest:
+    """
+    Remembers, for every source CSV ingested into a data file, its size, modification time,
+    content hash and the pro_ids it provided. The file states are kept in
+    data/index/<file>.manifest.json and the pro_ids in data/index/<file>.manifest-ids.json,
+    which is only read when a refresh actually has to merge, so checking for changes costs
+    one stat per source file.
+    A file whose size and modification time are unchanged is trusted without reading it;
+    otherwise its hash decides whether the content really changed (e.g. after a touch or a copy).
+    """
+    def __init__(self, data_file_path):
+        """
+        Loads the manifest of the given data file (empty if it has none yet).
+
+        Args:
+            data_file_path (str): Path of the data file the sources are ingested into.
+        """
+        self.manifest_file_path = sidecar_path(data_file_path, 'manifest')
+        self.ids_file_path = sidecar_path(data_file_path, 'manifest-ids')
+        data = load_sidecar(self.manifest_file_path)
+        self.files = data['files'] if data else {}  # path -> {'size', 'mtime_ns', 'sha256'}
+        self._pro_ids = None  # path -> list of pro_ids or None, loaded on first use
+        self._digests = {}  # path -> digest computed by changes(), reused by record()
+        self._dirty = False
+
+    def pro_ids(self, file_path):
+        """
+        Returns the pro_ids the given source file provided at its last ingestion,
+        or None if they are not known (e.g. after a streaming ingestion or for an unknown file).
+        """
+        if self._pro_ids is None:
+            self._pro_ids = load_sidecar(self.ids_file_path) or {}
+        return self._pro_ids.get(file_path)
+
+    def changes(self, file_paths):
+        """
+        Compares the given source files with the manifest.
+
+        Args:
+            file_paths (list): Paths of the source files currently present.
+
+        Returns:
+            tuple: (list of added or changed paths, list of removed paths)
+        """
+        changed = []
+        for path in file_paths:
+            entry = self.files.get(path)
+            stat = os.stat(path)
+            if entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                continue
+            digest = self._digests[path] = file_digest(path)
+            if entry is not None and entry['sha256'] == digest:
+                # Same content under a new timestamp; only the stat fields are refreshed
+                entry['size'] = stat.st_size
+                entry['mtime_ns'] = stat.st_mtime_ns
+                self._dirty = True
+                continue
+            changed.append(path)
+        present = set(file_paths)
+        removed = [path for path in self.files if path not in present]
+        return (changed, removed)
+
+    def record(self, file_path, pro_ids):
+        """
+        Stores the current state of an ingested source file and the pro_ids it provided
+        (None if they are not known, e.g. after a streaming ingestion).
+        """
+        stat = os.stat(file_path)
+        self.files[file_path] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': self._digests.pop(file_path, None) or file_digest(file_path)
+        }
+        self.pro_ids(file_path)
+        self._pro_ids[file_path] = list(pro_ids) if pro_ids is not None else None
+        self._dirty = True
+
+    def forget(self, file_path):
+        """
+        Drops a removed source file from the manifest.
+        """
+        self.files.pop(file_path, None)
+        self.pro_ids(file_path)
+        self._pro_ids.pop(file_path, None)
+        self._dirty = True
+
+    def save(self):
+        """
+        Persists the manifest if it has changed since it was loaded.
+        """
+        if not self._dirty:
+            return
+        if self._pro_ids is not None:
+            save_sidecar(self.ids_file_path, self._pro_ids)
+        save_sidecar(self.manifest_file_path, {'files': self.files})
+        self._dirty = False
+
+    def clear(self):
+        """
+        Forgets every source file and deletes the persisted manifest.
+        """
+        self.files = {}
+        self._pro_ids = {}
+        self._dirty = False
+        for path in (self.manifest_file_path, self.ids_file_path):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,24 @@
+# File: tests/conftest.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Shared pytest fixtures for the storage layer tests.
+
+import os
+import sys
+import pytest
+
+# The application modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """
+    Returns an empty data folder in a fresh temporary directory, which is also made the working
+    directory. Tests pass absolute paths inside it, so the shared per-path singletons
+    (change logs, indexes) never carry state over from another test.
+    """
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / 'data'
+    path.mkdir()
+    return str(path)
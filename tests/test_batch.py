@@ -0,0 +1,119 @@
+# File: tests/test_batch.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests of the non-interactive batch mode of main.py.
+
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import pytest
+from admin_operation import AdminOperation
+from batch import BatchRunner
+from customer_operation import CustomerOperation
+from order_operation import OrderOperation
+from product_operation import ProductOperation
+from user_operation import UserOperation
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """# A customer session
+register alice_shop secret1 alice@example.com 0412345678
+login alice_shop secret1
+
+products
+search leather bag
+profile
+history
+customers
+frobnicate now
+login admin admin_password1
+orders
+orders next
+update user_email bob@example.com
+logout
+"""
+# Non-blank, non-comment lines of SCRIPT, with their line numbers
+COMMANDS = [(number, line) for number, line in enumerate(SCRIPT.splitlines(), 1)
+            if line.strip() and not line.startswith('#')]
+
+
+@pytest.fixture
+def sources(data_dir):
+    """A small source CSV file in data/product, so the catalog is not empty."""
+    os.makedirs(os.path.join(data_dir, 'product'))
+    with open(os.path.join(data_dir, 'product', 'bags.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['category', 'name', 'current_price', 'raw_price', 'discount', 'likes_count', 'id', 'model'])
+        for number, name in enumerate(['Leather bag', 'Canvas bag', 'Small leather bag purse', 'Tote']):
+            writer.writerow(['bags', name, 10 + number, 20 + number, 50, number, str(1000 + number), f'SKU{number}'])
+    return data_dir
+
+
+def run_main(script):
+    """Runs main.py --batch - in the working directory with the script on stdin."""
+    environment = {**os.environ, 'PYTHONPATH': REPOSITORY}
+    return subprocess.run([sys.executable, os.path.join(REPOSITORY, 'main.py'), '--batch', '-'], input=script,
+                          capture_output=True, text=True, encoding='utf-8', env=environment, timeout=120)
+
+
+def test_main_emits_one_json_line_per_command(sources):
+    process = run_main(SCRIPT)
+    lines = process.stdout.splitlines()
+    results = [json.loads(line) for line in lines] # Nothing but JSON reaches stdout
+    assert len(results) == len(COMMANDS) + 1
+    assert [(result['line'], result['command']) for result in results[:-1]] == COMMANDS
+    assert all(isinstance(result['ms'], float) for result in results[:-1])
+
+    by_command = {result['command']: result for result in results[:-1]}
+    failed = {'customers', 'frobnicate now', 'orders next', 'update user_email bob@example.com'}
+    assert {command for command, result in by_command.items() if not result['ok']} == failed
+    assert by_command['customers']['error'] == "'customers' requires a logged-in admin."
+    assert by_command['frobnicate now']['error'] == "Unknown command 'frobnicate'."
+    assert by_command['products']['result']['page'] == 1
+    assert len(by_command['products']['result']['items']) == 4
+    assert [item['pro_name'] for item in by_command['search leather bag']['result']['items']] == \
+        ['Leather bag', 'Small leather bag purse']
+    assert by_command['profile']['result']['user_name'] == 'alice_shop'
+    assert 'user_password' not in by_command['profile']['result']
+    assert by_command['history']['result']['items'] == []
+    assert results[-1]['summary']['commands'] == len(COMMANDS)
+    assert results[-1]['summary']['failed'] == len(failed)
+    assert process.returncode == 1
+
+
+def test_main_exits_zero_when_every_command_succeeds(sources):
+    process = run_main("products\nlogin admin admin_password1\ncustomers\n")
+    results = [json.loads(line) for line in process.stdout.splitlines()]
+    assert [result['ok'] for result in results[:-1]] == [True] * 3
+    assert (results[-1]['summary']['commands'], results[-1]['summary']['failed']) == (3, 0)
+    assert process.returncode == 0
+
+
+class CountingOutput(io.StringIO):
+    """A text stream that counts its write calls."""
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def test_results_are_written_in_blocks(data_dir, monkeypatch):
+    monkeypatch.setattr(UserOperation, 'users_file_path', os.path.join(data_dir, 'users.txt'))
+    monkeypatch.setattr(CustomerOperation, 'users_file_path', os.path.join(data_dir, 'users.txt'))
+    monkeypatch.setattr(AdminOperation, 'users_file_path', os.path.join(data_dir, 'users.txt'))
+    monkeypatch.setattr(ProductOperation, 'products_file_path', os.path.join(data_dir, 'products.txt'))
+    monkeypatch.setattr(OrderOperation, 'orders_file_path', os.path.join(data_dir, 'orders.txt'))
+    monkeypatch.setattr(BatchRunner, 'flush_every', 4)
+    output = CountingOutput()
+    runner = BatchRunner(output, UserOperation(), CustomerOperation(), AdminOperation(), ProductOperation(),
+                         OrderOperation())
+    assert runner.run(['logout\n'] * 10) == 0
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 11 and all(json.loads(line)['ok'] for line in lines[:-1])
+    assert output.writes == 3 # Two full blocks of 4, then the last 2 with the summary
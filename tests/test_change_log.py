@@ -0,0 +1,96 @@
+# File: tests/test_change_log.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests of the ChangeLog upsert/tombstone log and its compaction.
+
+import os
+from change_log import ChangeLog
+from record_codec import read_records, write_records
+
+
+def user(number, name=None):
+    return {'user_id': f'u_{number}', 'user_name': name or f'user{number}'}
+
+
+def make_log(data_dir, count=3, **kwargs):
+    file_path = os.path.join(data_dir, 'users.txt')
+    write_records(file_path, [user(number) for number in range(count)])
+    return ChangeLog(file_path, 'user_id', **kwargs)
+
+
+def test_upsert_replaces_in_place_and_appends_new_keys(data_dir):
+    change_log = make_log(data_dir)
+    change_log.upsert(user(1, 'renamed'))
+    change_log.upsert(user(7))
+    assert [record['user_name'] for record in change_log.read()] == ['user0', 'renamed', 'user2', 'user7']
+    assert change_log.get('u_1')['user_name'] == 'renamed'
+    assert change_log.pending() == {'u_1': user(1, 'renamed'), 'u_7': user(7)}
+    # Only the log was written
+    assert read_records(change_log.file_path) == [user(number) for number in range(3)]
+
+
+def test_tombstone_hides_record(data_dir):
+    change_log = make_log(data_dir)
+    change_log.delete('u_0')
+    assert not change_log.contains('u_0')
+    assert change_log.get('u_0') is None
+    assert [record['user_id'] for record in change_log.read()] == ['u_1', 'u_2']
+    assert change_log.pending() == {'u_0': None}
+
+    # An upsert after the tombstone brings the key back, at the end
+    change_log.upsert(user(0, 'again'))
+    assert [record['user_id'] for record in change_log.read()] == ['u_1', 'u_2', 'u_0']
+
+
+def test_append_goes_to_base_file(data_dir):
+    change_log = make_log(data_dir)
+    change_log.read()  # Keep the view current so append extends it in place
+    offsets = change_log.append([user(3), user(4)])
+    assert len(offsets) == 2
+    assert [record['user_id'] for record in change_log.read()] == ['u_0', 'u_1', 'u_2', 'u_3', 'u_4']
+    assert not os.path.exists(change_log.log_file_path)
+
+
+def test_a_second_instance_sees_the_log(data_dir):
+    change_log = make_log(data_dir)
+    other = ChangeLog(change_log.file_path, 'user_id')
+    assert len(other.read()) == 3
+    change_log.delete('u_2')
+    change_log.upsert(user(1, 'renamed'))
+    assert other.read() == [user(0), user(1, 'renamed')]
+
+
+def test_compact_folds_log_into_base_file(data_dir):
+    change_log = make_log(data_dir)
+    change_log.upsert(user(1, 'renamed'))
+    change_log.delete('u_2')
+    change_log.upsert(user(5))
+    expected = [user(0), user(1, 'renamed'), user(5)]
+
+    change_log.compact()
+    assert not os.path.exists(change_log.log_file_path)
+    assert read_records(change_log.file_path) == expected
+    assert change_log.read() == expected
+    assert change_log.pending() == {}
+    assert not [name for name in os.listdir(data_dir) if name.endswith('.tmp')]
+
+
+def test_compaction_starts_past_threshold(data_dir):
+    change_log = make_log(data_dir, compaction_threshold=512)
+    for number in range(3, 40):
+        change_log.upsert(user(number))
+    change_log.delete('u_0')
+    assert change_log._compaction_thread is not None
+    change_log._compaction_thread.join()
+    change_log.compact()  # Folds whatever was logged after the background compaction
+    assert not os.path.exists(change_log.log_file_path)
+    assert [record['user_id'] for record in read_records(change_log.file_path)] == \
+        [f'u_{number}' for number in range(1, 40)]
+
+
+def test_rewrite_discards_log(data_dir):
+    change_log = make_log(data_dir)
+    change_log.delete('u_0')
+    change_log.rewrite([user(9)])
+    assert not os.path.exists(change_log.log_file_path)
+    assert change_log.read() == [user(9)]
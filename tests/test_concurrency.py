@@ -0,0 +1,76 @@
+# File: tests/test_concurrency.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Multi-process tests of the read-modify-write paths that rewrite a whole data file.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from change_log import ChangeLog
+from record_codec import read_records, write_records
+
+
+def _slow_writes(operation_class, method_name):
+    """Makes a rewrite helper pause first, which widens the window between reading and writing the file."""
+    write = getattr(operation_class, method_name)
+
+    def slow_write(self, records):
+        time.sleep(0.005)
+        write(self, records)
+    setattr(operation_class, method_name, slow_write)
+
+
+def _delete_products(root_dir, product_ids):
+    os.chdir(root_dir)
+    from product_operation import ProductOperation
+    _slow_writes(ProductOperation, '_write_products')
+    product_op = ProductOperation()
+    return sum(product_op.delete_product(product_id) for product_id in product_ids)
+
+
+def _delete_all_customers(root_dir, rounds):
+    os.chdir(root_dir)
+    from customer_operation import CustomerOperation
+    _slow_writes(CustomerOperation, '_write_users')
+    for _ in range(rounds):
+        CustomerOperation().delete_all_customers()
+    return rounds
+
+
+def _append_admins(root_dir, worker, count):
+    os.chdir(root_dir)
+    from admin import Admin
+    from change_log import get_change_log
+    for number in range(count):
+        admin = Admin(user_id=f'u_{worker}{number:04d}', user_name=f'admin_{worker}_{number}',
+                      user_password='x', user_register_time='01-01-2024_10:00:00', user_role='admin')
+        get_change_log('data/users.txt', 'user_id').append([admin])
+        time.sleep(0.002)
+    return count
+
+
+def test_concurrent_product_deletions_are_not_lost(data_dir):
+    product_ids = [str(number) for number in range(40)]
+    write_records(os.path.join(data_dir, 'products.txt'),
+                  [{'pro_id': product_id, 'pro_name': f'Product {product_id}'} for product_id in product_ids + ['kept']])
+    root_dir = os.path.dirname(data_dir)
+    with ProcessPoolExecutor(max_workers=4, mp_context=get_context('spawn')) as pool:
+        deleted = sum(pool.map(_delete_products, [root_dir] * 4, [product_ids[worker::4] for worker in range(4)]))
+    assert deleted == len(product_ids)
+    assert [product['pro_id'] for product in read_records(os.path.join(data_dir, 'products.txt'))] == ['kept']
+
+
+def test_delete_all_customers_keeps_admins_written_meanwhile(data_dir):
+    write_records(os.path.join(data_dir, 'users.txt'),
+                  [{'user_id': f'u_9{number:04d}', 'user_name': f'customer_{number}', 'user_role': 'customer'}
+                   for number in range(20)])
+    root_dir = os.path.dirname(data_dir)
+    with ProcessPoolExecutor(max_workers=3, mp_context=get_context('spawn')) as pool:
+        wipes = pool.submit(_delete_all_customers, root_dir, 30)
+        appends = [pool.submit(_append_admins, root_dir, worker, 20) for worker in (1, 2)]
+        wipes.result()
+        [append.result() for append in appends]
+    users = ChangeLog(os.path.join(data_dir, 'users.txt'), 'user_id').read()
+    assert not [user for user in users if user['user_role'] == 'customer']
+    assert len([user for user in users if user['user_role'] == 'admin']) == 40
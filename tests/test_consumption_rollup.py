@@ -0,0 +1,99 @@
+# File: tests/test_consumption_rollup.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests that the incrementally updated consumption rollup equals a rebuild from scratch.
+
+import os
+import random
+import pandas as pd
+import pytest
+from consumption_rollup import ConsumptionRollup
+from order_operation import OrderOperation
+from product_operation import ProductOperation
+from record_codec import write_records
+
+# One product has no usable price
+PRODUCTS = [
+    {'pro_id': '1', 'pro_name': 'Ring', 'pro_category': 'jewelry', 'pro_current_price': 10.0},
+    {'pro_id': '2', 'pro_name': 'Dress', 'pro_category': 'women', 'pro_current_price': 30.25},
+    {'pro_id': '3', 'pro_name': 'Bag', 'pro_category': 'women', 'pro_current_price': None},
+    {'pro_id': '4', 'pro_name': 'Shoe', 'pro_category': 'shoes', 'pro_current_price': 55.5},
+]
+CUSTOMERS = ['u_0000000001', 'u_0000000002', 'u_0000000003']
+TIMES = ['05-03-2025_10:00:00', '31-12-2024_23:59:59', '01-01-2025_00:00:00', '15-06-2025_12:30:00',
+         'yesterday', '32-01-2025_00:00:00', '10-13-2025_10:00:00']
+
+
+@pytest.fixture
+def order_op(data_dir, monkeypatch):
+    monkeypatch.setattr(ProductOperation, 'products_file_path', os.path.join(data_dir, 'products.txt'))
+    monkeypatch.setattr(OrderOperation, 'orders_file_path', os.path.join(data_dir, 'orders.txt'))
+    write_records(ProductOperation.products_file_path, PRODUCTS)
+    randomizer = random.Random(7)
+    # Some orders point to unknown products or carry a time that does not parse
+    write_records(OrderOperation.orders_file_path, [
+        {'order_id': f'o_{number:05d}', 'user_id': randomizer.choice(CUSTOMERS),
+         'pro_id': randomizer.choice(['1', '2', '2', '3', '4', '99']), 'order_time': randomizer.choice(TIMES)}
+        for number in range(300)])
+    return OrderOperation()
+
+
+def baseline_consumption(order_op, user_id=None):
+    """The old pandas aggregation, as a {(year, month): (revenue, order count)} dict."""
+    orders_df = pd.DataFrame(order_op._read_orders())
+    orders_df['pro_id'] = orders_df['pro_id'].astype(str) # Catalog pro_ids are strings; an int pro_id still matches
+    products_df = pd.DataFrame(ProductOperation()._read_products())
+    products_df['pro_current_price'] = pd.to_numeric(products_df['pro_current_price'], errors='coerce')
+    merged_df = pd.merge(orders_df, products_df[['pro_id', 'pro_current_price']], on='pro_id', how='left')
+    merged_df['order_time'] = pd.to_datetime(merged_df['order_time'], format='%d-%m-%Y_%H:%M:%S', errors='coerce')
+    merged_df.dropna(subset=['order_time', 'pro_current_price'], inplace=True)
+    if user_id is not None:
+        merged_df = merged_df[merged_df['user_id'] == user_id]
+    cells = merged_df.groupby([merged_df['order_time'].dt.year, merged_df['order_time'].dt.month])['pro_current_price']
+    return {(int(year), int(month)): (round(float(revenue), 2), int(count))
+            for (year, month), revenue, count in zip(cells.sum().index, cells.sum(), cells.count())}
+
+
+def as_cells(months):
+    """Drops the empty months that monthly_consumption fills in between the first and the last order."""
+    return {(year, month): (revenue, count) for year, month, revenue, count in months if count}
+
+
+def fresh_rollup(order_op):
+    """A rollup rebuilt from scratch, ignoring the persisted one."""
+    rollup = ConsumptionRollup(order_op.orders_file_path, ProductOperation.products_file_path)
+    rollup.rebuild()
+    return rollup
+
+
+def test_rollup_matches_the_baseline(order_op):
+    rollup = order_op._consumption_rollup()
+    assert as_cells(rollup.monthly_consumption()) == baseline_consumption(order_op)
+    for user_id in CUSTOMERS:
+        assert as_cells(order_op.get_monthly_consumption(user_id)) == baseline_consumption(order_op, user_id)
+    assert order_op.get_monthly_consumption('u_0000000009') == []
+
+
+def test_incremental_rollup_equals_a_rebuild(order_op):
+    rollup = order_op._consumption_rollup()
+    rollup.monthly_consumption()
+    order_op.create_orders_bulk([(user_id, pro_id, order_time) for user_id, pro_id, order_time in [
+        ('u_0000000001', '1', '01-02-2026_08:00:00'), ('u_0000000004', '4', '28-02-2026_08:00:00'),
+        ('u_0000000002', '3', '01-02-2026_08:00:00'), ('u_0000000002', '2', '30-02-2026_08:00:00'),
+        ('u_0000000003', '99', '01-02-2026_08:00:00'), ('u_0000000003', 2, '01-03-2026_08:00:00')]])
+    for order_id in ('o_00000', 'o_00001', 'o_00002', 'o_00003', 'o_00004'):
+        order_op.delete_order(order_id)
+    assert rollup.is_current() # Updated in place, not rebuilt
+    rebuilt = fresh_rollup(order_op)
+    assert rollup.monthly_consumption() == rebuilt.monthly_consumption()
+    for user_id in CUSTOMERS + ['u_0000000004']:
+        assert rollup.monthly_consumption(user_id) == rebuilt.monthly_consumption(user_id)
+    assert as_cells(rollup.monthly_consumption()) == baseline_consumption(order_op)
+
+
+def test_catalog_change_rebuilds(order_op):
+    rollup = order_op._consumption_rollup()
+    rollup.monthly_consumption()
+    ProductOperation().delete_product('4')
+    assert not rollup.is_current()
+    assert as_cells(rollup.monthly_consumption()) == baseline_consumption(order_op)
@@ -0,0 +1,97 @@
+# File: tests/test_figure_cache.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests that figures are only rendered again when their inputs change.
+
+import os
+import pytest
+import figure_renderer
+from figure_cache import FigureCache, get_figure_cache
+from order_operation import OrderOperation
+from product_operation import ProductOperation
+from record_codec import write_records
+
+PRODUCTS = [{'pro_id': str(number), 'pro_name': f'Product {number}', 'pro_category': ['bags', 'shoes'][number % 2],
+             'pro_current_price': 10.0 + number, 'pro_raw_price': 20.0 + number, 'pro_discount': 5 * number,
+             'pro_likes_count': number} for number in range(10)]
+
+
+@pytest.fixture
+def data_files(data_dir, monkeypatch):
+    """Points the operations at small products and orders files in data_dir."""
+    monkeypatch.setattr(ProductOperation, 'products_file_path', os.path.join(data_dir, 'products.txt'))
+    monkeypatch.setattr(ProductOperation, 'figure_path', os.path.join(data_dir, 'figure'))
+    monkeypatch.setattr(OrderOperation, 'orders_file_path', os.path.join(data_dir, 'orders.txt'))
+    monkeypatch.setattr(OrderOperation, 'figure_path', os.path.join(data_dir, 'figure'))
+    write_records(ProductOperation.products_file_path, PRODUCTS)
+    write_records(OrderOperation.orders_file_path, [
+        {'order_id': f'o_{number:05d}', 'user_id': f'u_{number % 2:010d}', 'pro_id': str(number % 10),
+         'order_time': f'{1 + number % 28:02d}-{1 + number % 12:02d}-2025_10:00:00'} for number in range(40)])
+
+
+@pytest.fixture
+def renders(data_files, monkeypatch):
+    """Returns the list of figure files rendered, in order."""
+    rendered = []
+    for name in dir(figure_renderer):
+        render = getattr(figure_renderer, name)
+        if name.startswith('render_') and name.endswith('_figure') and callable(render):
+            def counting(*args, _render=render):
+                rendered.append(os.path.basename(args[-1]))
+                return _render(*args)
+            monkeypatch.setattr(figure_renderer, name, counting)
+    return rendered
+
+
+def test_figure_is_rendered_again_only_when_its_inputs_change(renders):
+    prod_op, order_op = ProductOperation(), OrderOperation()
+    prod_op.generate_category_figure()
+    prod_op.generate_category_figure()
+    assert renders == ['generate_category_figure.png']
+    assert os.path.exists(os.path.join(prod_op.figure_path, 'generate_category_figure.png'))
+
+    # Orders do not feed the product figures, but do feed the order figures
+    order_op.generate_all_top_10_best_sellers_figure()
+    order_op.create_an_order('u_0000000001', '3')
+    prod_op.generate_category_figure()
+    order_op.generate_all_top_10_best_sellers_figure()
+    assert renders[1:] == ['all_top_10_best_sellers.png', 'all_top_10_best_sellers.png']
+
+    # A product change, or a deleted PNG, renders it again
+    prod_op.delete_product('9')
+    prod_op.generate_category_figure()
+    os.remove(os.path.join(prod_op.figure_path, 'generate_category_figure.png'))
+    prod_op.generate_category_figure()
+    assert renders[3:] == ['generate_category_figure.png'] * 2
+
+
+def test_customer_figures_are_cached_per_customer(renders):
+    order_op = OrderOperation()
+    for customer_id in ('u_0000000000', 'u_0000000001', 'u_0000000000'):
+        order_op.generate_single_customer_consumption_figure(customer_id)
+    assert renders == ['single_customer_consumption_u_0000000000.png', 'single_customer_consumption_u_0000000001.png']
+
+
+def test_generate_all_figures_skips_up_to_date_figures(data_files):
+    order_op = OrderOperation()
+    first = order_op.generate_all_figures()
+    assert first and all(seconds is not None for seconds in first.values())
+    assert set(order_op.generate_all_figures().values()) == {None}
+    get_figure_cache(order_op.figure_path).invalidate('generate_discount_figure.png')
+    again = order_op.generate_all_figures()
+    assert [name for name, seconds in again.items() if seconds is not None] == ['generate_discount_figure.png']
+
+
+def test_entries_of_other_processes_are_kept(data_dir):
+    figure_path = os.path.join(data_dir, 'figure')
+    os.makedirs(figure_path)
+    for file_name in ('a.png', 'b.png'):
+        open(os.path.join(figure_path, file_name), 'wb').close()
+    # Two instances stand for two processes that loaded the cache before either stored anything
+    first, second = FigureCache(figure_path), FigureCache(figure_path)
+    first.store('a.png', 'fingerprint a')
+    second.store('b.png', 'fingerprint b')
+    third = FigureCache(figure_path)
+    assert third.is_fresh('a.png', 'fingerprint a') and third.is_fresh('b.png', 'fingerprint b')
+    assert not third.is_fresh('a.png', 'fingerprint b')
+    assert third.stats() == {'hits': 2, 'misses': 1}
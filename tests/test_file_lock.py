@@ -0,0 +1,86 @@
+# File: tests/test_file_lock.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests that threads share read locks while a writer has the file alone.
+
+import os
+import threading
+import time
+from file_lock import file_lock
+
+
+def run_threads(*targets):
+    """Runs the targets in parallel threads and re-raises the first exception any of them raised."""
+    errors = []
+
+    def run(target):
+        try:
+            target()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(target,)) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads), 'deadlock'
+    if errors:
+        raise errors[0]
+
+
+def test_readers_hold_the_lock_together(data_dir):
+    file_path = os.path.join(data_dir, 'orders.txt')
+    together = threading.Barrier(4, timeout=5)
+
+    def read():
+        with file_lock(file_path, exclusive=False):
+            together.wait() # Only passes if all four readers are inside at once
+
+    run_threads(*[read] * 4)
+
+
+def test_writer_excludes_readers_and_other_writers(data_dir):
+    file_path = os.path.join(data_dir, 'orders.txt')
+    inside, events = [], []
+
+    def use(exclusive):
+        def target():
+            for _ in range(20):
+                with file_lock(file_path, exclusive=exclusive):
+                    inside.append(exclusive)
+                    events.append(list(inside))
+                    time.sleep(0.001)
+                    inside.remove(exclusive)
+        return target
+
+    run_threads(use(True), use(True), use(False), use(False), use(False))
+    for holders in events:
+        assert True not in holders or holders == [True]
+
+
+def test_reentrant_and_concurrent_upgrades(data_dir):
+    file_path = os.path.join(data_dir, 'orders.txt')
+    both_reading = threading.Barrier(2, timeout=5)
+    writers = []
+
+    def upgrade():
+        with file_lock(file_path, exclusive=False):
+            with file_lock(file_path, exclusive=False):
+                both_reading.wait()
+            # Both threads hold the shared lock and ask for the exclusive one: they take turns
+            with file_lock(file_path):
+                writers.append(threading.get_ident())
+                with file_lock(file_path, exclusive=False):
+                    time.sleep(0.01)
+                assert writers[-1] == threading.get_ident()
+
+    run_threads(upgrade, upgrade)
+    assert len(writers) == 2
+    # Everything was released: another thread can take the exclusive lock right away
+    def write():
+        with file_lock(file_path):
+            writers.append(threading.get_ident())
+
+    run_threads(write)
+    assert len(writers) == 3
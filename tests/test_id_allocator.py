@@ -0,0 +1,77 @@
+# File: tests/test_id_allocator.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests that the IdAllocator hands out consecutive unique ids and recovers its high-water mark.
+
+import os
+import threading
+import record_cache as record_cache_module
+from change_log import get_change_log
+from id_allocator import IdAllocator, get_id_allocator
+from record_codec import write_records
+
+
+def order(number):
+    return {'order_id': f'o_{number:05d}', 'user_id': 'u_0000000001', 'pro_id': '1', 'order_time': '01-01-2026_00:00:00'}
+
+
+def test_ids_are_consecutive_across_allocators(data_dir):
+    file_path = os.path.join(data_dir, 'orders.txt')
+    # Each allocator stands for one process: a single create no longer skips a block of ids
+    ids = [IdAllocator(file_path, 'order_id', 'o_', 5).allocate() for _ in range(3)]
+    ids += IdAllocator(file_path, 'order_id', 'o_', 5).allocate_many(3)
+    assert ids == ['o_00000', 'o_00001', 'o_00002', 'o_00003', 'o_00004', 'o_00005']
+
+
+def test_ids_grow_past_the_padded_width(data_dir):
+    allocator = IdAllocator(os.path.join(data_dir, 'orders.txt'), 'order_id', 'o_', 5)
+    write_records(allocator.file_path, [order(99998)])
+    assert allocator.allocate_many(3) == ['o_99999', 'o_100000', 'o_100001']
+
+
+def test_concurrent_threads_get_unique_ids(data_dir):
+    allocator = get_id_allocator(os.path.join(data_dir, 'users.txt'), 'user_id', 'u_', 10)
+    ids = []
+
+    def allocate():
+        for _ in range(50):
+            ids.append(allocator.allocate())
+
+    threads = [threading.Thread(target=allocate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(ids) == [f'u_{number:010d}' for number in range(400)]
+
+
+def test_missing_state_is_recovered_from_the_tail(data_dir, monkeypatch):
+    file_path = os.path.join(data_dir, 'orders.txt')
+    write_records(file_path, [order(number) for number in range(5000)])
+    get_change_log(file_path, 'order_id').upsert(order(7000))
+    allocator = IdAllocator(file_path, 'order_id', 'o_', 5)
+    assert os.path.getsize(file_path) > 2 * allocator.tail_size
+
+    load = record_cache_module.record_cache.load
+
+    def load_except_data_file(path):
+        assert path != file_path, 'the whole data file was read'
+        return load(path)
+
+    monkeypatch.setattr(record_cache_module.record_cache, 'load', load_except_data_file)
+    assert allocator.allocate() == 'o_07001'
+    monkeypatch.undo()
+    get_change_log(file_path, 'order_id').compact()
+    os.remove(allocator.state_file_path)
+    assert allocator.allocate() == 'o_07001'
+
+
+def test_recover_scans_random_legacy_ids(data_dir):
+    file_path = os.path.join(data_dir, 'orders.txt')
+    write_records(file_path, [order(number) for number in (52817, 80, 91234, 3)])
+    allocator = IdAllocator(file_path, 'order_id', 'o_', 5)
+    allocator.recover()
+    assert allocator.allocate() == 'o_91235'
+    # Recovering again never moves the high-water mark back
+    allocator.recover()
+    assert allocator.allocate() == 'o_91236'
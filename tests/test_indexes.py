@@ -0,0 +1,75 @@
+# File: tests/test_indexes.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests that the persisted indexes pick up writes made behind their back.
+
+import os
+import threading
+import time
+import order_index as order_index_module
+from file_lock import file_lock
+from offset_index import OffsetIndex
+from order_index import OrderIndex
+from user_index import UserIndex
+from record_codec import append_records, write_records
+
+
+def order(number, user_id='u_1', pro_id='p_1', day=1):
+    return {'order_id': f'o_{number:05d}', 'user_id': user_id, 'pro_id': pro_id,
+            'order_time': f'{day:02d}-01-2024_10:00:00'}
+
+
+def test_order_index_sees_external_append(data_dir):
+    orders_file_path = os.path.join(data_dir, 'orders.txt')
+    write_records(orders_file_path, [order(number) for number in range(1, 4)])
+    assert OrderIndex(orders_file_path).count('u_1') == 3
+
+    # Another process appends; a fresh instance loads the persisted sidecar, sees it is stale and rebuilds
+    append_records(orders_file_path, [order(4), order(5, user_id='u_2')])
+    index = OrderIndex(orders_file_path)
+    assert index.count('u_1') == 4
+    assert index.count('u_2') == 1
+    assert index.count() == 5
+
+
+def test_user_and_offset_indexes_see_external_append(data_dir):
+    users_file_path = os.path.join(data_dir, 'users.txt')
+    write_records(users_file_path, [{'user_id': 'u_1', 'user_name': 'alice', 'user_role': 'customer'}])
+    user_index = UserIndex(users_file_path)
+    offset_index = OffsetIndex(users_file_path, 'user_id', kind='test')
+    assert user_index.get_user_id('bob') is None
+    assert offset_index.count() == 1
+
+    append_records(users_file_path, [{'user_id': 'u_2', 'user_name': 'bob', 'user_role': 'customer'}])
+    assert user_index.get_user_id('bob') == 'u_2'
+    assert user_index.get_user('u_2')['user_name'] == 'bob'
+    assert offset_index.count() == 2
+    assert offset_index.find('u_2')['user_name'] == 'bob'
+
+
+def test_order_write_during_rebuild_is_not_lost(data_dir, monkeypatch):
+    orders_file_path = os.path.join(data_dir, 'orders.txt')
+    write_records(orders_file_path, [order(number) for number in range(1, 4)])
+    scan = order_index_module.iter_records_with_offsets
+    writers = []
+
+    def write_order():
+        with file_lock(orders_file_path):
+            append_records(orders_file_path, [order(4)])
+
+    def scan_with_concurrent_write(file_path):
+        # A writer shows up right after the file was scanned, before the rebuild finishes; it has to
+        # wait for the rebuild, and the index must not claim to be current once the write is in
+        yield from scan(file_path)
+        if not writers:
+            writers.append(threading.Thread(target=write_order))
+            writers[0].start()
+            time.sleep(0.2)
+
+    monkeypatch.setattr(order_index_module, 'iter_records_with_offsets', scan_with_concurrent_write)
+    index = OrderIndex(orders_file_path)
+    index.rebuild()
+    writers[0].join()
+    assert index.count('u_1') == 4
+    assert [record['order_id'] for record in index.read_page('u_1', 0, 10)] == \
+        [f'o_{number:05d}' for number in range(1, 5)]
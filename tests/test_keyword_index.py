@@ -0,0 +1,62 @@
+# File: tests/test_keyword_index.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests that the trigram keyword index answers exactly like a substring scan.
+
+import os
+import random
+import pytest
+from keyword_index import KeywordIndex
+from record_cache import file_signature
+from record_codec import write_records
+
+WORDS = ['Ring', 'ring', 'Dress', 'robe', 'Sac', 'Écharpe', 'blue', 'BLUE', 'Bleu', 'Straße', 'ringo', 'ear-ring', '12', '123']
+KEYWORDS = ['', 'r', 'RI', 'ring', 'RING', 'ing', 'ress', 'dress blue', 'é', 'écharpe', 'straße', 'sse',
+            'product 12', '123', 'zzz', 'ring ring', ' ', 'e-r']
+
+
+@pytest.fixture
+def products(data_dir):
+    randomizer = random.Random(3)
+    records = [{'pro_id': str(number), 'pro_name': ' '.join(randomizer.choice(WORDS) for _ in range(randomizer.randint(0, 4)))
+                + f' Product {number}'} for number in range(300)]
+    records.append({'pro_id': 'unnamed'})
+    write_records(os.path.join(data_dir, 'products.txt'), records)
+    return records
+
+
+def naive_search(products, keyword):
+    return [product['pro_id'] for product in products if keyword.lower() in product.get('pro_name', '').lower()]
+
+
+def test_search_equals_substring_scan(data_dir, products):
+    index = KeywordIndex(os.path.join(data_dir, 'products.txt'))
+    index.build(products)
+    for keyword in KEYWORDS:
+        assert index.search(keyword) == naive_search(products, keyword), keyword
+
+
+def test_persisted_index_and_removal(data_dir, products):
+    products_file_path = os.path.join(data_dir, 'products.txt')
+    KeywordIndex(products_file_path).build(products)
+
+    index = KeywordIndex(products_file_path)  # Another process loads the persisted index
+    for keyword in KEYWORDS:
+        assert index.search(keyword) == naive_search(products, keyword), keyword
+
+    removed = naive_search(products, 'ring')[0]
+    previous_signature = file_signature(products_file_path)
+    remaining = [product for product in products if product['pro_id'] != removed]
+    write_records(products_file_path, remaining)
+    index.remove(removed, previous_signature)
+    assert index.search('ring') == naive_search(remaining, 'ring')
+    assert KeywordIndex(products_file_path).search('ring') == naive_search(remaining, 'ring')
+
+
+def test_empty_catalog(data_dir):
+    products_file_path = os.path.join(data_dir, 'products.txt')
+    write_records(products_file_path, [])
+    index = KeywordIndex(products_file_path)
+    assert index.search('ring') == []
+    assert index.search('') == []
+    assert KeywordIndex(products_file_path).search('ring') == []
@@ -0,0 +1,66 @@
+# File: tests/test_order_index.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests of the per-customer order index across appends, deletes, merges and fresh processes.
+
+import os
+import random
+import pytest
+import order_index as order_index_module
+from change_log import get_change_log
+from order_index import OrderIndex, order_time_key, order_number
+from order_operation import OrderOperation
+
+USERS = ['u_1', 'u_2', 'u_3', 'u_with_a_much_longer_identifier']
+
+
+@pytest.fixture
+def order_op(data_dir, monkeypatch):
+    monkeypatch.setattr(OrderOperation, 'orders_file_path', os.path.join(data_dir, 'orders.txt'))
+    monkeypatch.setattr(OrderIndex, 'merge_threshold', 5)
+    return OrderOperation()
+
+
+def expected_history(order_op, user_id):
+    """Returns the order ids of a customer from the merged orders file, oldest first."""
+    orders = [order for order in get_change_log(order_op.orders_file_path, 'order_id').read()
+              if order['user_id'] == user_id]
+    orders.sort(key=lambda order: (order_time_key(order['order_time']), order_number(order['order_id'])))
+    return [order['order_id'] for order in orders]
+
+
+def check_history(order_op, index):
+    for user_id in USERS:
+        expected = expected_history(order_op, user_id)
+        assert index.count(user_id) == len(expected)
+        for start in range(0, len(expected) + 3, 3):
+            assert [order['order_id'] for order in index.read_page(user_id, start, start + 3)] == expected[start:start + 3]
+
+
+def test_history_through_appends_deletes_and_merges(order_op):
+    randomizer = random.Random(7)
+    for step in range(60):
+        if step % 3 == 2:
+            order_ids = [order['order_id'] for order in get_change_log(order_op.orders_file_path, 'order_id').read()]
+            order_op.delete_order(randomizer.choice(order_ids))
+        else:
+            order_op.create_orders_bulk([(randomizer.choice(USERS), str(randomizer.randint(1, 3)),
+                                          f'{randomizer.randint(1, 4):02d}-01-2024_10:00:00')
+                                         for _ in range(randomizer.randint(1, 3))])
+        check_history(order_op, order_index_module.get_order_index(order_op.orders_file_path))
+        # Another process sees the same index from the persisted files
+        check_history(order_op, OrderIndex(order_op.orders_file_path))
+
+
+def test_fresh_process_reads_without_scanning(order_op, monkeypatch):
+    order_op.create_orders_bulk([(USERS[number % 4], '1', '01-01-2024_10:00:00') for number in range(10)])
+    assert order_op.count_orders() == 10  # The first lookup builds the index
+    order_op.create_orders_bulk([(USERS[number % 4], '1', '01-01-2024_10:00:00') for number in range(10, 20)])
+    order_op.delete_order(expected_history(order_op, USERS[2])[1])
+
+    def no_scan(file_path):
+        raise AssertionError("the orders file was scanned")
+
+    monkeypatch.setattr(order_index_module, 'iter_records_with_offsets', no_scan)
+    check_history(order_op, OrderIndex(order_op.orders_file_path))
+    assert OrderIndex(order_op.orders_file_path).count(USERS[2]) == 4
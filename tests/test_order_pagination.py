@@ -0,0 +1,109 @@
+# File: tests/test_order_pagination.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests of the keyset (cursor) pagination over all orders.
+
+import os
+import pytest
+import order_index as order_index_module
+from order_index import OrderIndex, order_time_key, order_number
+from order_operation import OrderOperation
+from record_codec import read_records, write_records
+
+
+def order(number, user_id='u_1', pro_id='p_1', day=1):
+    return {'order_id': f'o_{number:05d}', 'user_id': user_id, 'pro_id': pro_id,
+            'order_time': f'{day:02d}-01-2024_10:00:00'}
+
+
+def all_pages(index, page_size, **filters):
+    """Follows the cursors from the first page to the last; returns the order ids page by page."""
+    pages, cursor = [], None
+    while True:
+        records, cursor = index.read_after(cursor, page_size, **filters)
+        pages.append([record['order_id'] for record in records])
+        if cursor is None:
+            return pages
+
+
+@pytest.fixture
+def orders_file_path(data_dir):
+    orders = [order(number, user_id=f'u_{number % 3}', pro_id=f'p_{number % 2}', day=1 + number % 4)
+              for number in range(1, 31)]
+    path = os.path.join(data_dir, 'orders.txt')
+    write_records(path, orders)
+    return path
+
+
+def expected_ids(orders_file_path, **filters):
+    """Returns the ids of the matching orders sorted by (order_time, order number), the listing order."""
+    orders = [record for record in read_records(orders_file_path)
+              if all(record[field] == value for field, value in filters.items())]
+    orders.sort(key=lambda record: (order_time_key(record['order_time']), order_number(record['order_id'])))
+    return [record['order_id'] for record in orders]
+
+
+@pytest.mark.parametrize('page_size', [1, 7, 10, 30, 100])
+def test_pages_cover_every_order_once_in_order(orders_file_path, page_size):
+    pages = all_pages(OrderIndex(orders_file_path), page_size)
+    assert [order_id for page in pages for order_id in page] == expected_ids(orders_file_path)
+    assert all(len(page) == page_size for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= page_size
+
+
+def test_filtered_pages(orders_file_path):
+    index = OrderIndex(orders_file_path)
+    pages = all_pages(index, 4, user_id='u_1')
+    assert [order_id for page in pages for order_id in page] == expected_ids(orders_file_path, user_id='u_1')
+    pages = all_pages(index, 4, pro_id='p_0')
+    assert [order_id for page in pages for order_id in page] == expected_ids(orders_file_path, pro_id='p_0')
+    pages = all_pages(index, 2, user_id='u_1', pro_id='p_0')
+    assert [order_id for page in pages for order_id in page] == \
+        expected_ids(orders_file_path, user_id='u_1', pro_id='p_0')
+
+
+def test_ids_past_five_digits_sort_numerically(data_dir):
+    path = os.path.join(data_dir, 'orders.txt')
+    write_records(path, [order(100000), order(99999), order(100001), order(99998)])
+    pages = all_pages(OrderIndex(path), 1)
+    assert pages == [['o_99998'], ['o_99999'], ['o_100000'], ['o_100001']]
+
+
+def test_cursor_survives_deletes(orders_file_path, monkeypatch):
+    monkeypatch.setattr(OrderOperation, 'orders_file_path', orders_file_path)
+    order_op = OrderOperation()
+    first_page, cursor = order_op.get_all_orders_page(page_size=5)
+    ids = expected_ids(orders_file_path)
+    assert [order.order_id for order in first_page] == ids[:5]
+
+    # Deleting an order already shown and one not shown yet does not shift the next page
+    order_op.delete_order(ids[2])
+    order_op.delete_order(ids[6])
+    next_page, cursor = order_op.get_all_orders_page(cursor, page_size=5)
+    assert [order.order_id for order in next_page] == ids[5:6] + ids[7:11]
+
+
+def test_browse_all_orders_pages(orders_file_path, monkeypatch):
+    monkeypatch.setattr(OrderOperation, 'orders_file_path', orders_file_path)
+    order_op = OrderOperation()
+    orders, page, total_pages, state = order_op.browse_all_orders('')
+    assert (page, total_pages) == (1, 3)
+    seen = [order.order_id for order in orders]
+    while state[1] is not None:
+        orders, page, total_pages, state = order_op.browse_all_orders('next', state)
+        seen.extend(order.order_id for order in orders)
+    assert page == 3
+    assert seen == expected_ids(orders_file_path)
+    with pytest.raises(ValueError):
+        order_op.browse_all_orders('next', state)
+
+
+def test_fresh_process_pages_without_scanning(orders_file_path, monkeypatch):
+    OrderIndex(orders_file_path).count()  # Builds and persists the index
+
+    def no_scan(file_path):
+        raise AssertionError("the orders file was scanned")
+
+    monkeypatch.setattr(order_index_module, 'iter_records_with_offsets', no_scan)
+    pages = all_pages(OrderIndex(orders_file_path), 10, pro_id='p_1')
+    assert [order_id for page in pages for order_id in page] == expected_ids(orders_file_path, pro_id='p_1')
@@ -0,0 +1,139 @@
+# File: tests/test_product_ingestion.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests that product ingestion from the source CSV files matches the pandas baseline.
+
+import csv
+import json
+import glob
+import os
+import random
+import numpy as np
+import pandas as pd
+import pytest
+import product_operation as product_operation_module
+from compact_id_set import CompactIdSet
+from product_operation import ProductOperation, _read_source_csv, _product_frame, _encode_frame
+
+HEADER = ['category', 'name', 'current_price', 'raw_price', 'discount', 'likes_count', 'id', 'model']
+
+
+def write_source(file_path, rows):
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def sources(data_dir, monkeypatch):
+    """Three source CSV files of 2500 rows whose ids repeat within and across the files."""
+    monkeypatch.setattr(ProductOperation, 'products_file_path', os.path.join(data_dir, 'products.txt'))
+    monkeypatch.setattr(ProductOperation, 'products_source_path', os.path.join(data_dir, 'product', '*.csv'))
+    os.makedirs(os.path.join(data_dir, 'product'))
+    randomizer = random.Random(5)
+    ids = [str(number) for number in randomizer.sample(range(10**9), 5000)] + ['007', '7x', 'SKU-1']
+    for category in ('bags', 'jewelry', 'shoes'):
+        rows = []
+        for number in range(2500):
+            pro_id = randomizer.choice(ids)
+            rows.append([category, f'{category} item {pro_id}', round(randomizer.uniform(1, 100), 2),
+                         round(randomizer.uniform(100, 200), 2), randomizer.randint(0, 90),
+                         randomizer.choice(['', randomizer.randint(0, 999)]), pro_id, f'SKU{number}'])
+        write_source(os.path.join(data_dir, 'product', f'{category}.csv'), rows)
+    return sorted(glob.glob(ProductOperation.products_source_path))
+
+
+def baseline_lines(csv_files):
+    df = pd.concat([_product_frame(_read_source_csv(path)) for path in csv_files], ignore_index=True)
+    return _encode_frame(df.drop_duplicates(subset=['pro_id']))
+
+
+def as_catalog(lines):
+    """Decodes catalog lines into {pro_id: record}, for comparisons where the row order may differ."""
+    records = [json.loads(line) for line in lines]
+    catalog = {record['pro_id']: record for record in records}
+    assert len(catalog) == len(records), 'a pro_id appears twice'
+    return catalog
+
+
+def read_lines(file_path):
+    with open(file_path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_compact_id_set_matches_a_set():
+    randomizer = random.Random(8)
+    id_set, seen = CompactIdSet(), set()
+    for _ in range(200):
+        batch = [str(randomizer.randrange(5000)) for _ in range(randomizer.randint(0, 100))]
+        batch += randomizer.choice([[], ['00' + batch[0]] if batch else [], ['abc', 'abc']])
+        expected = []
+        for pro_id in batch:
+            expected.append(pro_id not in seen)
+            seen.add(pro_id)
+        assert list(id_set.add_new(batch)) == expected
+        assert len(id_set) == len(seen)
+    # The numeric ids stay in a few sorted runs of disjoint ids
+    assert len(id_set._runs) <= 2 * np.log2(len(seen))
+    merged = np.concatenate(id_set._runs)
+    assert len(np.unique(merged)) == len(merged)
+    assert all(np.all(np.diff(run) > 0) for run in id_set._runs)
+
+
+def test_streaming_equals_concat_and_drop_duplicates(sources):
+    assert ProductOperation().stream_products_from_files(memory_budget=1) == (3, 0)
+    assert read_lines(ProductOperation.products_file_path) == baseline_lines(sources)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_extraction_equals_concat_and_drop_duplicates(sources, workers):
+    assert ProductOperation().extract_products_from_files(workers=workers) == (3, 0)
+    assert read_lines(ProductOperation.products_file_path) == baseline_lines(sources)
+
+
+def test_numeric_pro_ids_are_stored_as_strings(sources):
+    # pandas used to infer an all-numeric id column as int; pro_ids are now always strings
+    write_source(os.path.join(os.path.dirname(sources[0]), 'watches.csv'),
+                 [['watches', 'Watch', 99.0, 120.0, 17, 3, 1296354, 'SKU1']])
+    prod_op = ProductOperation()
+    prod_op.extract_products_from_files()
+    products = prod_op._read_products()
+    assert all(isinstance(product['pro_id'], str) for product in products)
+    assert '1296354' in [product['pro_id'] for product in products]
+    # Lookups accept the id either way, so orders saved with an int pro_id still find their product
+    assert prod_op.get_product_by_id(1296354).pro_name == 'Watch'
+    assert prod_op.get_product_by_id('1296354').pro_name == 'Watch'
+    assert prod_op.delete_product(1296354)
+    assert prod_op.get_product_by_id('1296354') is None
+
+
+def test_refresh_reparses_only_what_changed(sources, monkeypatch):
+    prod_op = ProductOperation()
+    watches = os.path.join(os.path.dirname(sources[0]), 'watches.csv')
+    write_source(watches, [['watches', f'Watch {number}', 99.0, 120.0, 17, 3, 2 * 10**9 + number, 'SKU'] for number in range(5)])
+    assert prod_op.extract_products_from_files(workers=1) == (4, 0)
+    parsed = []
+    read_product_source = product_operation_module.read_product_source
+
+    def counting_read(file_path):
+        parsed.append(os.path.basename(file_path))
+        return read_product_source(file_path)
+
+    monkeypatch.setattr(product_operation_module, 'read_product_source', counting_read)
+    # Nothing changed, or only the timestamp: nothing is parsed
+    assert prod_op.extract_products_from_files(workers=1) == (0, 0)
+    os.utime(watches, ns=(1, 1))
+    assert prod_op.extract_products_from_files(workers=1) == (0, 0)
+    assert parsed == []
+
+    # A file whose ids no other file shares is re-parsed alone
+    write_source(watches, [['watches', f'New watch {number}', 99.0, 120.0, 17, 3, 2 * 10**9 + number, 'SKU'] for number in range(3, 8)])
+    assert prod_op.extract_products_from_files(workers=1) == (1, 0)
+    assert parsed == ['watches.csv']
+    assert as_catalog(read_lines(prod_op.products_file_path)) == as_catalog(baseline_lines(sources + [watches]))
+
+    # Removing a file drops its products; files sharing ids with it are re-parsed so they provide them again
+    os.remove(sources[-1])
+    assert prod_op.extract_products_from_files(workers=1)[1] == 1
+    assert as_catalog(read_lines(prod_op.products_file_path)) == as_catalog(baseline_lines(sources[:-1] + [watches]))
@@ -0,0 +1,68 @@
+# File: tests/test_record_codec.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests of the JSON-lines record codec and the migration of legacy data files.
+
+import os
+from record_codec import (encode_record, decode_record, decode_lines, read_records, write_records,
+                          append_records, read_records_at, is_legacy_file, migrate_file, migrate_data_files)
+from order import Order
+
+RECORDS = [
+    {'user_id': 'u_0000000001', 'user_name': 'alice', 'user_role': 'customer'},
+    {'user_id': 'u_0000000002', 'user_name': 'Zoë "quoted"\tname', 'user_role': 'customer'},
+    {'pro_id': '123', 'pro_price': 19.99, 'pro_discount': 0, 'pro_likes_count': 7},
+]
+
+
+def test_encode_decode_round_trip():
+    for record in RECORDS:
+        line = encode_record(record)
+        assert '\n' not in line
+        assert decode_record(line) == record
+    assert decode_lines(encode_record(record) + '\n' for record in RECORDS) == RECORDS
+
+
+def test_model_objects_are_encoded_as_their_record():
+    order = Order(order_id='o_00001', user_id='u_0000000001', pro_id='123', order_time='01-01-2024_10:00:00')
+    assert decode_record(encode_record(order)) == order.to_record()
+    assert Order.from_record(decode_record(encode_record(order))).to_record() == order.to_record()
+
+
+def test_file_round_trip_with_offsets(data_dir):
+    file_path = os.path.join(data_dir, 'users.txt')
+    write_records(file_path, RECORDS[:2])
+    offsets = append_records(file_path, RECORDS[2:])
+    assert read_records(file_path) == RECORDS
+    assert read_records_at(file_path, offsets) == RECORDS[2:]
+    assert not is_legacy_file(file_path)
+
+
+def test_blank_and_malformed_lines_are_skipped():
+    lines = [encode_record(RECORDS[0]), '', '   ', '{"broken": ', '[1, 2]', encode_record(RECORDS[1])]
+    assert decode_lines(lines) == RECORDS[:2]
+    assert decode_record('{"broken": ') is None
+
+
+def test_legacy_lines_are_never_executed():
+    assert decode_record("__import__('os').system('exit 1')") is None
+    assert decode_record("{'a': __import__('os').getpid()}") is None
+
+
+def test_migrate_legacy_file(data_dir):
+    file_path = os.path.join(data_dir, 'users.txt')
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for record in RECORDS:
+            f.write(str(record) + '\n')
+        f.write("{'user_id': 'u_9', 'user_name'\n")  # Malformed, dropped like the old eval() readers did
+    assert is_legacy_file(file_path)
+
+    assert migrate_file(file_path) == len(RECORDS)
+    assert not is_legacy_file(file_path)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        assert [decode_record(line) for line in f] == RECORDS
+    assert read_records(file_path) == RECORDS
+
+    # Migrating again is a no-op
+    assert migrate_file(file_path) == 0
+    assert migrate_data_files([file_path]) == {}
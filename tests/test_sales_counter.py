@@ -0,0 +1,99 @@
+# File: tests/test_sales_counter.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests that the incremental sales counters agree with the old merge + value_counts over pro_name.
+
+import os
+import random
+import pandas as pd
+import pytest
+from order_operation import OrderOperation
+from product_operation import ProductOperation
+from record_codec import write_records
+from sales_counter import SalesCounter
+
+# Two products share a name; two have no usable price
+PRODUCTS = [
+    {'pro_id': '1', 'pro_name': 'Ring', 'pro_category': 'jewelry', 'pro_current_price': 10.0},
+    {'pro_id': '2', 'pro_name': 'Ring', 'pro_category': 'jewelry', 'pro_current_price': 12.5},
+    {'pro_id': '3', 'pro_name': 'Dress', 'pro_category': 'women', 'pro_current_price': 30.0},
+    {'pro_id': '4', 'pro_name': 'Bag', 'pro_category': 'women', 'pro_current_price': None},
+    {'pro_id': '5', 'pro_name': 'Scarf', 'pro_category': 'women', 'pro_current_price': 'n/a'},
+    {'pro_id': '6', 'pro_name': 'Shoe', 'pro_category': 'shoes', 'pro_current_price': 55.0},
+]
+
+
+@pytest.fixture
+def order_op(data_dir, monkeypatch):
+    monkeypatch.setattr(ProductOperation, 'products_file_path', os.path.join(data_dir, 'products.txt'))
+    monkeypatch.setattr(OrderOperation, 'orders_file_path', os.path.join(data_dir, 'orders.txt'))
+    write_records(ProductOperation.products_file_path, PRODUCTS)
+    randomizer = random.Random(4)
+    orders = []
+    for number in range(300):
+        # Some orders point to unknown products or carry a time that does not parse
+        pro_id = randomizer.choice(['1', '2', '3', '3', '4', '5', '6', '6', '6', '99'])
+        order_time = randomizer.choice(['05-03-2025_10:00:00', '31-12-2024_23:59:59', 'yesterday', '32-01-2025_00:00:00'])
+        orders.append({'order_id': f'o_{number:05d}', 'user_id': 'u_0000000001', 'pro_id': pro_id, 'order_time': order_time})
+    write_records(OrderOperation.orders_file_path, orders)
+    return OrderOperation()
+
+
+def baseline_top_names(order_op):
+    """The old generate_all_top_10_best_sellers_figure aggregation, as a {pro_name: number of orders} dict."""
+    orders_df = pd.DataFrame(order_op._read_orders())
+    products_df = pd.DataFrame(ProductOperation()._read_products())
+    products_df['pro_current_price'] = pd.to_numeric(products_df['pro_current_price'], errors='coerce')
+    merged_df = pd.merge(orders_df, products_df[['pro_id', 'pro_current_price', 'pro_name']], on='pro_id', how='left')
+    merged_df['order_time'] = pd.to_datetime(merged_df['order_time'], format='%d-%m-%Y_%H:%M:%S', errors='coerce')
+    merged_df.dropna(subset=['order_time', 'pro_current_price'], inplace=True)
+    return merged_df['pro_name'].value_counts().to_dict()
+
+
+def fresh_counter(order_op):
+    """A counter rebuilt from scratch, ignoring the persisted one."""
+    counter = SalesCounter(order_op.orders_file_path, ProductOperation.products_file_path)
+    counter.rebuild()
+    return counter
+
+
+def test_top_names_match_the_baseline_value_counts(order_op):
+    counter = order_op._sales_counter()
+    assert dict(counter.top_names(10)) == baseline_top_names(order_op)
+    counts = [count for name, count in counter.top_names(10)]
+    assert counts == sorted(counts, reverse=True)
+    # Products without a price are never ranked
+    assert {pro_id for pro_id, count in counter.top(10)} == {'1', '2', '3', '6'}
+    assert [product.pro_id for product, count in order_op.get_best_sellers(10, category='women')] == ['3']
+
+
+def test_incremental_counts_equal_a_rebuild(order_op):
+    counter = order_op._sales_counter()
+    counter.top(10)
+    order_op.create_orders_bulk([('u_0000000002', pro_id, order_time)
+                                 for pro_id, order_time in [('1', '01-01-2026_08:00:00'), ('4', '01-01-2026_08:00:00'),
+                                                            ('6', 'never'), ('2', None), ('99', None)]])
+    for order_id in ('o_00000', 'o_00001', 'o_00002', 'o_00003'):
+        order_op.delete_order(order_id)
+    assert counter.is_current() # Updated in place, not rebuilt
+    rebuilt = fresh_counter(order_op)
+    assert counter.top(10) == rebuilt.top(10)
+    assert counter.top_names(10) == rebuilt.top_names(10)
+    assert dict(counter.top_names(10)) == baseline_top_names(order_op)
+
+
+def test_catalog_change_recounts(order_op):
+    counter = order_op._sales_counter()
+    counter.top(10)
+    ProductOperation().delete_product('6')
+    assert not counter.is_current()
+    assert 'Shoe' not in dict(counter.top_names(10))
+    assert dict(counter.top_names(10)) == baseline_top_names(order_op)
+
+
+def test_orders_with_an_int_pro_id_count_like_a_rebuild(order_op):
+    counter = order_op._sales_counter()
+    before = counter.count('6')
+    order_op.create_orders_bulk([('u_0000000002', 6, '01-01-2026_08:00:00')])
+    assert counter.is_current()
+    assert counter.count('6') == before + 1 == fresh_counter(order_op).count('6')
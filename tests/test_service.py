@@ -0,0 +1,126 @@
+# File: tests/test_service.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests of the asyncio HTTP/JSON service against 127.0.0.1.
+
+import asyncio
+import http.client
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from admin_operation import AdminOperation
+from customer_operation import CustomerOperation
+from order_operation import OrderOperation
+from product_operation import ProductOperation
+from record_codec import write_records
+from service import PlatformService
+from user_operation import UserOperation
+
+
+@pytest.fixture
+def service_port(data_dir, monkeypatch):
+    """Serves a catalog of 25 products on a free port for the duration of a test."""
+    for operation in (UserOperation, CustomerOperation, AdminOperation):
+        monkeypatch.setattr(operation, 'users_file_path', os.path.join(data_dir, 'users.txt'))
+    monkeypatch.setattr(ProductOperation, 'products_file_path', os.path.join(data_dir, 'products.txt'))
+    monkeypatch.setattr(OrderOperation, 'orders_file_path', os.path.join(data_dir, 'orders.txt'))
+    write_records(ProductOperation.products_file_path,
+                  [{'pro_id': str(number), 'pro_name': f'{"Ring" if number % 5 == 0 else "Dress"} {number}',
+                    'pro_category': 'women', 'pro_current_price': 10.0} for number in range(25)])
+    AdminOperation().register_admin()
+
+    service = PlatformService(workers=4)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    ports = []
+
+    def on_ready(port):
+        ports.append(port)
+        ready.set()
+
+    task = loop.create_task(service.serve('127.0.0.1', 0, ready=on_ready))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass # Stopped at the end of the test
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert ready.wait(10)
+    yield ports[0]
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(10)
+    loop.close()
+
+
+def call(port, method, path, body=None, token=None):
+    """Sends one request and returns (status, decoded JSON response)."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = connection.getresponse()
+    result = (response.status, json.loads(response.read()))
+    connection.close()
+    return result
+
+
+def register_and_login(port, user_name):
+    status, result = call(port, 'POST', '/register', {'user_name': user_name, 'user_password': 'pass123',
+                                                       'user_email': f'{user_name}@test.com', 'user_mobile': '0412345678'})
+    assert status == 201, result
+    status, result = call(port, 'POST', '/login', {'user_name': user_name, 'user_password': 'pass123'})
+    assert status == 200 and 'user_password' not in result['user']
+    return result['user']['user_id'], result['token']
+
+
+def test_customer_flow(service_port):
+    status, result = call(service_port, 'GET', '/products?page=3')
+    assert status == 200 and (result['page'], result['total_pages']) == (3, 3)
+    assert [product['pro_id'] for product in result['products']] == ['20', '21', '22', '23', '24']
+    status, result = call(service_port, 'GET', '/products?keyword=ring')
+    assert [product['pro_id'] for product in result['products']] == ['0', '5', '10', '15', '20']
+
+    user_id, token = register_and_login(service_port, 'alice_w')
+    assert call(service_port, 'POST', '/orders', {'product_id': '5'}, token) == (201, {'created': True})
+    assert call(service_port, 'POST', '/orders', {'product_id': '99'}, token)[0] == 404
+    status, result = call(service_port, 'GET', '/orders', token=token)
+    assert status == 200 and [(order['user_id'], order['pro_id']) for order in result['orders']] == [(user_id, '5')]
+    assert call(service_port, 'POST', '/logout', {}, token) == (200, {'logged_out': True})
+    assert call(service_port, 'GET', '/orders', token=token)[0] == 401
+
+
+def test_errors_and_access_rules(service_port):
+    assert call(service_port, 'POST', '/login', {'user_name': 'nobody', 'user_password': 'x'})[0] == 401
+    assert call(service_port, 'POST', '/orders', {'product_id': '1'})[0] == 401
+    assert call(service_port, 'GET', '/nowhere')[0] == 404
+    assert call(service_port, 'DELETE', '/products')[0] == 405
+    assert call(service_port, 'GET', '/products?page=x')[0] == 400
+    alice_id, alice_token = register_and_login(service_port, 'alice_w')
+    bob_id, bob_token = register_and_login(service_port, 'bob_w')
+    assert call(service_port, 'GET', f'/orders?customer_id={alice_id}', token=bob_token)[0] == 403
+    status, result = call(service_port, 'POST', '/login', {'user_name': 'admin', 'user_password': 'admin_password1'})
+    assert call(service_port, 'POST', '/orders', {'product_id': '1'}, result['token'])[0] == 403
+    assert call(service_port, 'GET', f'/orders?customer_id={alice_id}', token=result['token']) == \
+        (200, {'orders': [], 'page': 1, 'total_pages': 0})
+
+
+def test_concurrent_clients(service_port):
+    tokens = [register_and_login(service_port, f'user_{letter}')[1] for letter in 'abcdefgh']
+
+    def client(token):
+        for number in range(5):
+            assert call(service_port, 'POST', '/orders', {'product_id': str(number)}, token)[0] == 201
+            assert call(service_port, 'GET', f'/products?page={number % 3 + 1}')[0] == 200
+        status, result = call(service_port, 'GET', '/orders', token=token)
+        return sorted(order['pro_id'] for order in result['orders'])
+
+    with ThreadPoolExecutor(8) as pool:
+        histories = list(pool.map(client, tokens))
+    assert histories == [['0', '1', '2', '3', '4']] * 8
+    assert len({order['order_id'] for order in OrderOperation()._read_orders()}) == 40
@@ -0,0 +1,60 @@
+# File: tests/test_user_index.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: Tests that login and registration checks follow the user_name index through profile edits.
+
+import os
+import pytest
+from customer_operation import CustomerOperation
+from user_operation import UserOperation
+
+
+@pytest.fixture
+def operations(data_dir, monkeypatch):
+    users_file_path = os.path.join(data_dir, 'users.txt')
+    monkeypatch.setattr(UserOperation, 'users_file_path', users_file_path)
+    monkeypatch.setattr(CustomerOperation, 'users_file_path', users_file_path)
+    return UserOperation(), CustomerOperation()
+
+
+def register(cust_op, user_name):
+    assert cust_op.register_customer(user_name, 'secret1', f'{user_name}@example.com', '0412345678')
+
+
+def test_rename_moves_the_name(operations):
+    user_op, cust_op = operations
+    register(cust_op, 'old_name')
+    customer = user_op.login('old_name', 'secret1')
+
+    assert cust_op.update_profile('user_name', 'new_name', customer)
+    assert user_op.login('old_name', 'secret1') is None
+    assert user_op.login('new_name', 'secret1').user_id == customer.user_id
+    assert user_op.check_username_exist('new_name')
+    assert not user_op.check_username_exist('old_name')
+
+    # The new name is taken, the old one is free again
+    assert not cust_op.register_customer('new_name', 'secret1', 'x@example.com', '0412345678')
+    register(cust_op, 'old_name')
+    assert user_op.login('old_name', 'secret1').user_id != customer.user_id
+
+
+def test_rename_to_a_taken_or_invalid_name_fails(operations):
+    user_op, cust_op = operations
+    register(cust_op, 'first_user')
+    register(cust_op, 'second_user')
+    customer = user_op.login('first_user', 'secret1')
+
+    assert not cust_op.update_profile('user_name', 'second_user', customer)
+    assert not cust_op.update_profile('user_name', 'bad name 1', customer)
+    assert customer.user_name == 'first_user'
+    # Renaming to its own name is allowed
+    assert cust_op.update_profile('user_name', 'first_user', customer)
+
+
+def test_deleted_user_releases_name(operations):
+    user_op, cust_op = operations
+    register(cust_op, 'leaving_user')
+    customer = user_op.login('leaving_user', 'secret1')
+    assert cust_op.delete_customer(customer.user_id)
+    assert user_op.login('leaving_user', 'secret1') is None
+    register(cust_op, 'leaving_user')
@@ -1,14 +1,20 @@
 # File: user.py
 # Creation Date: 18/04/2025
-# Last Modified Date: 18/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This file contains the User class, which serves as a base class for Customer and Admin.
 
-import datetime
+from record_codec import RecordModel
 
-class User:
+class User(RecordModel):
     """
     The base class for all users in the system.
+    Attributes live in __slots__ (no per-instance __dict__), and to_record/from_record convert
+    directly between objects and the dicts stored in data/users.txt.
     """
+    # Fields of the stored record, in file order
+    FIELDS = ('user_id', 'user_name', 'user_password', 'user_register_time', 'user_role')
+    __slots__ = FIELDS
+
     def __init__(self, user_id="", user_name="", user_password="",
                  user_register_time="00-00-0000_00:00:00", user_role="customer"):
         """
@@ -27,17 +33,23 @@ class User:
         self.user_register_time = user_register_time
         self.user_role = user_role
 
-    def __str__(self):
+    def to_record(self):
         """
-        Returns the user information as a formatted string dictionary.
-
-        Returns:
-            str: A string representation of the User object.
+        Returns the user information as the dict stored in data/users.txt.
         """
-        return str({
+        return {
             'user_id': self.user_id,
             'user_name': self.user_name,
             'user_password': self.user_password,
             'user_register_time': self.user_register_time,
             'user_role': self.user_role
-        })
+        }
+
+    def __str__(self):
+        """
+        Returns the user information as a formatted string dictionary.
+
+        Returns:
+            str: A string representation of the User object.
+        """
+        return str(self.to_record())
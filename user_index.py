@@ -0,0 +1,190 @@
+# File: user_index.py
+# Creation Date: 17/10/2026
+# Last Modified Date: 17/10/2026
+# Description: This file contains the UserIndex class, a persisted hash index over data/users.txt.
+
+import atexit
+import threading
+from change_log import get_change_log
+from file_lock import file_lock
+from record_cache import file_signature, sidecar_path, load_sidecar, save_sidecar
+from record_codec import as_record, read_record_at, iter_records_with_offsets
+
+
+class UserIndex:
+    """
+    Maps user_name -> user_id and user_id -> byte offset of the record in data/users.txt,
+    so login and registration checks are O(1) instead of a scan over every user.
+    The index is stored in data/index/users.user.json together with the signature of the
+    users file it describes; whenever the file changes behind its back (a full rewrite,
+    another process) it is rebuilt from data/users.txt on the next lookup.
+    Edits and deletions pending in the users change log are applied on top of the lookups,
+    including renames: a pending upsert releases its user's old name and claims the new one.
+    """
+    def __init__(self, users_file_path):
+        """
+        Constructs the index for the given users file. Nothing is read until the first lookup.
+
+        Args:
+            users_file_path (str): Path of the users data file.
+        """
+        self.users_file_path = users_file_path
+        self.index_file_path = sidecar_path(users_file_path, 'user')
+        self._change_log = get_change_log(users_file_path, 'user_id')
+        self._signature = None
+        self._ids_by_name = {}
+        self._users = {}  # user_id -> [user_name, offset]
+        self._pending_names = (None, {})  # (pending changes it was built from, user_name -> user_id)
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+        self._save_registered = False
+
+    def _ensure_current(self):
+        """Loads the persisted index or rebuilds it if it no longer matches the users file."""
+        signature = file_signature(self.users_file_path)
+        if self._loaded and self._signature == signature:
+            return
+
+        if not self._loaded:
+            self._loaded = True
+            data = load_sidecar(self.index_file_path)
+            if data is not None and data.get('signature') == (list(signature) if signature else None):
+                self._signature = signature
+                self._users = data['users']
+                self._ids_by_name = {}
+                for user_id, (user_name, offset) in self._users.items():
+                    self._claim_name(user_name, user_id)
+                return
+
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Rebuilds the index from a full scan of the users file and persists it.
+        """
+        # Scanned under the shared lock, with the signature taken first, so a registration written
+        # by another process can never be missing from an index that claims to be current
+        with file_lock(self.users_file_path, exclusive=False), self._lock:
+            signature = file_signature(self.users_file_path)
+            self._ids_by_name = {}
+            self._users = {}
+            for offset, user_data in iter_records_with_offsets(self.users_file_path):
+                user_id, user_name = user_data.get('user_id'), user_data.get('user_name')
+                if user_id is None or user_id in self._users:
+                    continue
+                self._users[user_id] = [user_name, offset]
+                self._claim_name(user_name, user_id)
+            self._signature = signature
+            self._loaded = True
+            self._dirty = True
+            self.save()
+
+    def save(self):
+        """
+        Persists the in-memory index if it has changed since it was last written.
+        """
+        with file_lock(self.users_file_path, exclusive=False), self._lock:
+            if not self._dirty:
+                return
+            save_sidecar(self.index_file_path, {
+                'signature': list(self._signature) if self._signature else None,
+                'users': self._users
+            })
+            self._dirty = False
+
+    def _has_released(self, user_id, user_name):
+        """Checks whether the change log deleted the user or renamed it away from user_name."""
+        pending = self._change_log.pending()
+        return user_id in pending and (pending[user_id] is None or pending[user_id].get('user_name') != user_name)
+
+    def _names_in_log(self, pending):
+        """Returns user_name -> user_id of the users upserted in the change log (first upsert wins)."""
+        # ChangeLog.pending() returns a new dict whenever the log changed, so it identifies the version
+        if self._pending_names[0] is not pending:
+            names = {}
+            for user_id, user_data in pending.items():
+                if user_data is not None:
+                    names.setdefault(user_data.get('user_name'), user_id)
+            self._pending_names = (pending, names)
+        return self._pending_names[1]
+
+    def _claim_name(self, user_name, user_id):
+        """Maps user_name to user_id unless a live user already holds that name."""
+        # Like the original linear scan, the first live record still holding a given name wins
+        current_id = self._ids_by_name.get(user_name)
+        if current_id is None or self._has_released(current_id, user_name):
+            self._ids_by_name[user_name] = user_id
+
+    def records_appended(self, users, offsets):
+        """
+        Adds freshly appended user records to the index in O(1) each.
+
+        Args:
+            users (list): The appended User objects or dicts.
+            offsets (list): Byte offset of each record, as returned by RecordCache.append.
+        """
+        with file_lock(self.users_file_path, exclusive=False), self._lock:
+            # The index is only extended if it described the file exactly up to the append,
+            # otherwise it is reloaded (and rebuilt if stale) on the next lookup
+            indexed_size = self._signature[0] if self._signature else 0
+            if not self._loaded or not offsets or offsets[0] != indexed_size:
+                self._loaded = False
+                return
+            for user, offset in zip(users, offsets):
+                user_data = as_record(user)
+                self._users.setdefault(user_data['user_id'], [user_data['user_name'], offset])
+                self._claim_name(user_data['user_name'], user_data['user_id'])
+            self._signature = file_signature(self.users_file_path)
+            self._dirty = True
+            if not self._save_registered:
+                self._save_registered = True
+                atexit.register(self.save)
+
+    def get_user_id(self, user_name):
+        """
+        Returns the user_id registered under the given user_name, or None.
+        """
+        with file_lock(self.users_file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            user_id = self._ids_by_name.get(user_name)
+            # The indexed holder of the name loses it if the log deleted or renamed that user
+            if user_id is None or self._has_released(user_id, user_name):
+                user_id = self._names_in_log(self._change_log.pending()).get(user_name)
+            return user_id
+
+    def get_user(self, user_id):
+        """
+        Returns the record dict of the given user_id by reading only its line, or None.
+        """
+        with file_lock(self.users_file_path, exclusive=False), self._lock:
+            self._ensure_current()
+            pending = self._change_log.pending()
+            if user_id in pending:
+                return pending[user_id]
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            return read_record_at(self.users_file_path, entry[1])
+
+    def find_by_name(self, user_name):
+        """
+        Returns the record dict of the given user_name, or None.
+        """
+        with file_lock(self.users_file_path, exclusive=False), self._lock:
+            user_id = self.get_user_id(user_name)
+            return self.get_user(user_id) if user_id is not None else None
+
+
+_indexes = {}
+_indexes_guard = threading.Lock()
+
+
+def get_user_index(users_file_path):
+    """
+    Returns the shared UserIndex of the given users file.
+    """
+    with _indexes_guard:
+        if users_file_path not in _indexes:
+            _indexes[users_file_path] = UserIndex(users_file_path)
+        return _indexes[users_file_path]
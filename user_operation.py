@@ -1,6 +1,6 @@
 # File: user_operation.py
 # Creation Date: 20/04/2025
-# Last Modified Date: 20/04/2025
+# Last Modified Date: 17/10/2026
 # Description: This file contains the UserOperation class, which handles all user-related logic.
 
 import os
@@ -9,6 +9,9 @@ import string
 import re
 from customer import Customer
 from admin import Admin
+from change_log import get_change_log
+from user_index import get_user_index
+from id_allocator import get_id_allocator
 
 class UserOperation:
     """
@@ -27,27 +30,20 @@ class UserOperation:
                 pass # Just create the file
             return []
         
-        with open(self.users_file_path, 'r', encoding='utf-8') as f:
-            users = []
-            for line in f:
-                try:
-                    users.append(eval(line.strip()))
-                except:
-                    # Handle potential empty lines or malformed data
-                    continue
-            return users
+        # Parsed records are shared through the cache, with pending edits from data/users.log applied
+        return get_change_log(self.users_file_path, 'user_id').read()
+
+    def id_allocator(self):
+        """
+        Returns the IdAllocator of the user ids in data/users.txt.
+        """
+        return get_id_allocator(self.users_file_path, 'user_id', 'u_', 10)
 
     def generate_unique_user_id(self):
         """
-        Generates and returns a 10-digit unique user id starting with 'u_'.
+        Generates and returns a unique user id starting with 'u_' (at least 10 digits) in constant time.
         """
-        users = self._read_users()
-        existing_ids = {user['user_id'] for user in users}
-        
-        while True:
-            new_id = f"u_{random.randint(0, 9999999999):010d}"
-            if new_id not in existing_ids:
-                return new_id
+        return self.id_allocator().allocate()
 
     def encrypt_password(self, user_password):
         """
@@ -93,8 +89,7 @@ class UserOperation:
         """
         Verifies whether a user is already registered.
         """
-        users = self._read_users()
-        return any(user['user_name'] == user_name for user in users)
+        return get_user_index(self.users_file_path).get_user_id(user_name) is not None
 
     def validate_username(self, user_name):
         """
@@ -114,18 +109,18 @@ class UserOperation:
         """
         Verifies the username and password to authorize system access.
         """
-        users = self._read_users()
-        for user_data in users:
-            if user_data['user_name'] == user_name:
-                stored_password_encrypted = user_data['user_password']
-                stored_password_decrypted = self.decrypt_password(stored_password_encrypted)
-                
-                if stored_password_decrypted == user_password:
-                    # Password matches, create and return the correct object type
-                    if user_data['user_role'] == 'admin':
-                        return Admin(**{k: v for k, v in user_data.items() if k in Admin.__init__.__code__.co_varnames})
-                    else: # It's a customer
-                        return Customer(**{k: v for k, v in user_data.items() if k in Customer.__init__.__code__.co_varnames})
+        # O(1) lookup through the user_name index instead of scanning every user
+        user_data = get_user_index(self.users_file_path).find_by_name(user_name)
+        if user_data is not None:
+            stored_password_encrypted = user_data['user_password']
+            stored_password_decrypted = self.decrypt_password(stored_password_encrypted)
+            
+            if stored_password_decrypted == user_password:
+                # Password matches, create and return the correct object type
+                if user_data['user_role'] == 'admin':
+                    return Admin.from_record(user_data)
+                else: # It's a customer
+                    return Customer.from_record(user_data)
         
         # User not found or password incorrect
         return None